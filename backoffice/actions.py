@@ -3,15 +3,17 @@ from django.contrib.admin import ModelAdmin
 from django.db.models import QuerySet
 from django.http import HttpRequest
 from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils.html import format_html
 from django.template.response import TemplateResponse
 from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
 
 from django_fsm import TransitionNotAllowed
 
 from audit.services import AuditService
-from backoffice.services.email_service import EmailService
+from backoffice.services.event_notification_service import EventNotificationService
 from backoffice.services.event_service import EventService
-from backoffice.models import Registration
+from backoffice.models import EventNotification
 from backoffice.forms import EventDuplicationFormSet, EventRescheduleForm
 
 
@@ -29,6 +31,15 @@ def _cancel_confirmation_page(admin: ModelAdmin, request: HttpRequest, query_set
     return TemplateResponse(request, 'admin/backoffice/event/cancel_selected.html', context)
 
 
+def _notification_progress_message(recipient_count: int):
+    return format_html(
+        'Notifying {} registrant{} in the background. Follow delivery under <a href="{}">Event notifications</a>.',
+        recipient_count,
+        '' if recipient_count == 1 else 's',
+        reverse('admin:backoffice_eventnotification_changelist'),
+    )
+
+
 def cancel_event(admin: ModelAdmin, request: HttpRequest, query_set: QuerySet):
     if request.method == 'POST' and 'post' in request.POST:
         cancellation_reason = request.POST.get('cancellation_reason', '').strip()
@@ -40,6 +51,7 @@ def cancel_event(admin: ModelAdmin, request: HttpRequest, query_set: QuerySet):
             )
 
         cancel_count = 0
+        recipient_count = 0
         skipped = []
         for event in query_set:
             try:
@@ -52,20 +64,13 @@ def cancel_event(admin: ModelAdmin, request: HttpRequest, query_set: QuerySet):
 
             AuditService().log(request.user, 'cancelled', target=event)
 
-            for registration in event.registration_set.filter(state=Registration.STATE_CONFIRMED):
-                context = {
-                    'event': event,
-                    'registration': registration,
-                    'cancellation_reason': cancellation_reason,
-                    'base_url': f"https://{request.get_host()}"
-                }
-
-                EmailService().send_email(
-                    template_name='event_cancelled',
-                    context=context,
-                    subject=f"RIDE CANCELLED {event.name}",
-                    recipient_list=[registration.email],
-                )
+            notification = EventNotificationService().notify_registrants(
+                event,
+                EventNotification.KIND_CANCELLED,
+                reason=cancellation_reason,
+                base_url=f"https://{request.get_host()}",
+            )
+            recipient_count += notification.recipient_count
 
             cancel_count += 1
 
@@ -77,13 +82,14 @@ def cancel_event(admin: ModelAdmin, request: HttpRequest, query_set: QuerySet):
             )
 
         if cancel_count == 1:
-            message = "1 event was successfully cancelled and notifications were sent."
+            message = "1 event was successfully cancelled."
         elif cancel_count > 1:
-            message = f"{cancel_count} events were successfully cancelled and notifications were sent."
+            message = f"{cancel_count} events were successfully cancelled."
         else:
             return redirect('admin:backoffice_event_changelist')
 
         admin.message_user(request, message, messages.SUCCESS)
+        admin.message_user(request, _notification_progress_message(recipient_count), messages.INFO)
         return redirect('admin:backoffice_event_changelist')
 
     return _cancel_confirmation_page(admin, request, query_set)
@@ -145,14 +151,15 @@ def reschedule_event(admin: ModelAdmin, request: HttpRequest, query_set: QuerySe
                     event,
                     base_url=f"https://{request.get_host()}",
                 )
-                message = (
-                    f"{event.name} was rescheduled and {notified} registrant"
-                    f"{'' if notified == 1 else 's'} were notified."
-                )
+                admin.message_user(request, f"{event.name} was rescheduled.", messages.SUCCESS)
+                admin.message_user(request, _notification_progress_message(notified), messages.INFO)
             else:
-                message = f"{event.name} was rescheduled. No notifications were sent."
+                admin.message_user(
+                    request,
+                    f"{event.name} was rescheduled. No notifications were sent.",
+                    messages.SUCCESS,
+                )
 
-            admin.message_user(request, message, messages.SUCCESS)
             return redirect('admin:backoffice_event_changelist')
 
         return _reschedule_page(admin, request, query_set, event, form)
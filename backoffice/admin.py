@@ -1,12 +1,13 @@
 from adminsortable2.admin import SortableAdminBase, SortableStackedInline
 from django.contrib import admin
-from django.db.models import Count, Q
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.utils.html import format_html
 
 from audit.context import actor
 from backoffice.actions import archive_event, cancel_event, duplicate_event, reschedule_event
-from backoffice.models import Forecast, Ride, Route, Event, Program, SpeedRange, Registration, RegistrationSnapshot, Announcement, UserProfile, UserMembershipNumber
+from backoffice.models import EventNotification, Forecast, ForecastReading, OutboundEmail, Ride, Route, Event, Program, SpeedRange, Registration, RegistrationSnapshot, Announcement, UserProfile, UserMembershipNumber
 from .forms import EventAdminForm
 
 
@@ -59,10 +60,7 @@ class EventAdmin(AuditedAdminMixin, SortableAdminBase, admin.ModelAdmin):
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         return qs.annotate(
-            confirmed_registration_count=Count(
-                'registration',
-                filter=Q(registration__state=Registration.STATE_CONFIRMED)
-            )
+            confirmed_registration_count=Coalesce(F('stats__confirmed_registration_count'), Value(0))
         )
 
     @admin.display(description='Registrations', ordering='confirmed_registration_count')
@@ -83,7 +81,7 @@ class EventAdmin(AuditedAdminMixin, SortableAdminBase, admin.ModelAdmin):
         fieldsets = [
             (None, {
                 'fields': ('program', 'name', 'description', 'starts_at', 'ends_at', 'all_day',
-                           'location', 'location_url',
+                           'location', 'location_url', 'latitude', 'longitude',
                            'organizer_email', 'virtual',
                            'state',)
             }),
@@ -143,8 +141,23 @@ class ForecastAdmin(AuditedAdminMixin, admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         return False
 
+    def get_queryset(self, request):
+        readings = ForecastReading.objects.filter(
+            latitude=OuterRef('latitude'),
+            longitude=OuterRef('longitude'),
+            prepared_at=OuterRef('readings_prepared_at'),
+            hour__gte=OuterRef('start_time'),
+            hour__lte=OuterRef('end_time'),
+        )
+        return super().get_queryset(request).annotate(
+            reading_count=Subquery(
+                readings.order_by().values('prepared_at').annotate(count=Count('pk')).values('count')[:1],
+                output_field=IntegerField(),
+            ),
+        )
+
     def hourly_count(self, obj):
-        return len(obj.hourly)
+        return obj.reading_count or 0
     hourly_count.short_description = 'Hours'
 
 
@@ -223,6 +236,70 @@ class RegistrationSnapshotAdmin(admin.ModelAdmin):
         return False
 
 
+class EventNotificationAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'event', 'kind', 'recipient_count', 'sent_count', 'pending_count', 'failed_count')
+    list_filter = ('kind', 'created_at')
+    search_fields = ('event__name',)
+    ordering = ('-created_at',)
+    readonly_fields = ('event', 'kind', 'reason', 'base_url', 'recipient_count', 'created_at')
+    fields = readonly_fields
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request).select_related('event')
+        return qs.annotate(
+            sent_count=Count('emails', filter=Q(emails__state=OutboundEmail.STATE_SENT)),
+            pending_count=Count('emails', filter=Q(
+                emails__state__in=[OutboundEmail.STATE_PENDING, OutboundEmail.STATE_SENDING],
+            )),
+            failed_count=Count('emails', filter=Q(emails__state=OutboundEmail.STATE_FAILED)),
+        )
+
+    @admin.display(description='Sent', ordering='sent_count')
+    def sent_count(self, obj):
+        return obj.sent_count
+
+    @admin.display(description='Pending', ordering='pending_count')
+    def pending_count(self, obj):
+        return obj.pending_count
+
+    @admin.display(description='Failed', ordering='failed_count')
+    def failed_count(self, obj):
+        if not obj.failed_count:
+            return 0
+        url = reverse('admin:backoffice_outboundemail_changelist')
+        return format_html(
+            '<a href="{}?notification__id__exact={}&state__exact={}">{}</a>',
+            url, obj.pk, OutboundEmail.STATE_FAILED, obj.failed_count,
+        )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'subject', 'recipients', 'state', 'attempts', 'sent_at')
+    list_filter = ('state', 'created_at', 'notification')
+    search_fields = ('subject', 'to', 'idempotency_key')
+    ordering = ('-created_at',)
+    # Bodies are left out: they can hold sign-in links that would let staff act as the recipient
+    readonly_fields = ('state', 'idempotency_key', 'subject', 'from_email', 'to',
+                       'attempts', 'last_error', 'created_at', 'next_attempt_at', 'sent_at')
+    fields = readonly_fields
+
+    @admin.display(description='To')
+    def recipients(self, obj):
+        return ', '.join(obj.to)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 class AnnouncementAdmin(AuditedAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'type', 'audience', 'begin_at', 'end_at',)
     search_fields = ('title', 'text',)
@@ -262,4 +339,6 @@ admin.site.register(Event, EventAdmin)
 admin.site.register(Registration, RegistrationAdmin)
 admin.site.register(RegistrationSnapshot, RegistrationSnapshotAdmin)
 admin.site.register(Announcement, AnnouncementAdmin)
+admin.site.register(EventNotification, EventNotificationAdmin)
+admin.site.register(OutboundEmail, OutboundEmailAdmin)
 admin.site.register(UserMembershipNumber, UserMembershipNumberAdmin)
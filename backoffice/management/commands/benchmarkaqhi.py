@@ -0,0 +1,49 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backoffice.services.forecast_service import aqhi_series, compute_aqhi
+
+WEEK_HOURS = 7 * 24
+
+
+def synthetic_week(seed: int) -> dict:
+    rng = random.Random(seed)
+
+    def readings(high):
+        return [None if rng.random() < 0.05 else rng.uniform(0, high) for _ in range(WEEK_HOURS)]
+
+    return {
+        'time': [str(hour) for hour in range(WEEK_HOURS)],
+        'pm2_5': readings(60),
+        'nitrogen_dioxide': readings(120),
+        'ozone': readings(250),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Time the whole-series AQHI computation against the per-hour one over a synthetic week of readings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200, help='Number of timed runs of each path.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic readings.')
+
+    def handle(self, *args, **options):
+        hourly = synthetic_week(options['seed'])
+        repeat = options['repeat']
+
+        per_hour = [compute_aqhi(hourly, index) for index in range(WEEK_HOURS)]
+        if aqhi_series(hourly) != per_hour:
+            raise CommandError('Whole-series AQHI differs from the per-hour computation.')
+
+        per_hour_seconds = timeit.timeit(
+            lambda: [compute_aqhi(hourly, index) for index in range(WEEK_HOURS)], number=repeat,
+        )
+        series_seconds = timeit.timeit(lambda: aqhi_series(hourly), number=repeat)
+
+        self.stdout.write(f'Per hour:     {per_hour_seconds / repeat * 1e6:,.0f} µs per week of readings')
+        self.stdout.write(f'Whole series: {series_seconds / repeat * 1e6:,.0f} µs per week of readings')
+        self.stdout.write(self.style.SUCCESS(
+            f'Results match over {WEEK_HOURS} hours; whole series is {per_hour_seconds / series_seconds:.1f}x faster.'
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from backoffice.services.event_stats_service import EventStatsService
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized per-event listing stats from registrations, rides and routes.'
+
+    def handle(self, *args, **options):
+        rebuilt = EventStatsService().rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {rebuilt} events.'))
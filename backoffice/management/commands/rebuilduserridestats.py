@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from backoffice.services.user_ride_stats_service import UserRideStatsService
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized per-user confirmed ride counts from registrations.'
+
+    def handle(self, *args, **options):
+        rebuilt = UserRideStatsService().rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt ride counts for {rebuilt} users.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from backoffice.services.forecast_service import ForecastService
+
+
+class Command(BaseCommand):
+    help = 'Store the badge summary and materiality flag on forecasts stored before they were recorded.'
+
+    def handle(self, *args, **options):
+        summarized = ForecastService().backfill_summaries()
+        self.stdout.write(self.style.SUCCESS(f'Summarized {summarized} forecasts.'))
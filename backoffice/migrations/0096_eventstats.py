@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0095_add_prospective_member_question'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventStats',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='backoffice.event')),
+                ('confirmed_registration_count', models.PositiveIntegerField(default=0, help_text='Number of confirmed registrations for the event.')),
+                ('ride_count', models.PositiveIntegerField(default=0, help_text='Number of rides offered at the event.')),
+                ('min_distance', models.PositiveIntegerField(blank=True, help_text='Shortest route distance in kilometers across the rides, ignoring routes without a distance.', null=True)),
+                ('max_distance', models.PositiveIntegerField(blank=True, help_text='Longest route distance in kilometers across the rides, ignoring routes without a distance.', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When these figures were last recomputed.')),
+            ],
+            options={
+                'verbose_name_plural': 'event stats',
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations
+from django.db.models import Count, IntegerField, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def _per_event(queryset, aggregate):
+    return Subquery(
+        queryset.filter(event_id=OuterRef('event_id'))
+        .order_by()
+        .values('event_id')
+        .annotate(value=aggregate)
+        .values('value')[:1],
+        output_field=IntegerField(),
+    )
+
+
+def populate_event_stats(apps, schema_editor):
+    Event = apps.get_model('backoffice', 'Event')
+    EventStats = apps.get_model('backoffice', 'EventStats')
+    Registration = apps.get_model('backoffice', 'Registration')
+    Ride = apps.get_model('backoffice', 'Ride')
+
+    EventStats.objects.bulk_create(
+        [EventStats(event_id=event_id) for event_id in Event.objects.values_list('pk', flat=True)],
+        ignore_conflicts=True,
+    )
+
+    distances = Ride.objects.filter(route__distance__gt=0)
+    EventStats.objects.update(
+        updated_at=timezone.now(),
+        confirmed_registration_count=Coalesce(
+            _per_event(Registration.objects.filter(state='confirmed'), Count('pk')), Value(0)
+        ),
+        ride_count=Coalesce(_per_event(Ride.objects.all(), Count('pk')), Value(0)),
+        min_distance=_per_event(distances, Min('route__distance')),
+        max_distance=_per_event(distances, Max('route__distance')),
+    )
+
+
+def reverse_populate_event_stats(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0096_eventstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            populate_event_stats,
+            reverse_populate_event_stats,
+        ),
+    ]
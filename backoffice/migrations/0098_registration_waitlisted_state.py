@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:39
+
+import django_fsm
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0097_populate_eventstats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='registration',
+            name='state',
+            field=django_fsm.FSMField(choices=[('submitted', 'Submitted'), ('unverified', 'Unverified'), ('confirmed', 'Confirmed'), ('waitlisted', 'Waitlisted'), ('withdrawn', 'Withdrawn')], default='submitted', help_text='Current state of the registration in the lifecycle.', max_length=50, protected=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:45
+
+import django.utils.timezone
+import django_fsm
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0098_registration_waitlisted_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', django_fsm.FSMField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', help_text='Delivery state of the message.', max_length=50, protected=True)),
+                ('idempotency_key', models.CharField(help_text='Identifies the message across retries; queueing the same key twice sends once.', max_length=255, unique=True)),
+                ('subject', models.CharField(max_length=255)),
+                ('from_email', models.CharField(max_length=255)),
+                ('to', models.JSONField(help_text='List of recipient email addresses.')),
+                ('text_body', models.TextField()),
+                ('html_body', models.TextField()),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Number of delivery attempts made so far.')),
+                ('last_error', models.TextField(blank=True, help_text='Error from the most recent failed delivery attempt.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the next delivery attempt may be made.')),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['state', 'next_attempt_at'], name='outboundemail_due_idx')],
+            },
+        ),
+    ]
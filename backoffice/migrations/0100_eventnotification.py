@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0099_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('cancelled', 'Cancelled'), ('rescheduled', 'Rescheduled')], max_length=16)),
+                ('reason', models.TextField(blank=True, help_text='Cancellation or reschedule reason quoted in the email.')),
+                ('base_url', models.CharField(help_text='Scheme and host used for links in the email.', max_length=255)),
+                ('recipient_count', models.PositiveIntegerField(default=0, help_text='Number of confirmed registrants at the time the notification was started.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='backoffice.event')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='outboundemail',
+            name='notification',
+            field=models.ForeignKey(blank=True, help_text='Event notification this message was sent for, if any.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='emails', to='backoffice.eventnotification'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0101_event_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='calendar_feed_key',
+            field=models.CharField(blank=True, help_text='Part of the personal calendar feed link. Changing it revokes existing links.', max_length=32),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:10
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+
+def fill_search_documents(apps, schema_editor):
+    Event = apps.get_model('backoffice', 'Event')
+    events = list(Event.objects.select_related('program'))
+    for event in events:
+        parts = (event.name, event.program.name, event.location, event.description)
+        event.search_document = ' '.join(' '.join(strip_tags(part).split()) for part in parts if part)
+    Event.objects.bulk_update(events, ['search_document'], batch_size=500)
+    print(f'[0103] fill_search_documents: indexed {len(events)} event(s)')
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            "CREATE INDEX backoffice_event_search_fts_idx ON backoffice_event "
+            "USING gin (to_tsvector('english', search_document))"
+        )
+        schema_editor.execute(
+            'CREATE INDEX backoffice_event_search_trgm_idx ON backoffice_event '
+            'USING gin (search_document gin_trgm_ops)'
+        )
+    elif schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE backoffice_event_fts USING fts5('
+            "search_document, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            'INSERT INTO backoffice_event_fts (rowid, search_document) '
+            'SELECT id, search_document FROM backoffice_event'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS backoffice_event_search_trgm_idx')
+        schema_editor.execute('DROP INDEX IF EXISTS backoffice_event_search_fts_idx')
+    elif schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS backoffice_event_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0102_userprofile_calendar_feed_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False, help_text='Name, program, location and description as plain text, indexed for search.'),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,101 @@
+from datetime import datetime
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def hourly_to_readings(apps, schema_editor):
+    Forecast = apps.get_model('backoffice', 'Forecast')
+    ForecastReading = apps.get_model('backoffice', 'ForecastReading')
+
+    moved = 0
+    for forecast in Forecast.objects.iterator():
+        ForecastReading.objects.bulk_create(
+            [
+                ForecastReading(
+                    latitude=forecast.latitude,
+                    longitude=forecast.longitude,
+                    prepared_at=forecast.prepared_at,
+                    hour=datetime.fromisoformat(entry['time']),
+                    condition=entry['condition'],
+                    temperature=entry['temperature'],
+                    aqhi=entry['aqhi'],
+                )
+                for entry in forecast.hourly or []
+            ],
+            ignore_conflicts=True,
+        )
+        forecast.readings_prepared_at = forecast.prepared_at
+        forecast.save(update_fields=['readings_prepared_at'])
+        moved += 1
+    print(f'[0104] hourly_to_readings: moved readings of {moved} forecast(s)')
+
+
+def readings_to_hourly(apps, schema_editor):
+    Forecast = apps.get_model('backoffice', 'Forecast')
+    ForecastReading = apps.get_model('backoffice', 'ForecastReading')
+
+    for forecast in Forecast.objects.iterator():
+        readings = ForecastReading.objects.filter(
+            latitude=forecast.latitude,
+            longitude=forecast.longitude,
+            prepared_at=forecast.readings_prepared_at,
+            hour__gte=forecast.start_time,
+            hour__lte=forecast.end_time,
+        ).order_by('hour')
+        forecast.hourly = [
+            {
+                'time': reading.hour.isoformat(),
+                'condition': reading.condition,
+                'temperature': reading.temperature,
+                'aqhi': reading.aqhi,
+            }
+            for reading in readings
+        ]
+        forecast.save(update_fields=['hourly'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0103_event_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastReading',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('latitude', models.DecimalField(decimal_places=5, help_text='Latitude of the forecast location.', max_digits=8)),
+                ('longitude', models.DecimalField(decimal_places=5, help_text='Longitude of the forecast location.', max_digits=8)),
+                ('prepared_at', models.DateTimeField(help_text='When the fetch this reading came from was made.')),
+                ('hour', models.DateTimeField(help_text='Hour the reading is for, always at the top of the hour.')),
+                ('condition', models.CharField(choices=[('sun', 'Sun'), ('cloud', 'Cloud'), ('rain', 'Rain'), ('snow', 'Snow'), ('thunder', 'Thunder')], max_length=16)),
+                ('temperature', models.SmallIntegerField(help_text='Temperature in Celsius.')),
+                ('aqhi', models.PositiveSmallIntegerField(blank=True, help_text='Air Quality Health Index, or null when air quality data was not yet available for that hour.', null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('latitude', 'longitude', 'prepared_at', 'hour'), name='forecastreading_fetch_hour_unique')],
+            },
+        ),
+        migrations.AddField(
+            model_name='forecast',
+            name='readings_prepared_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(hourly_to_readings, readings_to_hourly),
+        migrations.AlterField(
+            model_name='forecast',
+            name='readings_prepared_at',
+            field=models.DateTimeField(editable=False, help_text='The fetch whose hourly readings this window shows: the window is the range start_time to end_time of the ForecastReading rows prepared at this time.'),
+        ),
+        migrations.RemoveField(
+            model_name='forecast',
+            name='hourly',
+        ),
+        migrations.AlterField(
+            model_name='forecast',
+            name='prepared_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='When this forecast was fetched from the weather provider. Forecasts are immutable; newer fetches create new records.'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0104_forecast_readings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forecast',
+            name='material',
+            field=models.BooleanField(default=True, editable=False, help_text='Whether the badge differs from the previous forecast for the same window. Always true for the first.'),
+        ),
+        migrations.AddField(
+            model_name='forecast',
+            name='summary',
+            field=models.JSONField(blank=True, editable=False, help_text='The badge computed from the readings when the forecast was stored, so pages need not recompute it.', null=True),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:34
+
+from django.db import migrations, models
+
+
+def mark_readings_and_current(apps, schema_editor):
+    Forecast = apps.get_model('backoffice', 'Forecast')
+    ForecastReading = apps.get_model('backoffice', 'ForecastReading')
+
+    Forecast.objects.update(has_readings=models.Exists(ForecastReading.objects.filter(
+        latitude=models.OuterRef('latitude'),
+        longitude=models.OuterRef('longitude'),
+        prepared_at=models.OuterRef('readings_prepared_at'),
+        hour__gte=models.OuterRef('start_time'),
+        hour__lte=models.OuterRef('end_time'),
+    )))
+
+    newer = Forecast.objects.filter(
+        latitude=models.OuterRef('latitude'),
+        longitude=models.OuterRef('longitude'),
+        start_time=models.OuterRef('start_time'),
+        end_time=models.OuterRef('end_time'),
+        has_readings=True,
+        prepared_at__gt=models.OuterRef('prepared_at'),
+    )
+    current = Forecast.objects.filter(~models.Exists(newer), has_readings=True).update(is_current=True)
+    print(f'[0106] mark_readings_and_current: {current} current forecast(s)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0105_forecast_summary'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='forecast',
+            name='forecast_location_window_idx',
+        ),
+        migrations.AddField(
+            model_name='forecast',
+            name='has_readings',
+            field=models.BooleanField(default=False, editable=False, help_text='Whether the window has any hourly readings. Forecasts without readings are never shown.'),
+        ),
+        migrations.AddField(
+            model_name='forecast',
+            name='is_current',
+            field=models.BooleanField(default=False, editable=False, help_text='Whether this is the latest forecast with readings for its location and window.'),
+        ),
+        migrations.RunPython(mark_readings_and_current, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='forecast',
+            index=models.Index(fields=['latitude', 'longitude', 'start_time', 'end_time', 'has_readings'], name='forecast_location_window_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='forecast',
+            index=models.Index(condition=models.Q(('is_current', True)), fields=['latitude', 'longitude', 'start_time', 'end_time'], name='forecast_current_window_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0106_forecast_current_pointer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='latitude',
+            field=models.DecimalField(blank=True, decimal_places=5, help_text='Latitude of the start, for the weather forecast. Leave blank to use the Ottawa airport.', max_digits=8, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=5, help_text='Longitude of the start, for the weather forecast. Leave blank to use the Ottawa airport.', max_digits=8, null=True),
+        ),
+    ]
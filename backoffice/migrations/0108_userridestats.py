@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('backoffice', '0107_event_coordinates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRideStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ride_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('confirmed_ride_count', models.PositiveIntegerField(default=0, help_text='Number of events, cancelled ones aside, the user has a confirmed registration for.')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When this figure was last recomputed.')),
+            ],
+            options={
+                'verbose_name_plural': 'user ride stats',
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def populate_user_ride_stats(apps, schema_editor):
+    Registration = apps.get_model('backoffice', 'Registration')
+    UserRideStats = apps.get_model('backoffice', 'UserRideStats')
+
+    user_ids = Registration.objects.filter(user__isnull=False).values_list('user_id', flat=True).distinct()
+    UserRideStats.objects.bulk_create(
+        [UserRideStats(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+
+    rides = (
+        Registration.objects.filter(user_id=OuterRef('user_id'), state='confirmed')
+        .exclude(event__state='cancelled')
+        .order_by()
+        .values('user_id')
+        .annotate(value=Count('event', distinct=True))
+        .values('value')[:1]
+    )
+    UserRideStats.objects.update(
+        updated_at=timezone.now(),
+        confirmed_ride_count=Coalesce(Subquery(rides, output_field=IntegerField()), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0108_userridestats'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            populate_user_ride_stats,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:23
+
+import django_fsm
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0109_populate_userridestats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='state',
+            field=django_fsm.FSMField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', help_text='Delivery state of the message.', max_length=50, protected=True),
+        ),
+    ]
@@ -1,10 +1,10 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 
 from colorfield.fields import ColorField
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django_fsm import FSMField, transition
 from django_prose_editor.fields import ProseEditorField
@@ -24,7 +24,7 @@ PROSE_EDITOR_CONFIG = {
 }
 from phonenumber_field.modelfields import PhoneNumberField
 
-from backoffice.utils import lower_email
+from backoffice.utils import lower_email, search_document
 
 
 class Program(models.Model):
@@ -116,6 +116,22 @@ class Event(models.Model):
         help_text='If provided, users will get a link to the location. Typically, you can place a Google Maps location here.',
     )
 
+    latitude = models.DecimalField(
+        max_digits=8,
+        decimal_places=5,
+        null=True,
+        blank=True,
+        help_text='Latitude of the start, for the weather forecast. Leave blank to use the Ottawa airport.'
+    )
+
+    longitude = models.DecimalField(
+        max_digits=8,
+        decimal_places=5,
+        null=True,
+        blank=True,
+        help_text='Longitude of the start, for the weather forecast. Leave blank to use the Ottawa airport.'
+    )
+
     starts_at = models.DateTimeField(
         help_text='Start time of the event',
     )
@@ -246,6 +262,17 @@ class Event(models.Model):
         help_text='Original WebScorer event ID for legacy imports'
     )
 
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text='When the event was last saved.'
+    )
+
+    search_document = models.TextField(
+        blank=True,
+        editable=False,
+        help_text='Name, program, location and description as plain text, indexed for search.'
+    )
+
     @property
     def visible(self) -> bool:
         return self.state in (self.STATE_ANNOUNCED, self.STATE_LIVE, self.STATE_CANCELLED)
@@ -347,6 +374,13 @@ class Event(models.Model):
         end = timezone.localtime(self.ends_at).date()
         return (end - start).days + 1
 
+    def save(self, *args, **kwargs):
+        self.search_document = search_document(self.name, self.program.name, self.location, self.description)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'search_document'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
@@ -372,6 +406,21 @@ class Event(models.Model):
                     'ends_at': 'End date cannot be before the start date.'
                 })
 
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValidationError({
+                'longitude' if self.longitude is None else 'latitude': 'Enter both coordinates or neither.'
+            })
+
+        if self.latitude is not None and not (-90 <= self.latitude <= 90):
+            raise ValidationError({
+                'latitude': 'Latitude must be between -90 and 90.'
+            })
+
+        if self.longitude is not None and not (-180 <= self.longitude <= 180):
+            raise ValidationError({
+                'longitude': 'Longitude must be between -180 and 180.'
+            })
+
         if not self.registration_closes_at and not self.external_registration_url and self.registration_enabled:
             raise ValidationError({
                 'registration_closes_at': 'Registration close time is required unless an external registration URL is provided.'
@@ -485,7 +534,13 @@ class Route(models.Model):
 
 class ForecastQuerySet(models.QuerySet):
     def with_readings(self):
-        return self.filter(hourly__0__isnull=False)
+        return self.filter(has_readings=True)
+
+    def current(self):
+        return self.filter(is_current=True)
+
+    def for_window(self, latitude, longitude, start_time, end_time):
+        return self.filter(latitude=latitude, longitude=longitude, start_time=start_time, end_time=end_time)
 
 
 class Forecast(models.Model):
@@ -534,29 +589,144 @@ class Forecast(models.Model):
     )
 
     prepared_at = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         help_text='When this forecast was fetched from the weather provider. Forecasts are immutable; newer fetches create new records.'
     )
 
-    hourly = models.JSONField(
-        default=list,
+    readings_prepared_at = models.DateTimeField(
+        editable=False,
         help_text=(
-            'Per-hour readings across the forecast window: a list of '
-            '{time (ISO 8601, UTC), condition, temperature (Celsius), aqhi} entries. '
-            'aqhi is null when air quality data was not yet available for that hour.'
+            'The fetch whose hourly readings this window shows: the window is the range '
+            'start_time to end_time of the ForecastReading rows prepared at this time.'
         )
     )
 
+    summary = models.JSONField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='The badge computed from the readings when the forecast was stored, so pages need not recompute it.'
+    )
+
+    material = models.BooleanField(
+        default=True,
+        editable=False,
+        help_text='Whether the badge differs from the previous forecast for the same window. Always true for the first.'
+    )
+
+    has_readings = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text='Whether the window has any hourly readings. Forecasts without readings are never shown.'
+    )
+
+    is_current = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text='Whether this is the latest forecast with readings for its location and window.'
+    )
+
     objects = ForecastQuerySet.as_manager()
 
     class Meta:
         indexes = [
-            models.Index(fields=['latitude', 'longitude', 'start_time', 'end_time'], name='forecast_location_window_idx'),
+            models.Index(
+                fields=['latitude', 'longitude', 'start_time', 'end_time', 'has_readings'],
+                name='forecast_location_window_idx',
+            ),
+            # Badge lookups probe this for one row per window rather than scanning revisions
+            models.Index(
+                fields=['latitude', 'longitude', 'start_time', 'end_time'],
+                condition=models.Q(is_current=True),
+                name='forecast_current_window_idx',
+            ),
         ]
 
+    # Hourly readings live in ForecastReading, shared by every window cut from the same fetch.
+    # hourly is kept as a list of {time (ISO 8601, UTC), condition, temperature (Celsius), aqhi}
+    # entries for summarize() and the forecast pages; assigning it stores the readings on save.
+    _hourly = None
+    _hourly_unsaved = False
+
     @property
-    def has_readings(self) -> bool:
-        return isinstance(self.hourly, list) and bool(self.hourly)
+    def hourly(self) -> list[dict]:
+        if self._hourly is None:
+            Forecast.load_readings([self])
+        return self._hourly
+
+    @hourly.setter
+    def hourly(self, readings: list[dict]) -> None:
+        self._hourly = list(readings)
+        self._hourly_unsaved = True
+        self.has_readings = bool(self._hourly)
+
+    @classmethod
+    def load_readings(cls, forecasts) -> None:
+        forecasts = [forecast for forecast in forecasts if forecast._hourly is None]
+        if not forecasts:
+            return
+
+        fetches = {}
+        for forecast in forecasts:
+            key = (forecast.latitude, forecast.longitude, forecast.readings_prepared_at)
+            start, end = fetches.get(key, (forecast.start_time, forecast.end_time))
+            fetches[key] = (min(start, forecast.start_time), max(end, forecast.end_time))
+
+        matches_a_fetch = models.Q()
+        for (latitude, longitude, prepared_at), (start, end) in fetches.items():
+            matches_a_fetch |= models.Q(
+                latitude=latitude, longitude=longitude, prepared_at=prepared_at, hour__range=(start, end),
+            )
+
+        readings_by_fetch = {}
+        for reading in ForecastReading.objects.filter(matches_a_fetch).order_by('hour'):
+            key = (reading.latitude, reading.longitude, reading.prepared_at)
+            readings_by_fetch.setdefault(key, []).append(reading)
+
+        for forecast in forecasts:
+            key = (forecast.latitude, forecast.longitude, forecast.readings_prepared_at)
+            forecast._hourly = [
+                reading.as_entry() for reading in readings_by_fetch.get(key, [])
+                if forecast.start_time <= reading.hour <= forecast.end_time
+            ]
+
+    def save(self, *args, **kwargs):
+        if self.readings_prepared_at is None:
+            self.readings_prepared_at = self.prepared_at
+
+        if not self._state.adding or not self.has_readings:
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                self._take_over_as_current()
+                super().save(*args, **kwargs)
+
+        if self._hourly_unsaved:
+            ForecastReading.objects.bulk_create(
+                [
+                    ForecastReading(
+                        latitude=self.latitude,
+                        longitude=self.longitude,
+                        prepared_at=self.readings_prepared_at,
+                        hour=datetime.fromisoformat(entry['time']),
+                        condition=entry['condition'],
+                        temperature=entry['temperature'],
+                        aqhi=entry['aqhi'],
+                    )
+                    for entry in self._hourly
+                ],
+                # Windows cut from the same fetch share hours; the first one to be saved stores them
+                ignore_conflicts=True,
+            )
+            self._hourly_unsaved = False
+
+    def _take_over_as_current(self) -> None:
+        window = Forecast.objects.for_window(self.latitude, self.longitude, self.start_time, self.end_time).current()
+        if window.filter(prepared_at__gt=self.prepared_at).exists():
+            return
+        window.update(is_current=False)
+        self.is_current = True
 
     @staticmethod
     def format_aqhi(value: int) -> str:
@@ -627,6 +797,62 @@ class Forecast(models.Model):
         return f'({self.latitude}, {self.longitude}) from {self.start_time} to {self.end_time}'
 
 
+class ForecastReading(models.Model):
+    latitude = models.DecimalField(
+        max_digits=8,
+        decimal_places=5,
+        help_text='Latitude of the forecast location.'
+    )
+
+    longitude = models.DecimalField(
+        max_digits=8,
+        decimal_places=5,
+        help_text='Longitude of the forecast location.'
+    )
+
+    prepared_at = models.DateTimeField(
+        help_text='When the fetch this reading came from was made.'
+    )
+
+    hour = models.DateTimeField(
+        help_text='Hour the reading is for, always at the top of the hour.'
+    )
+
+    condition = models.CharField(
+        max_length=16,
+        choices=Forecast.Condition,
+    )
+
+    temperature = models.SmallIntegerField(
+        help_text='Temperature in Celsius.'
+    )
+
+    aqhi = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text='Air Quality Health Index, or null when air quality data was not yet available for that hour.'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['latitude', 'longitude', 'prepared_at', 'hour'],
+                name='forecastreading_fetch_hour_unique',
+            ),
+        ]
+
+    def as_entry(self) -> dict:
+        return {
+            'time': self.hour.astimezone(dt_timezone.utc).isoformat(),
+            'condition': self.condition,
+            'temperature': self.temperature,
+            'aqhi': self.aqhi,
+        }
+
+    def __str__(self):
+        return f'({self.latitude}, {self.longitude}) at {self.hour} prepared {self.prepared_at}'
+
+
 class SpeedRange(models.Model):
     lower_limit = models.IntegerField()
     upper_limit = models.IntegerField(blank=True, null=True)
@@ -685,6 +911,73 @@ class Ride(models.Model):
         ordering = ['ordering']
 
 
+class EventStats(models.Model):
+    event = models.OneToOneField(
+        Event,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+
+    confirmed_registration_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of confirmed registrations for the event.'
+    )
+
+    ride_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of rides offered at the event.'
+    )
+
+    min_distance = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text='Shortest route distance in kilometers across the rides, ignoring routes without a distance.'
+    )
+
+    max_distance = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text='Longest route distance in kilometers across the rides, ignoring routes without a distance.'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text='When these figures were last recomputed.'
+    )
+
+    class Meta:
+        verbose_name_plural = 'event stats'
+
+    def __str__(self):
+        return f'Stats for {self.event}'
+
+
+class UserRideStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ride_stats',
+    )
+
+    confirmed_ride_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of events, cancelled ones aside, the user has a confirmed registration for.'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text='When this figure was last recomputed.'
+    )
+
+    class Meta:
+        verbose_name_plural = 'user ride stats'
+
+    def __str__(self):
+        return f'Ride stats for {self.user}'
+
+
 class UserProfile(models.Model):
     class NameVisibility(models.TextChoices):
         PUBLIC = 'pb', 'Everyone'
@@ -746,6 +1039,12 @@ class UserProfile(models.Model):
         default=NameVisibility.PUBLIC,
     )
 
+    calendar_feed_key = models.CharField(
+        max_length=32,
+        blank=True,
+        help_text='Part of the personal calendar feed link. Changing it revokes existing links.',
+    )
+
     updated_at = models.DateTimeField(
         auto_now=True,
     )
@@ -856,12 +1155,14 @@ class Registration(models.Model):
     STATE_SUBMITTED = 'submitted'
     STATE_UNVERIFIED = 'unverified'
     STATE_CONFIRMED = 'confirmed'
+    STATE_WAITLISTED = 'waitlisted'
     STATE_WITHDRAWN = 'withdrawn'
 
     STATE_CHOICES = [
         (STATE_SUBMITTED, 'Submitted'),
         (STATE_UNVERIFIED, 'Unverified'),
         (STATE_CONFIRMED, 'Confirmed'),
+        (STATE_WAITLISTED, 'Waitlisted'),
         (STATE_WITHDRAWN, 'Withdrawn'),
     ]
 
@@ -913,15 +1214,19 @@ class Registration(models.Model):
     def hold_for_verification(self):
         pass
 
-    @transition(field=state, source=[STATE_SUBMITTED, STATE_UNVERIFIED], target=STATE_CONFIRMED)
+    @transition(field=state, source=[STATE_SUBMITTED, STATE_UNVERIFIED, STATE_WAITLISTED], target=STATE_CONFIRMED)
     def confirm(self):
         self.confirmed_at = timezone.now()
 
+    @transition(field=state, source=[STATE_SUBMITTED, STATE_UNVERIFIED], target=STATE_WAITLISTED)
+    def waitlist(self):
+        pass
+
     @property
     def is_ride_leader(self):
         return self.ride_leader_preference == Registration.RideLeaderPreference.YES
 
-    @transition(field=state, source=[STATE_CONFIRMED, STATE_UNVERIFIED], target=STATE_WITHDRAWN)
+    @transition(field=state, source=[STATE_CONFIRMED, STATE_UNVERIFIED, STATE_WAITLISTED], target=STATE_WITHDRAWN)
     def withdraw(self):
         self.withdrawn_at = timezone.now()
 
@@ -1146,3 +1451,147 @@ class Announcement(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class EventNotification(models.Model):
+    KIND_CANCELLED = 'cancelled'
+    KIND_RESCHEDULED = 'rescheduled'
+
+    KIND_CHOICES = [
+        (KIND_CANCELLED, 'Cancelled'),
+        (KIND_RESCHEDULED, 'Rescheduled'),
+    ]
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+    )
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+
+    reason = models.TextField(
+        blank=True,
+        help_text='Cancellation or reschedule reason quoted in the email.'
+    )
+
+    base_url = models.CharField(
+        max_length=255,
+        help_text='Scheme and host used for links in the email.'
+    )
+
+    recipient_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of confirmed registrants at the time the notification was started.'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.get_kind_display()} notification for {self.event}'
+
+
+class OutboundEmail(models.Model):
+    MAX_ATTEMPTS = 5
+
+    # How long a worker may hold a claimed message before another worker may take it over
+    SENDING_LEASE = timedelta(minutes=10)
+
+    STATE_PENDING = 'pending'
+    STATE_SENDING = 'sending'
+    STATE_SENT = 'sent'
+    STATE_FAILED = 'failed'
+
+    STATE_CHOICES = [
+        (STATE_PENDING, 'Pending'),
+        (STATE_SENDING, 'Sending'),
+        (STATE_SENT, 'Sent'),
+        (STATE_FAILED, 'Failed'),
+    ]
+
+    state = FSMField(
+        default=STATE_PENDING,
+        choices=STATE_CHOICES,
+        protected=True,
+        help_text='Delivery state of the message.'
+    )
+
+    idempotency_key = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text='Identifies the message across retries; queueing the same key twice sends once.'
+    )
+
+    subject = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(help_text='List of recipient email addresses.')
+    text_body = models.TextField()
+    html_body = models.TextField()
+
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text='Number of delivery attempts made so far.'
+    )
+
+    last_error = models.TextField(
+        blank=True,
+        help_text='Error from the most recent failed delivery attempt.'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text='Earliest time the next delivery attempt may be made.'
+    )
+
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    notification = models.ForeignKey(
+        EventNotification,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='emails',
+        help_text='Event notification this message was sent for, if any.'
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['state', 'next_attempt_at'], name='outboundemail_due_idx'),
+        ]
+
+    @transition(field=state, source=[STATE_PENDING, STATE_SENDING], target=STATE_SENDING)
+    def claim(self):
+        # Claiming a message that is already sending takes over a lease its worker let expire
+        self.attempts += 1
+        self.next_attempt_at = timezone.now() + self.SENDING_LEASE
+
+    @transition(field=state, source=STATE_SENDING, target=STATE_SENT)
+    def mark_sent(self):
+        self.sent_at = timezone.now()
+        self.last_error = ''
+        self.clear_bodies()
+
+    def record_failure(self, error: str):
+        self.last_error = error
+        if self.attempts >= self.MAX_ATTEMPTS:
+            self.give_up()
+        else:
+            self.retry()
+
+    @transition(field=state, source=STATE_SENDING, target=STATE_PENDING)
+    def retry(self):
+        self.next_attempt_at = timezone.now() + timedelta(minutes=2 ** self.attempts)
+
+    @transition(field=state, source=STATE_SENDING, target=STATE_FAILED)
+    def give_up(self):
+        self.clear_bodies()
+
+    def clear_bodies(self):
+        # Bodies can carry sign-in and verification links; keep them only while they may still be sent
+        self.text_body = ''
+        self.html_body = ''
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)}"
@@ -0,0 +1,73 @@
+import secrets
+import uuid
+
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+
+from backoffice.models import UserProfile
+
+CALENDAR_FEED_SALT = 'backoffice.calendar-feed'
+EVENT_FEED_VERSION_KEY = 'event-feed-version'
+
+
+def _version(key: str) -> str:
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+class CalendarFeedService:
+    def token_for(self, user: User) -> str:
+        profile = user.profile
+        if not profile.calendar_feed_key:
+            # Only set if still blank, so two first requests agree on one key
+            self._write_key(profile, calendar_feed_key='')
+        return signing.Signer(salt=CALENDAR_FEED_SALT).sign_object([user.pk, profile.calendar_feed_key], compress=True)
+
+    def user_for(self, token: str) -> User | None:
+        try:
+            user_id, key = signing.Signer(salt=CALENDAR_FEED_SALT).unsign_object(token)
+        except (signing.BadSignature, TypeError, ValueError):
+            return None
+
+        return User.objects.filter(
+            pk=user_id,
+            is_active=True,
+            profile__calendar_feed_key=key,
+        ).exclude(profile__calendar_feed_key='').first()
+
+    def revoke(self, user: User) -> None:
+        self._write_key(user.profile)
+
+    def version(self, user_id: int) -> str:
+        return _version(self._version_key(user_id))
+
+    def bump(self, user_ids) -> None:
+        cache.set_many({self._version_key(user_id): uuid.uuid4().hex for user_id in user_ids}, timeout=None)
+
+    def feed_key(self, user: User) -> str:
+        return f'calendar-feed:{user.pk}:{self.version(user.pk)}:{timezone.localdate().isoformat()}'
+
+    def event_feed_version(self) -> str:
+        """Version of the public event feed; only event and program changes move it."""
+        return _version(EVENT_FEED_VERSION_KEY)
+
+    def bump_event_feed(self) -> None:
+        cache.set(EVENT_FEED_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+    @staticmethod
+    def _write_key(profile: UserProfile, **unless_changed) -> None:
+        # Updated in place rather than saved: a profile save clears the roster of every
+        # event the user is registered for, and the feed key is never shown on one
+        UserProfile.objects.filter(pk=profile.pk, **unless_changed).update(
+            calendar_feed_key=secrets.token_hex(16), updated_at=timezone.now(),
+        )
+        profile.refresh_from_db(fields=['calendar_feed_key', 'updated_at'])
+
+    @staticmethod
+    def _version_key(user_id: int) -> str:
+        return f'calendar-feed-version:{user_id}'
@@ -1,14 +1,31 @@
-from typing import List, Optional, Dict, Any
+import logging
+import uuid
+from datetime import timedelta
+from typing import Iterable, List, Optional, Dict, Any, Tuple
 
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import get_template
+from django.utils import timezone
+
+from backoffice.models import EventNotification, OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_BATCH_SIZE = 50
+
+PRUNABLE_STATES = (OutboundEmail.STATE_SENT, OutboundEmail.STATE_FAILED)
 
 
 class EmailService:
     """
     Service for sending emails using templates.
     All email content should be defined in templates instead of hardcoded strings.
+
+    Emails are not sent in the request: send_email renders the message and writes it to the
+    OutboundEmail outbox as part of the caller's transaction, and deliver_pending sends queued
+    messages from a Celery worker.
     """
 
     def send_email(
@@ -18,9 +35,10 @@ class EmailService:
             subject: str,
             recipient_list: List[str],
             from_email: Optional[str] = None,
-    ) -> None:
+            idempotency_key: Optional[str] = None,
+    ) -> OutboundEmail:
         """
-        Send an email using a template.
+        Queue an email rendered from a template for delivery.
 
         Args:
             template_name: The name of the template to use (relative to templates/email/)
@@ -28,16 +46,69 @@ class EmailService:
             subject: The subject of the email (will be prefixed with [OBC] if not already)
             recipient_list: List of recipient email addresses
             from_email: The from email address (defaults to settings.EMAIL_FROM)
+            idempotency_key: Identifies the message; queueing an existing key again is a no-op.
+                Defaults to a random key, so every call sends a new message.
+        """
+        html_template, text_template = self._templates(template_name)
+        subject, from_email = self._envelope(subject, from_email)
+
+        message, _ = OutboundEmail.objects.get_or_create(
+            idempotency_key=idempotency_key or uuid.uuid4().hex,
+            defaults={
+                'subject': subject,
+                'from_email': from_email,
+                'to': list(recipient_list),
+                'text_body': text_template.render(context),
+                'html_body': html_template.render(context),
+            },
+        )
+
+        self._schedule_delivery()
+        return message
+
+    def queue_many(
+            self,
+            template_name: str,
+            shared_context: Dict[str, Any],
+            subject: str,
+            messages: Iterable[Tuple[str, Dict[str, Any], List[str]]],
+            notification: Optional[EventNotification] = None,
+    ) -> int:
         """
+        Queue one email per (idempotency_key, context, recipient_list) without scheduling delivery.
+
+        The templates are loaded once and each message's context is layered over shared_context.
+        Keys that are already queued are skipped, so re-running a batch does not duplicate it.
+        """
+        html_template, text_template = self._templates(template_name)
+        subject, from_email = self._envelope(subject, None)
+
+        rows = []
+        for idempotency_key, context, recipient_list in messages:
+            context = {**shared_context, **context}
+            rows.append(OutboundEmail(
+                idempotency_key=idempotency_key,
+                subject=subject,
+                from_email=from_email,
+                to=list(recipient_list),
+                text_body=text_template.render(context),
+                html_body=html_template.render(context),
+                notification=notification,
+            ))
+
+        OutboundEmail.objects.bulk_create(rows, ignore_conflicts=True)
+        return len(rows)
+
+    @staticmethod
+    def _templates(template_name: str):
         # Get the template name without extension
         template_base = template_name.rsplit('.', 1)[0]
 
-        # Render the HTML template with the provided context
-        html_message = render_to_string(f'email/{template_base}.html', context)
-
-        # Also render a plain text version as fallback
-        text_message = render_to_string(f'email/{template_base}.txt', context)
+        # Plain text version is the fallback for the HTML one
+        return get_template(f'email/{template_base}.html'), get_template(f'email/{template_base}.txt')
 
+    @staticmethod
+    def _envelope(subject: str, from_email: Optional[str]) -> Tuple[str, str]:
         # Use default from email if not provided
         if from_email is None:
             from_email = f"Ottawa Bicycle Club <{settings.EMAIL_FROM}>"
@@ -46,13 +117,110 @@ class EmailService:
         if not subject.startswith("[OBC]"):
             subject = f"[OBC] {subject}"
 
-        # Always use EmailMultiAlternatives to send multipart MIME emails
+        return subject, from_email
+
+    @staticmethod
+    def _schedule_delivery() -> None:
+        from backoffice.tasks import deliver_outbound_emails
+
+        if settings.EMAIL_OUTBOX_DELIVER_ON_COMMIT:
+            # Broker failures are logged rather than raised; the periodic sweep picks the message up.
+            transaction.on_commit(deliver_outbound_emails.delay, robust=True)
+        else:
+            deliver_outbound_emails.delay()
+
+    def deliver_pending(self, batch_size: int = DELIVERY_BATCH_SIZE,
+                        notification: Optional[EventNotification] = None) -> int:
+        """
+        Send due outbox messages over a single SMTP connection and return how many were sent.
+        When notification is given, only that notification's messages are sent.
+
+        Messages are claimed batch_size at a time in a short transaction that marks them sending,
+        and are sent after it commits, so no row lock is held while talking to the mail server.
+        Batches are claimed until nothing is due.
+        """
+        sent = 0
+        attempted = 0
+        connection = None
+        try:
+            while batch := self._claim(batch_size, notification):
+                if connection is None:
+                    connection = get_connection()
+                    try:
+                        connection.open()
+                    except Exception as e:
+                        logger.warning('Could not open email connection for %s queued messages: %s', len(batch), e)
+                        for message in batch:
+                            message.record_failure(str(e))
+                            message.save()
+                        return 0
+
+                attempted += len(batch)
+                for message in batch:
+                    if self._deliver(message, connection):
+                        sent += 1
+        finally:
+            if connection is not None:
+                connection.close()
+
+        if attempted:
+            logger.info('Delivered %s of %s queued emails', sent, attempted)
+        return sent
+
+    @staticmethod
+    def _claim(batch_size: int, notification: Optional[EventNotification]) -> List[OutboundEmail]:
+        # Sending rows are due again once their lease runs out, i.e. their worker died mid-batch
+        due = OutboundEmail.objects.filter(
+            state__in=[OutboundEmail.STATE_PENDING, OutboundEmail.STATE_SENDING],
+            next_attempt_at__lte=timezone.now(),
+        )
+        if notification is not None:
+            due = due.filter(notification=notification)
+
+        with transaction.atomic():
+            rows = list(due.select_for_update(skip_locked=True).order_by('created_at', 'pk')[:batch_size])
+            batch = []
+            for message in rows:
+                if message.attempts >= OutboundEmail.MAX_ATTEMPTS:
+                    message.give_up()
+                else:
+                    message.claim()
+                    batch.append(message)
+            OutboundEmail.objects.bulk_update(rows, ['state', 'attempts', 'next_attempt_at', 'text_body', 'html_body'])
+
+        return batch
+
+    def prune(self, now=None) -> int:
+        """Delete sent and failed outbox messages older than the retention period."""
+        cutoff = (now or timezone.now()) - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+        pruned, _ = OutboundEmail.objects.filter(state__in=PRUNABLE_STATES, created_at__lt=cutoff).delete()
+        if pruned:
+            logger.info('Pruned %s delivered or failed emails from the outbox', pruned)
+        return pruned
+
+    @staticmethod
+    def _deliver(message: OutboundEmail, connection) -> bool:
         email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_message,
-            from_email=from_email,
-            to=recipient_list,
+            subject=message.subject,
+            body=message.text_body,
+            from_email=message.from_email,
+            to=message.to,
+            headers={'Message-ID': f'<{message.idempotency_key}@{settings.WEB_HOST}>'},
+            connection=connection,
         )
-        # Attach the HTML version as an alternative
-        email.attach_alternative(html_message, "text/html")
-        email.send()
+        email.attach_alternative(message.html_body, "text/html")
+
+        try:
+            email.send()
+        except Exception as e:
+            message.record_failure(str(e))
+            message.save()
+            logger.warning(
+                'Delivery attempt %s of email %s to %s failed: %s',
+                message.attempts, message.id, message.to, e,
+            )
+            return False
+
+        message.mark_sent()
+        message.save()
+        return True
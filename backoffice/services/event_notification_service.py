@@ -0,0 +1,92 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from backoffice.models import Event, EventNotification, Registration
+from backoffice.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_CHUNK_SIZE = 50
+
+NOTIFICATION_EMAILS = {
+    EventNotification.KIND_CANCELLED: ('event_cancelled', 'RIDE CANCELLED', 'cancellation_reason'),
+    EventNotification.KIND_RESCHEDULED: ('event_rescheduled', 'RIDE RESCHEDULED', 'reschedule_reason'),
+}
+
+
+class EventNotificationService:
+    def __init__(self):
+        self.email_service = EmailService()
+
+    def notify_registrants(self, event: Event, kind: str, reason: str, base_url: str) -> EventNotification:
+        registration_ids = list(
+            event.registration_set.filter(state=Registration.STATE_CONFIRMED)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+        notification = EventNotification.objects.create(
+            event=event,
+            kind=kind,
+            reason=reason,
+            base_url=base_url,
+            recipient_count=len(registration_ids),
+        )
+
+        chunks = [
+            registration_ids[start:start + NOTIFICATION_CHUNK_SIZE]
+            for start in range(0, len(registration_ids), NOTIFICATION_CHUNK_SIZE)
+        ]
+        self._schedule_chunks(notification, chunks)
+
+        logger.info(
+            'Started %s notification %s for event %s (id=%d): %s registrants in %s chunks',
+            kind, notification.id, event.name, event.id, len(registration_ids), len(chunks),
+        )
+        return notification
+
+    @staticmethod
+    def _schedule_chunks(notification: EventNotification, chunks: list[list[int]]) -> None:
+        from backoffice.tasks import send_event_notification_chunk
+
+        def enqueue():
+            for chunk in chunks:
+                send_event_notification_chunk.delay(notification.id, chunk)
+
+        if settings.EMAIL_OUTBOX_DELIVER_ON_COMMIT:
+            transaction.on_commit(enqueue, robust=True)
+        else:
+            enqueue()
+
+    def send_chunk(self, notification_id: int, registration_ids: list[int]) -> int:
+        notification = EventNotification.objects.select_related('event').get(pk=notification_id)
+        event = notification.event
+        template_name, subject_prefix, reason_key = NOTIFICATION_EMAILS[notification.kind]
+
+        shared_context = {
+            'event': event,
+            reason_key: notification.reason,
+            'base_url': notification.base_url,
+        }
+
+        registrations = Registration.objects.filter(
+            pk__in=registration_ids,
+            state=Registration.STATE_CONFIRMED,
+        ).order_by('pk')
+
+        self.email_service.queue_many(
+            template_name=template_name,
+            shared_context=shared_context,
+            subject=f'{subject_prefix} {event.name}',
+            messages=(
+                (f'event-notification-{notification.id}-{registration.pk}', {'registration': registration},
+                 [registration.email])
+                for registration in registrations
+            ),
+            notification=notification,
+        )
+
+        return self.email_service.deliver_pending(batch_size=len(registration_ids), notification=notification)
+
@@ -0,0 +1,86 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, QuerySet, Value
+from django.db.models.expressions import RawSQL
+
+from backoffice.models import Event, Program
+from backoffice.utils import search_document
+
+SEARCH_CONFIG = 'english'
+
+_POSTGRES_DOCUMENT = f"to_tsvector('{SEARCH_CONFIG}', backoffice_event.search_document)"
+_POSTGRES_QUERY = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+
+
+class EventSearchService:
+    """
+    Full-text search over Event.search_document.
+
+    On PostgreSQL the document is matched through a GIN tsvector index, with a trigram index
+    catching partial words and typos. On SQLite (development) it is matched through the
+    backoffice_event_fts FTS5 table, which index and remove keep in step with the events.
+    """
+
+    def filter(self, queryset: QuerySet[Event], query: str) -> QuerySet[Event]:
+        """Restrict queryset to events matching query, annotated with search_rank (higher is better)."""
+        if connection.vendor == 'postgresql':
+            return queryset.filter(
+                RawSQL(
+                    f'{_POSTGRES_DOCUMENT} @@ {_POSTGRES_QUERY} OR %s <%% backoffice_event.search_document',
+                    [query, query],
+                    output_field=BooleanField(),
+                ),
+            ).annotate(
+                search_rank=RawSQL(
+                    f'ts_rank({_POSTGRES_DOCUMENT}, {_POSTGRES_QUERY}) '
+                    f'+ word_similarity(%s, backoffice_event.search_document)',
+                    [query, query],
+                    output_field=FloatField(),
+                ),
+            )
+
+        match = self._fts5_match(query)
+        if not match:
+            return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+        return queryset.filter(
+            pk__in=RawSQL('SELECT rowid FROM backoffice_event_fts WHERE backoffice_event_fts MATCH %s', [match]),
+        ).annotate(
+            search_rank=RawSQL(
+                'SELECT -bm25(backoffice_event_fts) FROM backoffice_event_fts '
+                'WHERE backoffice_event_fts MATCH %s AND rowid = backoffice_event.id',
+                [match],
+                output_field=FloatField(),
+            ),
+        )
+
+    def index(self, event: Event) -> None:
+        if connection.vendor != 'sqlite':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM backoffice_event_fts WHERE rowid = %s', [event.pk])
+            cursor.execute(
+                'INSERT INTO backoffice_event_fts (rowid, search_document) VALUES (%s, %s)',
+                [event.pk, event.search_document],
+            )
+
+    def remove(self, event_id: int) -> None:
+        if connection.vendor != 'sqlite':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM backoffice_event_fts WHERE rowid = %s', [event_id])
+
+    def refresh_for_program(self, program: Program) -> int:
+        events = list(Event.objects.filter(program=program))
+        for event in events:
+            event.search_document = search_document(event.name, program.name, event.location, event.description)
+        Event.objects.bulk_update(events, ['search_document'])
+        for event in events:
+            self.index(event)
+        return len(events)
+
+    @staticmethod
+    def _fts5_match(query: str) -> str:
+        # Quote every word so user input cannot use FTS5 syntax, and match prefixes like icontains did
+        return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
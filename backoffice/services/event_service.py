@@ -1,15 +1,19 @@
 import logging
 from datetime import date, datetime, timedelta
 
-from django.db.models import Count, Max, Min, Q, QuerySet
+from django.db.models import F, Q, QuerySet, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
-from backoffice.models import Event, Forecast, Registration, Ride
-from backoffice.services.email_service import EmailService
-from backoffice.services.forecast_service import FORECAST_WINDOW, ForecastService, YOW_LOCATION
+from backoffice.models import Event, EventNotification, Forecast, Ride
+from backoffice.services.event_notification_service import EventNotificationService
+from backoffice.services.event_search_service import EventSearchService
+from backoffice.services.forecast_service import FORECAST_WINDOW, ForecastService, forecast_cell
 
 logger = logging.getLogger(__name__)
 
+PAST_SEARCH_LIMIT = 20
+
 
 class EventService:
     def fetch_events(self, include_archived: bool = False, only_visible: bool = True) -> QuerySet[Event]:
@@ -27,14 +31,10 @@ class EventService:
 
     def _with_listing_stats(self, queryset: QuerySet[Event]) -> QuerySet[Event]:
         return queryset.annotate(
-            annotated_registration_count=Count(
-                'registration',
-                filter=Q(registration__state=Registration.STATE_CONFIRMED),
-                distinct=True,
-            ),
-            annotated_ride_count=Count('ride', distinct=True),
-            annotated_min_distance=Min('ride__route__distance', filter=Q(ride__route__distance__gt=0)),
-            annotated_max_distance=Max('ride__route__distance', filter=Q(ride__route__distance__gt=0)),
+            annotated_registration_count=Coalesce(F('stats__confirmed_registration_count'), Value(0)),
+            annotated_ride_count=Coalesce(F('stats__ride_count'), Value(0)),
+            annotated_min_distance=F('stats__min_distance'),
+            annotated_max_distance=F('stats__max_distance'),
         )
 
     def fetch_upcoming_events(self, include_archived: bool = False, only_visible: bool = True,
@@ -47,7 +47,26 @@ class EventService:
         if program_id is not None:
             qs = qs.filter(program_id=program_id)
         if query:
-            qs = qs.filter(Q(name__icontains=query) | Q(program__name__icontains=query)).distinct()
+            # Best matches first within each day; the listing is still grouped by date
+            qs = EventSearchService().filter(qs, query).order_by('starts_at__date', '-search_rank', 'starts_at')
+        return qs
+
+    def search_past_events(self, query: str, current_date: date | None = None,
+                           limit: int = PAST_SEARCH_LIMIT) -> QuerySet[Event]:
+        current_date = current_date or timezone.localdate()
+        qs = self.fetch_events(include_archived=True, only_visible=False).exclude(
+            state=Event.STATE_DRAFT,
+        ).filter(starts_at__date__lt=current_date).select_related('program')
+        return EventSearchService().filter(qs, query).order_by('-search_rank', '-starts_at')[:limit]
+
+    def fetch_events_between(self, first_day: date, last_day: date, program_id: int | None = None,
+                             include_archived: bool = False, only_visible: bool = True) -> QuerySet[Event]:
+        qs = self.fetch_events(include_archived, only_visible).filter(
+            starts_at__gte=timezone.make_aware(datetime.combine(first_day, datetime.min.time())),
+            starts_at__lt=timezone.make_aware(datetime.combine(last_day + timedelta(days=1), datetime.min.time())),
+        )
+        if program_id is not None:
+            qs = qs.filter(program_id=program_id)
         return qs
 
     def fetch_events_for_month(self, year: int, month: int, include_archived: bool = False,
@@ -69,7 +88,7 @@ class EventService:
         if program_id is not None:
             qs = qs.filter(program_id=program_id)
         if query:
-            qs = qs.filter(Q(name__icontains=query) | Q(program__name__icontains=query)).distinct()
+            qs = EventSearchService().filter(qs, query)
         return qs
 
     def duplicate_event(self, source_event: Event, new_name: str, new_date: date) -> Event:
@@ -94,6 +113,8 @@ class EventService:
             state=new_state,
             location=source_event.location,
             location_url=source_event.location_url,
+            latitude=source_event.latitude,
+            longitude=source_event.longitude,
             starts_at=new_starts_at,
             ends_at=new_ends_at,
             registration_closes_at=new_registration_closes_at,
@@ -131,29 +152,16 @@ class EventService:
         return event
 
     def notify_registrants_of_reschedule(self, event: Event, base_url: str) -> int:
-        registrations = event.registration_set.filter(state=Registration.STATE_CONFIRMED)
-
-        notified = 0
-        for registration in registrations:
-            context = {
-                'event': event,
-                'registration': registration,
-                'reschedule_reason': event.reschedule_reason,
-                'base_url': base_url,
-            }
-
-            EmailService().send_email(
-                template_name='event_rescheduled',
-                context=context,
-                subject=f'RIDE RESCHEDULED {event.name}',
-                recipient_list=[registration.email],
-            )
-            notified += 1
-
-        return notified
+        notification = EventNotificationService().notify_registrants(
+            event,
+            EventNotification.KIND_RESCHEDULED,
+            reason=event.reschedule_reason,
+            base_url=base_url,
+        )
+        return notification.recipient_count
 
-    def fetch_events_within_forecast_horizon(self) -> QuerySet[Event]:
-        now = timezone.now()
+    def fetch_events_within_forecast_horizon(self, now: datetime | None = None) -> QuerySet[Event]:
+        now = now or timezone.now()
         return self.fetch_events().filter(
             virtual=False,
             starts_at__gt=now,
@@ -184,10 +192,27 @@ class EventService:
 
         return len({forecast.pk for forecast in forecasts_by_window.values() if forecast})
 
+    def forecast_refresh_deadlines(self, now: datetime | None = None) -> list[datetime]:
+        now = now or timezone.now()
+        events = self.fetch_events_within_forecast_horizon(now)
+        deadlines = ForecastService().refresh_deadlines(self._windows_by_event_id(events).values(), now)
+
+        # The next event to come within range is due the moment it does
+        entering = self.fetch_events().filter(
+            virtual=False,
+            starts_at__gt=now + FORECAST_WINDOW,
+        ).values_list('starts_at', flat=True).first()
+        if entering:
+            deadlines.append(entering - FORECAST_WINDOW)
+
+        return sorted(deadlines)
+
     @staticmethod
     def _windows_by_event_id(events) -> dict:
         return {
-            event.id: (event.starts_at, event.starts_at + event.duration)
+            event.id: (
+                event.starts_at, event.starts_at + event.duration, forecast_cell(event.latitude, event.longitude)
+            )
             for event in events
             if not event.virtual
         }
@@ -195,9 +220,9 @@ class EventService:
     def fetch_forecast_history(self, event: Event) -> QuerySet:
         if event.virtual:
             return Forecast.objects.none()
-        latitude, longitude = YOW_LOCATION
+        cell = forecast_cell(event.latitude, event.longitude)
         return ForecastService().get_forecast_history(
-            latitude, longitude, event.starts_at, event.starts_at + event.duration
+            cell.latitude, cell.longitude, event.starts_at, event.starts_at + event.duration
         )
 
     def _copy_rides(self, source_event: Event, target_event: Event) -> None:
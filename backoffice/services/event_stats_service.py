@@ -0,0 +1,96 @@
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, Min, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from backoffice.models import Event, EventStats, Registration, Ride
+
+logger = logging.getLogger(__name__)
+
+
+def _per_event(queryset: QuerySet, aggregate) -> Subquery:
+    return Subquery(
+        queryset.filter(event_id=OuterRef('event_id'))
+        .order_by()
+        .values('event_id')
+        .annotate(value=aggregate)
+        .values('value')[:1],
+        output_field=IntegerField(),
+    )
+
+
+def _confirmed_count_expression() -> Coalesce:
+    return Coalesce(
+        _per_event(Registration.objects.filter(state=Registration.STATE_CONFIRMED), Count('pk')),
+        Value(0),
+    )
+
+
+def _ride_expressions() -> dict:
+    distances = Ride.objects.filter(route__distance__gt=0)
+    return {
+        'ride_count': Coalesce(_per_event(Ride.objects.all(), Count('pk')), Value(0)),
+        'min_distance': _per_event(distances, Min('route__distance')),
+        'max_distance': _per_event(distances, Max('route__distance')),
+    }
+
+
+class EventStatsService:
+    def ensure(self, event: Event) -> EventStats:
+        stats, _ = EventStats.objects.get_or_create(event=event)
+        return stats
+
+    def claim_seat(self, event: Event) -> bool:
+        """
+        Lock the event's stats row and report whether a seat is free. Call inside the
+        transaction that confirms the registration: the confirmation's save takes the
+        seat, and the lock holds concurrent claims off until it commits.
+        """
+        if event.registration_limit is None:
+            return True
+        self.ensure(event)
+        stats = EventStats.objects.select_for_update().get(event_id=event.id)
+        return stats.confirmed_registration_count < event.registration_limit
+
+    def count_confirmation(self, event_id: int, change: int) -> None:
+        """Move the confirmed count as a registration enters (+1) or leaves (-1) the confirmed state."""
+        stats = EventStats.objects.filter(event_id=event_id)
+        if change < 0:
+            stats = stats.filter(confirmed_registration_count__gte=-change)
+        stats.update(
+            confirmed_registration_count=F('confirmed_registration_count') + change,
+            updated_at=timezone.now(),
+        )
+
+    def refresh(self, event_id: int) -> int:
+        return self._refresh(EventStats.objects.filter(event_id=event_id))
+
+    def refresh_for_route(self, route_id: int) -> int:
+        return self._refresh(EventStats.objects.filter(event__ride__route_id=route_id))
+
+    def rebuild(self) -> int:
+        with transaction.atomic():
+            missing = Event.objects.filter(stats__isnull=True).values_list('pk', flat=True)
+            EventStats.objects.bulk_create(
+                [EventStats(event_id=event_id) for event_id in missing],
+                ignore_conflicts=True,
+            )
+            # Recounting confirmations while a claim is in flight would hand its seat out
+            # again, so wait out any open claims before counting
+            list(EventStats.objects.select_for_update().values_list('pk', flat=True))
+            rebuilt = EventStats.objects.update(
+                updated_at=timezone.now(),
+                confirmed_registration_count=_confirmed_count_expression(),
+                **_ride_expressions(),
+            )
+
+        logger.info('Rebuilt listing stats for %s events', rebuilt)
+        return rebuilt
+
+    @staticmethod
+    def _refresh(queryset: QuerySet[EventStats]) -> int:
+        # The confirmed count is only ever moved by count_confirmation; recomputing it
+        # here could overwrite a seat claimed by a transaction that hasn't committed
+        return queryset.update(updated_at=timezone.now(), **_ride_expressions())
@@ -0,0 +1,112 @@
+import logging
+from datetime import datetime
+from functools import reduce
+from operator import or_
+from typing import NamedTuple
+
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from backoffice.models import Forecast, ForecastReading
+
+logger = logging.getLogger(__name__)
+
+DELETE_BATCH_SIZE = 500
+
+# Rough on-disk width of a row where the database cannot measure one (SQLite):
+# the fields plus row and index overhead.
+ESTIMATED_ROW_BYTES = {
+    Forecast: 160,
+    ForecastReading: 120,
+}
+
+
+class CompactionResult(NamedTuple):
+    forecasts: int
+    readings: int
+    bytes: int
+
+
+class ForecastCompactionService:
+    def compact(self, now: datetime | None = None, batch_size: int = DELETE_BATCH_SIZE) -> CompactionResult:
+        now = now or timezone.now()
+        deleted_forecasts = deleted_readings = reclaimed_bytes = 0
+
+        candidates = self._immaterial_revisions(now)
+        while batch := list(candidates[:batch_size]):
+            forecasts, readings, size = self._delete(batch, batch_size)
+            deleted_forecasts += forecasts
+            deleted_readings += readings
+            reclaimed_bytes += size
+
+        logger.info(
+            'Compacted forecast history: removed %s revisions and %s hourly readings, about %s bytes',
+            deleted_forecasts, deleted_readings, reclaimed_bytes,
+        )
+        return CompactionResult(deleted_forecasts, deleted_readings, reclaimed_bytes)
+
+    @staticmethod
+    def _immaterial_revisions(now: datetime) -> QuerySet[Forecast]:
+        # Upcoming and ongoing windows keep every revision. Of a window that has ended,
+        # only revisions that did not change the badge go, and never the current one.
+        return Forecast.objects.filter(
+            end_time__lt=now, material=False, is_current=False,
+        ).only('latitude', 'longitude', 'readings_prepared_at').order_by('pk')
+
+    def _delete(self, forecasts: list[Forecast], batch_size: int) -> tuple[int, int, int]:
+        forecast_ids = [forecast.pk for forecast in forecasts]
+        fetches = {
+            (forecast.latitude, forecast.longitude, forecast.readings_prepared_at)
+            for forecast in forecasts
+        }
+
+        # Short transactions, one per batch, so the task never holds locks across the
+        # whole history and the hourly refresh is never kept waiting on it.
+        with transaction.atomic():
+            size = self._stored_bytes(Forecast, forecast_ids)
+            deleted_forecasts, _ = Forecast.objects.filter(pk__in=forecast_ids).delete()
+
+        deleted_readings = 0
+        reading_ids = self._orphaned_reading_ids(fetches)
+        for offset in range(0, len(reading_ids), batch_size):
+            batch = reading_ids[offset:offset + batch_size]
+            with transaction.atomic():
+                size += self._stored_bytes(ForecastReading, batch)
+                deleted, _ = ForecastReading.objects.filter(pk__in=batch).delete()
+            deleted_readings += deleted
+
+        return deleted_forecasts, deleted_readings, size
+
+    @staticmethod
+    def _orphaned_reading_ids(fetches: set) -> list[int]:
+        # A fetch's readings are shared by every window cut from it; an hour is orphaned
+        # once no remaining window from that fetch covers it.
+        orphaned = []
+        for latitude, longitude, prepared_at in fetches:
+            remaining = Forecast.objects.filter(
+                latitude=latitude, longitude=longitude, readings_prepared_at=prepared_at,
+            ).values_list('start_time', 'end_time')
+            readings = ForecastReading.objects.filter(
+                latitude=latitude, longitude=longitude, prepared_at=prepared_at,
+            )
+            if remaining:
+                readings = readings.exclude(reduce(
+                    or_, (Q(hour__range=(start, end)) for start, end in remaining)
+                ))
+            orphaned.extend(readings.values_list('pk', flat=True))
+        return orphaned
+
+    @staticmethod
+    def _stored_bytes(model, ids: list[int]) -> int:
+        if not ids:
+            return 0
+        if connection.vendor != 'postgresql':
+            return len(ids) * ESTIMATED_ROW_BYTES[model]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COALESCE(SUM(pg_column_size(t.*)), 0) FROM {model._meta.db_table} t WHERE t.id = ANY(%s)',
+                [ids],
+            )
+            return cursor.fetchone()[0]
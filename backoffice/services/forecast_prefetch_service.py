@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from backoffice.models import Event
+from backoffice.services.event_service import EventService
+from backoffice.services.forecast_service import Cell, forecast_cell, within_forecast_range
+
+
+# A burst of edits within this long of the first is covered by one prefetch
+PREFETCH_DELAY_SECONDS = 10
+
+# How long a queued prefetch holds its cell; if the job is lost the cell frees
+# itself after this and the next edit queues another
+PREFETCH_PENDING_SECONDS = 60
+
+VISIBLE_STATES = (Event.STATE_ANNOUNCED, Event.STATE_LIVE)
+
+
+def pending_key(cell: Cell) -> str:
+    return f'forecast-prefetch:{cell.latitude}:{cell.longitude}'
+
+
+class ForecastPrefetchService:
+    def request(self, event: Event) -> None:
+        """
+        Queue a forecast fetch for the event's cell shortly after the current
+        transaction commits, unless one is already queued for that cell.
+        """
+        if event.virtual or event.state not in VISIBLE_STATES:
+            return
+        if not within_forecast_range(event.starts_at, timezone.now()):
+            return
+
+        cell = forecast_cell(event.latitude, event.longitude)
+
+        def queue():
+            from backoffice.tasks import prefetch_forecasts
+
+            if cache.add(pending_key(cell), True, timeout=PREFETCH_PENDING_SECONDS):
+                prefetch_forecasts.apply_async(
+                    args=[str(cell.latitude), str(cell.longitude)], countdown=PREFETCH_DELAY_SECONDS,
+                )
+
+        # Broker failures are logged rather than raised; the scheduled refresh picks the event up.
+        transaction.on_commit(queue, robust=True)
+
+    def prefetch(self, latitude: Decimal, longitude: Decimal) -> int:
+        cell = forecast_cell(latitude, longitude)
+        # Cleared before fetching, so an edit landing mid-fetch queues a follow-up
+        cache.delete(pending_key(cell))
+
+        service = EventService()
+        events = [
+            event for event in service.fetch_events_within_forecast_horizon()
+            if forecast_cell(event.latitude, event.longitude) == cell
+        ]
+        if not events:
+            return 0
+        return service.refresh_forecasts(events)
+
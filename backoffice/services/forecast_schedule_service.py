@@ -0,0 +1,66 @@
+import logging
+import math
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from backoffice.services.event_service import EventService
+
+logger = logging.getLogger(__name__)
+
+NEXT_REFRESH_CACHE_KEY = 'forecast-refresh:next'
+
+# Windows falling due within this long of the earliest one wait for it and share its
+# fetch, rather than each waking the worker a few minutes apart
+COALESCE_WITHIN = timedelta(minutes=5)
+
+# Anything still due straight after a run is there because its fetch failed
+RETRY_AFTER = timedelta(minutes=15)
+
+# The Redis broker redelivers a task whose ETA is further out than its visibility
+# timeout (an hour by default), so a distant deadline is reached in hops
+MAX_SCHEDULE_AHEAD = timedelta(minutes=55)
+
+
+def coalesced_deadline(deadlines: list[datetime]) -> datetime | None:
+    if not deadlines:
+        return None
+    first = min(deadlines)
+    return max(deadline for deadline in deadlines if deadline <= first + COALESCE_WITHIN)
+
+
+class ForecastScheduleService:
+    def schedule_next(self, now: datetime | None = None) -> datetime | None:
+        """
+        Queue the next refresh_forecasts run for when the earliest window falls due.
+        Returns when the next run is expected, or None if it could not be queued.
+
+        A run already queued for no later than that is left to do the work, so the
+        beat safety net and the self-scheduled chain do not multiply each other.
+        """
+        from backoffice.tasks import refresh_forecasts
+
+        now = now or timezone.now()
+        deadline = coalesced_deadline(EventService().forecast_refresh_deadlines(now))
+        if deadline is None:
+            eta = now + MAX_SCHEDULE_AHEAD
+        elif deadline <= now:
+            eta = now + RETRY_AFTER
+        else:
+            eta = min(deadline, now + MAX_SCHEDULE_AHEAD)
+
+        scheduled = cache.get(NEXT_REFRESH_CACHE_KEY)
+        if scheduled is not None and now < scheduled <= eta:
+            return scheduled
+
+        try:
+            refresh_forecasts.apply_async(eta=eta)
+        except Exception:
+            # The beat safety net restarts the chain
+            logger.exception('Could not schedule the next forecast refresh')
+            return None
+
+        cache.set(NEXT_REFRESH_CACHE_KEY, eta, timeout=math.ceil((eta - now).total_seconds()) + 60)
+        logger.info('Next forecast refresh scheduled for %s', eta)
+        return eta
@@ -1,25 +1,32 @@
 import logging
 import math
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone as datetime_timezone
 from decimal import Decimal
-from functools import reduce
+from functools import cached_property
 from itertools import count, takewhile
-from operator import or_
 from typing import NamedTuple
 
+import numpy as np
 import requests
-from django.db.models import Q, QuerySet
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import QuerySet
 from django.utils import timezone
 
 from backoffice.models import Forecast
+from backoffice.services.forecast_client import REQUEST_TIMEOUT_SECONDS, ForecastClient
+from backoffice.services.forecast_summary import is_material, stored_summary, summarize, summary_record
 
 logger = logging.getLogger(__name__)
 
 YOW_LOCATION = (Decimal('45.32250'), Decimal('-75.66920'))
 
+COORDINATE_PLACES = Decimal('0.00001')
+
+FETCH_LOCK_SECONDS = 30
+
 FORECAST_WINDOW = timedelta(days=7)
-REQUEST_TIMEOUT_SECONDS = 3
-REQUESTS_PER_WINDOW = 2
 
 REFRESH_INTERVAL_MIN_HOURS = 1
 REFRESH_INTERVAL_MAX_HOURS = 12
@@ -27,35 +34,78 @@ REFRESH_LEAD_MIN_HOURS = 24
 REFRESH_LEAD_MAX_HOURS = 168
 STALE_AFTER_INTERVALS = 2
 
-# A run fetches its windows one after another, and prepared_at is stamped once a
-# window's requests come back, so a stored forecast is always younger than the
-# run's clock by however long the run took to reach it. due_from allows for that
-# lag; without it a window is perpetually a fraction short of its interval and
-# waits for the run after next.
+# A run downloads each cell's payloads once and then stores every due window in
+# it, and prepared_at is stamped when the payloads come back, so a stored forecast
+# is younger than the run's clock by however long the run took to reach and fetch
+# its cell. due_from allows for that lag; without it a window is perpetually a
+# fraction short of its interval and waits for the run after next.
 #
-# Worst case is every window timing out on both requests:
-#   REQUEST_TIMEOUT_SECONDS * REQUESTS_PER_WINDOW * EXPECTED_REFRESH_RUN_WINDOWS
-# doubled, to leave room for more events than we see today. Raise the window
-# count if the season grows well past it. Any value here well under
-# REFRESH_INTERVAL_MIN_HOURS keeps a second run from refetching what the first
-# one just stored.
-EXPECTED_REFRESH_RUN_WINDOWS = 10
-MAX_REFRESH_RUN_DURATION = 2 * timedelta(
-    seconds=REQUEST_TIMEOUT_SECONDS * REQUESTS_PER_WINDOW * EXPECTED_REFRESH_RUN_WINDOWS
-)
+# Cells are fetched one after another, and within a cell the two feeds are
+# requested concurrently, so the lag of the last cell is at worst one
+# REQUEST_TIMEOUT_SECONDS per cell, doubled to leave room for storing the windows.
+# The allowance is capped well under REFRESH_INTERVAL_MIN_HOURS, so a second run
+# never refetches what the first one just stored.
+MAX_CELL_FETCH_DURATION = 2 * timedelta(seconds=REQUEST_TIMEOUT_SECONDS)
+MAX_REFRESH_RUN_DURATION = timedelta(hours=REFRESH_INTERVAL_MIN_HOURS) / 4
+
+# Windows looked up per query; SQLite allows at most 500 terms in a compound SELECT
+CURRENT_LOOKUP_BATCH_SIZE = 200
 
 NO2_UG_M3_PER_PPB = 1.88
 O3_UG_M3_PER_PPB = 1.96
 
-WEATHER_URL = 'https://api.open-meteo.com/v1/forecast'
-AIR_QUALITY_URL = 'https://air-quality-api.open-meteo.com/v1/air-quality'
-
 
 class Window(NamedTuple):
     start: datetime
     end: datetime
 
 
+class Cell(NamedTuple):
+    latitude: Decimal
+    longitude: Decimal
+
+
+DEFAULT_CELL = Cell(*YOW_LOCATION)
+
+
+class Payload(NamedTuple):
+    weather: 'HourlySeries'
+    air_quality: 'HourlySeries'
+    prepared_at: datetime
+
+
+def forecast_cell(latitude: Decimal | None, longitude: Decimal | None) -> Cell:
+    # The grid is anchored on the default location, so events without coordinates
+    # and those within half a cell of it share its forecasts
+    if latitude is None or longitude is None:
+        return DEFAULT_CELL
+    size = Decimal(settings.FORECAST_GRID_CELL_DEGREES)
+
+    def snap(value, anchor):
+        return (anchor + ((value - anchor) / size).to_integral_value() * size).quantize(COORDINATE_PLACES)
+
+    return Cell(
+        min(Decimal(90), max(Decimal(-90), snap(Decimal(latitude), DEFAULT_CELL.latitude))),
+        snap(Decimal(longitude), DEFAULT_CELL.longitude),
+    )
+
+
+@contextmanager
+def cell_fetch_lock(cell: Cell):
+    # Short-lived, so a crashed run holds the cell for seconds at most
+    key = f'forecast-fetch:{cell.latitude}:{cell.longitude}'
+    acquired = cache.add(key, True, timeout=FETCH_LOCK_SECONDS)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            cache.delete(key)
+
+
+def cell_of(window: tuple) -> Cell:
+    return window[2] if len(window) > 2 else DEFAULT_CELL
+
+
 def snap_to_hour(value: datetime) -> datetime:
     return value.replace(minute=0, second=0, microsecond=0)
 
@@ -113,32 +163,39 @@ def usable(forecast: Forecast | None, window: Window, now: datetime) -> Forecast
     return forecast
 
 
-def due_from(window_start: datetime, now: datetime) -> datetime:
-    return min(now, window_start) - refresh_interval(window_start, now) + MAX_REFRESH_RUN_DURATION
+def refresh_run_duration(cells: int) -> timedelta:
+    return min(max(cells, 1) * MAX_CELL_FETCH_DURATION, MAX_REFRESH_RUN_DURATION)
 
 
-def due(forecast: Forecast | None, window: Window, now: datetime) -> bool:
-    return forecast is None or forecast.prepared_at < due_from(window.start, now)
+def due_from(window_start: datetime, now: datetime, cells: int = 1) -> datetime:
+    return min(now, window_start) - refresh_interval(window_start, now) + refresh_run_duration(cells)
 
 
-def hour_key(time: datetime) -> str:
-    return time.astimezone(datetime_timezone.utc).strftime('%Y-%m-%dT%H:%M')
+def due(forecast: Forecast | None, window: Window, now: datetime, cells: int = 1) -> bool:
+    return forecast is None or forecast.prepared_at < due_from(window.start, now, cells)
 
 
-def indexed_hours(data: dict, window: Window) -> list[tuple[datetime, int]]:
-    index_by_key = {key: index for index, key in enumerate(data['hourly']['time'])}
-    available = takewhile(lambda hour: hour_key(hour) in index_by_key, hours_in(window))
-    return [
-        (hour.astimezone(datetime_timezone.utc), index_by_key[hour_key(hour)])
-        for hour in available
-    ]
+def next_due_at(forecast: Forecast | None, window: Window, now: datetime, cells: int = 1) -> datetime | None:
+    if due(forecast, window, now, cells):
+        return now
+
+    # due_from only moves forward as time passes, so the first second at which the
+    # window is due can be found by bisection. A window not due by its start is never
+    # refetched.
+    low, high = 0, math.floor((window.start - now).total_seconds()) - 1
+    if high < 0 or not due(forecast, window, now + timedelta(seconds=high), cells):
+        return None
+    while high - low > 1:
+        middle = (low + high) // 2
+        if due(forecast, window, now + timedelta(seconds=middle), cells):
+            high = middle
+        else:
+            low = middle
+    return now + timedelta(seconds=high)
 
 
-def series_values(data: dict, field: str, indexes: list[int]) -> list:
-    values = [data['hourly'][field][index] for index in indexes]
-    if any(value is None for value in values):
-        raise ValueError(f'Missing {field} data in forecast window')
-    return values
+def parse_hour(key: str) -> datetime:
+    return datetime.strptime(key, '%Y-%m-%dT%H:%M').replace(tzinfo=datetime_timezone.utc)
 
 
 def condition_from_weather_code(code: int) -> str:
@@ -182,16 +239,102 @@ def compute_aqhi(hourly: dict, hour_index: int) -> int | None:
     return min(11, max(1, round(aqhi)))
 
 
-def aqhi_by_hour(air_quality_data: dict, window: Window) -> dict:
+def _pollutant_array(values: list, length: int) -> np.ndarray:
+    if len(values) < length:
+        raise IndexError('Pollutant series is shorter than its hours')
+    return np.array(
+        [value if isinstance(value, (int, float)) else np.nan for value in values[:length]],
+        dtype=float,
+    )
+
+
+def _trailing(values: np.ndarray, hours: int) -> np.ndarray:
+    return np.concatenate((np.zeros(hours, dtype=values.dtype), values[:len(values) - hours]))
+
+
+def aqhi_series(hourly: dict) -> list[int | None]:
+    """
+    compute_aqhi for every hour of a feed in one pass. The trailing sums add the
+    same hours in the same order, so each hour comes out identical to compute_aqhi.
+    """
+    length = len(hourly['time'])
+    pm25, no2, o3 = (
+        _pollutant_array(hourly[field], length)
+        for field in ('pm2_5', 'nitrogen_dioxide', 'ozone')
+    )
+    complete = ~(np.isnan(pm25) | np.isnan(no2) | np.isnan(o3))
+    counts = _trailing(complete, 2).astype(int) + _trailing(complete, 1) + complete
+
+    def trailing_mean(values):
+        masked = np.where(complete, values, 0.0)
+        totals = _trailing(masked, 2) + _trailing(masked, 1) + masked
+        return np.divide(totals, counts, out=np.zeros(length), where=counts > 0)
+
+    pm25, no2, o3 = trailing_mean(pm25), trailing_mean(no2), trailing_mean(o3)
+    with np.errstate(over='ignore'):
+        aqhi = (10 / 10.4) * 100 * (
+            (np.exp(0.000871 * (no2 / NO2_UG_M3_PER_PPB)) - 1)
+            + (np.exp(0.000537 * (o3 / O3_UG_M3_PER_PPB)) - 1)
+            + (np.exp(0.000487 * pm25) - 1)
+        )
+    rounded = np.clip(np.rint(aqhi), 1, 11)
+    return [int(value) if count else None for value, count in zip(rounded, counts)]
+
+
+class HourlySeries:
+    """
+    One Open-Meteo hourly feed. Hours are addressed by their offset from the first
+    one, and anything derived from the whole feed is worked out once and shared by
+    every window stored from it.
+    """
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    @cached_property
+    def _span(self) -> tuple[datetime | None, int]:
+        times = self.data['hourly']['time']
+        if not times:
+            return None, 0
+        start = parse_hour(times[0])
+        if parse_hour(times[-1]) != start + (len(times) - 1) * timedelta(hours=1):
+            raise ValueError('Forecast hours are not consecutive')
+        return start, len(times)
+
+    @cached_property
+    def aqhi(self) -> list[int | None]:
+        return aqhi_series(self.data['hourly'])
+
+    def indexed_hours(self, window: Window) -> list[tuple[datetime, int]]:
+        start, length = self._span
+        if start is None:
+            return []
+        first, remainder = divmod(window.start - start, timedelta(hours=1))
+        if remainder:
+            return []
+        indexed = (
+            (hour.astimezone(datetime_timezone.utc), first + offset)
+            for offset, hour in enumerate(hours_in(window))
+        )
+        return list(takewhile(lambda entry: 0 <= entry[1] < length, indexed))
+
+    def values(self, field: str, indexes: list[int]) -> list:
+        values = [self.data['hourly'][field][index] for index in indexes]
+        if any(value is None for value in values):
+            raise ValueError(f'Missing {field} data in forecast window')
+        return values
+
+
+def aqhi_by_hour(air_quality: HourlySeries, window: Window) -> dict:
     readings = (
-        (hour, compute_aqhi(air_quality_data['hourly'], index))
-        for hour, index in indexed_hours(air_quality_data, window)
+        (hour, air_quality.aqhi[index])
+        for hour, index in air_quality.indexed_hours(window)
     )
     return {hour: aqhi for hour, aqhi in readings if aqhi is not None}
 
 
-def weather_by_hour(weather_data: dict, window: Window) -> dict:
-    hours = indexed_hours(weather_data, window)
+def weather_by_hour(weather: HourlySeries, window: Window) -> dict:
+    hours = weather.indexed_hours(window)
     if not hours:
         raise ValueError(f'No forecast data available between {window.start} and {window.end}')
 
@@ -200,8 +343,8 @@ def weather_by_hour(weather_data: dict, window: Window) -> dict:
         hour: (condition_from_weather_code(int(code)), round(temperature))
         for (hour, _), code, temperature in zip(
             hours,
-            series_values(weather_data, 'weather_code', indexes),
-            series_values(weather_data, 'temperature_2m', indexes),
+            weather.values('weather_code', indexes),
+            weather.values('temperature_2m', indexes),
         )
     }
 
@@ -218,13 +361,10 @@ def hourly_readings(weather: dict, aqhi: dict) -> list[dict]:
     ]
 
 
-def _get_json(url: str, params: dict) -> dict:
-    response = requests.get(url, params=params, timeout=REQUEST_TIMEOUT_SECONDS)
-    response.raise_for_status()
-    return response.json()
-
-
 class ForecastService:
+    def __init__(self, client: ForecastClient | None = None):
+        self.client = client or ForecastClient()
+
     def refresh_forecast(self, latitude: Decimal, longitude: Decimal, starts_at, ends_at=None,
                          now=None) -> Forecast | None:
         now = now or timezone.now()
@@ -233,35 +373,76 @@ class ForecastService:
         return self._fetch_and_store(latitude, longitude, window_for(starts_at, ends_at, now))
 
     def refresh_forecasts_for_windows(self, windows, now=None) -> dict:
+        """
+        Fetch every requested window that is due and return the usable forecast for
+        each. A window is (starts_at, ends_at), optionally followed by the Cell it is
+        forecast for; each distinct cell is fetched at most once.
+        """
         now = now or timezone.now()
-        latitude, longitude = YOW_LOCATION
 
-        requested = [(window, window_for(window[0], window[1], now)) for window in windows]
+        requested = [(window, (cell_of(window), window_for(window[0], window[1], now))) for window in windows]
         if not requested:
             return {}
 
-        latest = self._latest_by_window({snapped for _, snapped in requested}, now)
+        keys = {key for _, key in requested}
+        latest = self._current_by_window(keys)
 
+        # Every cell in range may be fetched this run, and the allowance has to cover the last
+        cells = len({key[0] for window, key in requested if within_forecast_range(window[0], now)})
         overdue = dict.fromkeys(
-            snapped for window, snapped in requested
-            if due(latest.get(snapped), snapped, now) and within_forecast_range(window[0], now)
+            key for window, key in requested
+            if due(latest.get(key), key[1], now, cells) and within_forecast_range(window[0], now)
         )
-        fetched = {
-            snapped: self._fetch_and_store(latitude, longitude, snapped)
-            for snapped in overdue
-        }
+        fetched = {}
+        for cell in dict.fromkeys(cell for cell, _ in overdue):
+            if self.client.circuit_open:
+                logger.warning('Open-Meteo circuit is open, skipping the remaining forecast cells')
+                break
+            with cell_fetch_lock(cell) as acquired:
+                if not acquired:
+                    logger.info('Forecast cell (%s, %s) is being fetched by another run, skipping', *cell)
+                    continue
+                # Another run may have stored this cell between the first lookup and the lock
+                cell_keys = {key for key in overdue if key[0] == cell}
+                latest.update(self._current_by_window(cell_keys))
+                cell_keys = {key for key in cell_keys if due(latest.get(key), key[1], now, cells)}
+                if not cell_keys:
+                    continue
+                payload = self._fetch_payload(*cell)
+                fetched.update({
+                    key: self._store(*cell, key[1], payload, latest.get(key)) if payload else None
+                    for key in cell_keys
+                })
 
         logger.info(
-            'Refreshed %s of %s distinct forecast windows, %s not yet due',
+            'Refreshed %s of %s distinct forecast windows across %s cells, %s not yet due',
             len([forecast for forecast in fetched.values() if forecast]),
-            len({snapped for _, snapped in requested}),
-            len({snapped for _, snapped in requested} - set(overdue)),
+            len(keys),
+            len({cell for cell, _ in keys}),
+            len(keys - set(overdue)),
         )
 
-        return {
-            window: fetched.get(snapped) or usable(latest.get(snapped), snapped, now)
-            for window, snapped in requested
+        forecasts = {
+            window: fetched.get(key) or usable(latest.get(key), key[1], now)
+            for window, key in requested
         }
+        return forecasts
+
+    def refresh_deadlines(self, windows, now=None) -> list[datetime]:
+        now = now or timezone.now()
+
+        keys = {
+            (cell_of(window), window_for(window[0], window[1], now))
+            for window in windows
+            if within_forecast_range(window[0], now)
+        }
+        if not keys:
+            return []
+
+        latest = self._current_by_window(keys)
+        cells = len({cell for cell, _ in keys})
+        deadlines = (next_due_at(latest.get(key), key[1], now, cells) for key in keys)
+        return sorted(deadline for deadline in deadlines if deadline is not None)
 
     def get_forecast(self, starts_at, ends_at=None) -> Forecast | None:
         window = (starts_at, ends_at or starts_at + timedelta(hours=1))
@@ -270,35 +451,40 @@ class ForecastService:
     def get_forecasts_for_windows(self, windows, now=None) -> dict:
         now = now or timezone.now()
 
-        snapped_by_window = {
-            window: window_for(window[0], window[1], now) for window in windows
+        key_by_window = {
+            window: (cell_of(window), window_for(window[0], window[1], now)) for window in windows
         }
-        if not snapped_by_window:
+        if not key_by_window:
             return {}
 
-        latest = self._latest_by_window(set(snapped_by_window.values()), now)
+        latest = self._current_by_window(set(key_by_window.values()))
 
         return {
-            window: usable(latest.get(snapped), snapped, now)
-            for window, snapped in snapped_by_window.items()
+            window: usable(latest.get(key), key[1], now)
+            for window, key in key_by_window.items()
         }
 
     @staticmethod
-    def _latest_by_window(windows: set, now: datetime) -> dict:
-        latitude, longitude = YOW_LOCATION
-        matches_a_window = reduce(
-            or_, (Q(start_time=window.start, end_time=window.end) for window in windows)
-        )
-
-        candidates = Forecast.objects.with_readings().filter(
-            matches_a_window,
-            latitude=latitude,
-            longitude=longitude,
-            prepared_at__gte=min(usable_from(window.start, now) for window in windows),
-        ).order_by('prepared_at')
+    def _current_by_window(keys: set) -> dict:
+        # One equality probe of forecast_current_window_idx per (cell, window), sent as a
+        # UNION ALL so each branch is an index lookup rather than one OR the planner
+        # scans; whether the row is still usable is for the caller to decide
+        probes = [
+            Forecast.objects.current().for_window(cell.latitude, cell.longitude, window.start, window.end)
+            for cell, window in keys
+        ]
+
+        candidates = []
+        for start in range(0, len(probes), CURRENT_LOOKUP_BATCH_SIZE):
+            first, *rest = probes[start:start + CURRENT_LOOKUP_BATCH_SIZE]
+            candidates.extend(first.union(*rest, all=True))
+
+        # A window can briefly have two current rows if two runs store it at once; the
+        # newer one wins
+        candidates.sort(key=lambda forecast: forecast.prepared_at)
 
         return {
-            Window(forecast.start_time, forecast.end_time): forecast
+            (Cell(forecast.latitude, forecast.longitude), Window(forecast.start_time, forecast.end_time)): forecast
             for forecast in candidates
         }
 
@@ -311,49 +497,80 @@ class ForecastService:
             start_time=window.start, end_time=window.end,
         ).order_by('-prepared_at')
 
+    def backfill_summaries(self) -> int:
+        windows = Forecast.objects.filter(summary__isnull=True).values_list(
+            'latitude', 'longitude', 'start_time', 'end_time',
+        ).distinct()
+
+        summarized = 0
+        for latitude, longitude, start_time, end_time in windows:
+            revisions = list(Forecast.objects.with_readings().filter(
+                latitude=latitude, longitude=longitude, start_time=start_time, end_time=end_time,
+            ).order_by('prepared_at'))
+            Forecast.load_readings(revisions)
+
+            previous = None
+            for forecast in revisions:
+                summary = summarize(forecast)
+                forecast.summary = summary_record(summary)
+                forecast.material = is_material(summary, previous)
+                previous = summary
+            Forecast.objects.bulk_update(revisions, ['summary', 'material'], batch_size=500)
+            summarized += len(revisions)
+        return summarized
+
     def _fetch_and_store(self, latitude: Decimal, longitude: Decimal,
                          window: Window) -> Forecast | None:
+        payload = self._fetch_payload(latitude, longitude)
+        if payload is None:
+            return None
+        key = (Cell(latitude, longitude), window)
+        previous = self._current_by_window({key}).get(key)
+        return self._store(latitude, longitude, window, payload, previous)
+
+    def _fetch_payload(self, latitude: Decimal, longitude: Decimal) -> Payload | None:
+        try:
+            weather, air_quality = self.client.fetch(latitude, longitude)
+            return Payload(
+                weather=HourlySeries(weather),
+                air_quality=HourlySeries(air_quality),
+                prepared_at=timezone.now(),
+            )
+        except (requests.RequestException, ValueError) as e:
+            logger.warning('Forecast fetch failed for (%s, %s): %s', latitude, longitude, e)
+            return None
+
+    @staticmethod
+    def _store(latitude: Decimal, longitude: Decimal, window: Window,
+               payload: Payload, previous: Forecast | None) -> Forecast | None:
         try:
             readings = hourly_readings(
-                weather_by_hour(self._weather_data(latitude, longitude), window),
-                aqhi_by_hour(self._air_quality_data(latitude, longitude), window),
+                weather_by_hour(payload.weather, window),
+                aqhi_by_hour(payload.air_quality, window),
             )
-        except (requests.RequestException, KeyError, ValueError, IndexError, TypeError) as e:
+        except (KeyError, ValueError, IndexError, TypeError) as e:
             logger.warning(
-                'Forecast fetch failed for (%s, %s) from %s to %s: %s',
+                'Forecast data unusable for (%s, %s) from %s to %s: %s',
                 latitude, longitude, window.start, window.end, e,
             )
             return None
 
-        forecast = Forecast.objects.create(
+        forecast = Forecast(
             latitude=latitude,
             longitude=longitude,
             start_time=window.start,
             end_time=window.end,
+            prepared_at=payload.prepared_at,
             hourly=readings,
         )
+        # Forecasts never change once stored, so the badge and whether it moved since the
+        # previous revision are worked out once here rather than on every render
+        summary = summarize(forecast)
+        forecast.summary = summary_record(summary)
+        forecast.material = is_material(summary, stored_summary(previous) if previous else None)
+        forecast.save()
         logger.info(
             'Stored forecast %s for %s to %s with %s hourly readings',
             forecast.id, window.start, window.end, len(forecast.hourly),
         )
         return forecast
-
-    @staticmethod
-    def _weather_data(latitude: Decimal, longitude: Decimal) -> dict:
-        return _get_json(WEATHER_URL, {
-            'latitude': str(latitude),
-            'longitude': str(longitude),
-            'hourly': 'weather_code,temperature_2m',
-            'timezone': 'UTC',
-            'forecast_days': 8,
-        })
-
-    @staticmethod
-    def _air_quality_data(latitude: Decimal, longitude: Decimal) -> dict:
-        return _get_json(AIR_QUALITY_URL, {
-            'latitude': str(latitude),
-            'longitude': str(longitude),
-            'hourly': 'pm2_5,nitrogen_dioxide,ozone',
-            'timezone': 'UTC',
-            'forecast_days': 7,
-        })
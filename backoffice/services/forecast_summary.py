@@ -1,5 +1,5 @@
 from collections import Counter
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
 
 from backoffice.models import Forecast
@@ -40,11 +40,15 @@ class ForecastSummary:
     aqhi_warning_category: str | None
     aqhi_visible: bool
     aria_label: str
-    hourly: list[HourlyReading]
+    # Only on a summary computed from the readings; a stored one leaves them to hourly_readings()
+    hourly: list[HourlyReading] | None = None
+
+
+STORED_FIELDS = [field.name for field in fields(ForecastSummary) if field.name != 'hourly']
 
 
 def summarize(forecast: Forecast) -> ForecastSummary:
-    hourly = [_reading(entry) for entry in forecast.hourly]
+    hourly = hourly_readings(forecast)
 
     condition_primary = _prevalent_condition(hourly)
     condition_warning = _condition_warning(hourly, condition_primary)
@@ -76,6 +80,48 @@ def summarize(forecast: Forecast) -> ForecastSummary:
     )
 
 
+def hourly_readings(forecast: Forecast) -> list[HourlyReading]:
+    return [_reading(entry) for entry in forecast.hourly]
+
+
+def summary_record(summary: ForecastSummary) -> dict:
+    return {name: getattr(summary, name) for name in STORED_FIELDS}
+
+
+def stored_summary(forecast: Forecast) -> ForecastSummary | None:
+    record = forecast.summary
+    if record is None:
+        # Stored before summaries were; summarizeforecasts fills these in
+        return summarize(forecast) if forecast.has_readings else None
+    return ForecastSummary(**{
+        **record,
+        'condition_primary': Condition(record['condition_primary']),
+        'condition_warning': Condition(record['condition_warning']) if record['condition_warning'] else None,
+    })
+
+
+def badge_key(summary: ForecastSummary | None) -> tuple | None:
+    if summary is None:
+        return None
+    return (
+        summary.condition_primary,
+        summary.condition_warning,
+        summary.temperature_display,
+        summary.aqhi_category if summary.aqhi_visible else None,
+        summary.aqhi_warning_category,
+    )
+
+
+def is_material(summary: ForecastSummary | None, previous: ForecastSummary | None) -> bool:
+    return previous is None or badge_key(summary) != badge_key(previous)
+
+
+def material_flags(forecasts: list[Forecast]) -> list[bool]:
+    # Revisions newest first. The newest is always shown; older ones when their badge
+    # differed from the revision before them, as recorded when they were stored.
+    return [index == 0 or forecast.material for index, forecast in enumerate(forecasts)]
+
+
 def _reading(entry: dict) -> HourlyReading:
     aqhi = entry['aqhi']
     return HourlyReading(
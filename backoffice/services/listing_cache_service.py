@@ -0,0 +1,26 @@
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.utils import timezone
+
+LISTING_VERSION_KEY = 'listing-version'
+
+
+class ListingCacheService:
+    def version(self) -> str:
+        version = cache.get(LISTING_VERSION_KEY)
+        if version is None:
+            cache.add(LISTING_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(LISTING_VERSION_KEY)
+        return version
+
+    def bump(self) -> None:
+        cache.set(LISTING_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+    def page_key(self, path: str, query: str, announcement_ids=()) -> str:
+        # Announcements start and end by the clock rather than by a save, so the ones
+        # showing are part of the key instead of a reason to bump the version
+        announcements = ','.join(str(announcement_id) for announcement_id in sorted(announcement_ids))
+        digest = hashlib.sha256(f'{path}?q={query}&announcements={announcements}'.encode()).hexdigest()
+        return f'listing-page:{self.version()}:{timezone.localdate().isoformat()}:{digest}'
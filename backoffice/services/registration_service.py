@@ -8,13 +8,15 @@ from enum import Enum
 from django.contrib.auth.models import User
 from django.core.signing import TimestampSigner, BadSignature, SignatureExpired
 from django.db import models, transaction
-from django.db.models import QuerySet, Subquery, OuterRef, Count
+from django.db.models import Q, QuerySet, Subquery, OuterRef
 from django.utils import timezone
 
 from audit.services import AuditService
 from backoffice.models import Event, Registration, RegistrationSnapshot, SpeedRange, Ride, UserProfile
 from backoffice.services.email_service import EmailService
+from backoffice.services.event_stats_service import EventStatsService
 from backoffice.services.request_service import RequestDetail
+from backoffice.services.user_ride_stats_service import UserRideStatsService
 from backoffice.services.user_service import UserService, UserDetail
 from backoffice.utils import lower_email
 from ridehub import settings
@@ -53,9 +55,18 @@ def mask_name_with_dots(registration: 'Registration') -> tuple[str, str]:
 NAME_MASKING_STRATEGY = mask_name_with_dots
 
 
+ACTIVE_STATES = [
+    Registration.STATE_SUBMITTED,
+    Registration.STATE_CONFIRMED,
+    Registration.STATE_UNVERIFIED,
+    Registration.STATE_WAITLISTED,
+]
+
+
 class RegistrationResult(Enum):
     CONFIRMED = 'confirmed'
     VERIFICATION_REQUIRED = 'verification_required'
+    WAITLISTED = 'waitlisted'
     DUPLICATE = 'duplicate'
 
 
@@ -85,6 +96,7 @@ class RegistrationService:
         self.user_service = UserService()
         self.email_service = EmailService()
         self.audit_service = AuditService()
+        self.event_stats_service = EventStatsService()
 
     def _create_registration(self, event: Event, user: User, user_detail: UserDetail,
                              registration_detail: RegistrationDetail,
@@ -144,8 +156,73 @@ class RegistrationService:
             context=context,
             subject=f"Confirmed for {registration.event.name}",
             recipient_list=[registration.email],
+            idempotency_key=f"registration-{registration.id}-confirmed",
+        )
+
+    def _send_waitlisted_email(self, registration: Registration) -> None:
+        context = {
+            'base_url': f"https://{settings.WEB_HOST}",
+            'registration': registration,
+        }
+
+        self.email_service.send_email(
+            template_name='waitlisted',
+            context=context,
+            subject=f"Waitlisted for {registration.event.name}",
+            recipient_list=[registration.email],
+            idempotency_key=f"registration-{registration.id}-waitlisted",
         )
 
+    def _admit(self, registration: Registration) -> bool:
+        with transaction.atomic():
+            if self.event_stats_service.claim_seat(registration.event):
+                registration.confirm()
+            else:
+                registration.waitlist()
+            registration.save()
+
+        if registration.state == Registration.STATE_WAITLISTED:
+            logger.info(
+                "Event %s (id=%d) is at capacity, waitlisted registration %d for %s",
+                registration.event.name, registration.event.id, registration.id, registration.email,
+            )
+            self._send_waitlisted_email(registration)
+            return False
+
+        self._send_confirmation_email(registration)
+        return True
+
+    def _promote_from_waitlist(self, event: Event) -> Registration | None:
+        # A seat freed on a cancelled or finished event isn't worth a confirmation email
+        if event.cancelled or (event.ends_at or event.starts_at) <= timezone.now():
+            return None
+
+        with transaction.atomic():
+            candidate = Registration.objects.select_for_update().filter(
+                event=event,
+                state=Registration.STATE_WAITLISTED,
+            ).order_by('submitted_at', 'pk').first()
+
+            if candidate is None or not self.event_stats_service.claim_seat(event):
+                return None
+
+            candidate.confirm()
+            candidate.save()
+
+        logger.info(
+            "Promoted waitlisted registration %d for %s to confirmed for event %s (id=%d)",
+            candidate.id, candidate.email, event.name, event.id,
+        )
+        self._send_confirmation_email(candidate)
+        return candidate
+
+    def promote_from_waitlist(self, event: Event) -> int:
+        """Confirm waitlisted riders, oldest first, while the event has seats free."""
+        promoted = 0
+        while self._promote_from_waitlist(event) is not None:
+            promoted += 1
+        return promoted
+
     def _should_skip_verification(self, user: User, acting_user: User | None) -> bool:
         if acting_user is not None and acting_user.is_authenticated and acting_user.pk == user.pk:
             if not user.profile.email_verified:
@@ -196,28 +273,34 @@ class RegistrationService:
             return None, 'invalid'
 
         try:
-            registration = Registration.objects.select_related('user', 'user__profile').get(
+            registration = Registration.objects.select_related('event', 'user', 'user__profile').get(
                 id=int(registration_id),
                 state=Registration.STATE_UNVERIFIED,
             )
         except Registration.DoesNotExist:
             return None, 'not_found'
 
-        registration.confirm()
-        registration.save()
-
         user = registration.user
         user.profile.email_verified = True
         user.profile.save()
 
-        self._send_confirmation_email(registration)
+        self._admit(registration)
 
         return registration, None
 
+    def waitlist_position(self, registration: Registration) -> int:
+        """One-based place in the event's waitlist, in the order riders are promoted."""
+        return Registration.objects.filter(
+            Q(submitted_at__lt=registration.submitted_at)
+            | Q(submitted_at=registration.submitted_at, pk__lt=registration.pk),
+            event_id=registration.event_id,
+            state=Registration.STATE_WAITLISTED,
+        ).count() + 1
+
     def has_active_registration(self, user: User, event: Event) -> bool:
         return Registration.objects.filter(
             user=user, event=event,
-            state__in=[Registration.STATE_SUBMITTED, Registration.STATE_CONFIRMED, Registration.STATE_UNVERIFIED],
+            state__in=ACTIVE_STATES,
         ).exists()
 
     def register(self, user_detail: UserDetail, registration_detail: RegistrationDetail, event: Event,
@@ -239,10 +322,9 @@ class RegistrationService:
         registration = self._create_registration(event, user, user_detail, registration_detail, request_detail)
 
         if self._should_skip_verification(user, acting_user):
-            self._send_confirmation_email(registration)
-            registration.confirm()
-            registration.save()
-            return RegistrationResult.CONFIRMED
+            if self._admit(registration):
+                return RegistrationResult.CONFIRMED
+            return RegistrationResult.WAITLISTED
 
         registration.hold_for_verification()
         registration.save()
@@ -291,16 +373,7 @@ class RegistrationService:
         })
 
     def fetch_ride_counts(self, user_ids: list[int]) -> dict[int, int]:
-        rows = (
-            Registration.objects.filter(
-                user_id__in=user_ids,
-                state=Registration.STATE_CONFIRMED,
-            )
-            .exclude(event__state=Event.STATE_CANCELLED)
-            .values('user_id')
-            .annotate(count=Count('event', distinct=True))
-        )
-        return {row['user_id']: row['count'] for row in rows}
+        return UserRideStatsService().fetch_ride_counts(user_ids)
 
     def fetch_confirmed_event_ids(self, user: User, event_ids: list[int]) -> set[int]:
         return set(
@@ -325,7 +398,7 @@ class RegistrationService:
             user=user,
             event__starts_at__date__gte=today,
             event__state__in=[Event.STATE_LIVE, Event.STATE_CANCELLED],
-            state__in=[Registration.STATE_SUBMITTED, Registration.STATE_CONFIRMED],
+            state__in=[Registration.STATE_SUBMITTED, Registration.STATE_CONFIRMED, Registration.STATE_WAITLISTED],
             pk=Subquery(latest_pk_subquery)
         ).select_related('event', 'ride', 'speed_range_preference').order_by('event__starts_at')
 
@@ -406,6 +479,8 @@ class RegistrationService:
         if not allowed:
             raise ValueError(reason)
 
+        was_confirmed = registration.state == Registration.STATE_CONFIRMED
+
         registration.withdraw()
         registration.save()
 
@@ -419,8 +494,12 @@ class RegistrationService:
 
         self._send_withdrawal_email(registration, withdrawn_by_organizer=False)
 
+        if was_confirmed:
+            self._promote_from_waitlist(registration.event)
+
     def staff_withdraw(self, registration: Registration, staff_user) -> None:
-        if registration.state not in [Registration.STATE_CONFIRMED, Registration.STATE_UNVERIFIED]:
+        if registration.state not in [Registration.STATE_CONFIRMED, Registration.STATE_UNVERIFIED,
+                                      Registration.STATE_WAITLISTED]:
             raise ValueError(f"Cannot withdraw registration in state '{registration.state}'")
 
         was_confirmed = registration.state == Registration.STATE_CONFIRMED
@@ -438,6 +517,7 @@ class RegistrationService:
 
         if was_confirmed:
             self._send_withdrawal_email(registration)
+            self._promote_from_waitlist(registration.event)
 
     def staff_register(self, user_detail: UserDetail, registration_detail: RegistrationDetail,
                        event: Event, staff_user) -> Registration | None:
@@ -445,7 +525,7 @@ class RegistrationService:
 
         existing = Registration.objects.filter(
             user=user, event=event,
-            state__in=[Registration.STATE_SUBMITTED, Registration.STATE_CONFIRMED, Registration.STATE_UNVERIFIED]
+            state__in=ACTIVE_STATES,
         )
 
         if existing.exists():
@@ -568,8 +648,8 @@ class RegistrationService:
         return registrations
 
     def is_registration_withdrawable(self, registration: Registration) -> tuple[bool, str | None]:
-        if registration.state != Registration.STATE_CONFIRMED:
-            return False, 'Only confirmed registrations can be withdrawn.'
+        if registration.state not in (Registration.STATE_CONFIRMED, Registration.STATE_WAITLISTED):
+            return False, 'Only confirmed or waitlisted registrations can be withdrawn.'
 
         event = registration.event
 
@@ -660,7 +740,5 @@ class RegistrationService:
         if event.external_registration_url:
             return False, 'Event uses external registration.'
 
-        if not event.has_capacity_available:
-            return False, 'Event has reached capacity.'
-
+        # A full event still takes registrations; _admit puts them on the waitlist
         return True, None
@@ -0,0 +1,118 @@
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+
+from django.conf import settings
+from django.core.cache import cache
+
+from backoffice.models import Event, Registration, Ride, SpeedRange
+from backoffice.services.registration_service import RegistrationService
+
+
+class RosterViewer(Enum):
+    """Who is looking, as far as the roster's name masking is concerned."""
+    ANONYMOUS = 'anonymous'
+    MEMBER = 'member'
+    PRIVILEGED = 'privileged'
+
+
+@dataclass(slots=True)
+class RosterRider:
+    name: str
+    is_ride_leader: bool
+
+
+@dataclass(slots=True)
+class RosterGroup:
+    speed_range: SpeedRange | None
+    riders: list[RosterRider] = field(default_factory=list)
+    ride_leader_count: int = 0
+
+    @property
+    def non_leader_count(self) -> int:
+        return len(self.riders) - self.ride_leader_count
+
+
+@dataclass(slots=True)
+class RosterRide:
+    ride: Ride
+    groups: list[RosterGroup]
+
+
+class RosterService:
+    def rides(self, event: Event) -> list[RosterRide]:
+        """The event's rides and their speed ranges, without riders."""
+        return self._build(event, None)
+
+    def roster(self, event: Event, viewer: RosterViewer) -> list[RosterRide]:
+        """
+        The event's rides with their confirmed riders grouped by speed range, names
+        masked for the viewer. Cached until a registration, ride, speed range,
+        route or registrant profile of the event changes.
+        """
+        key = f'roster:{event.pk}:{self.version(event.pk)}:{viewer.value}'
+        roster = cache.get(key)
+        if roster is None:
+            roster = self._build(event, viewer)
+            cache.set(key, roster, settings.ROSTER_CACHE_TIMEOUT)
+        return roster
+
+    def version(self, event_id: int) -> str:
+        key = self._version_key(event_id)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            version = cache.get(key)
+        return version
+
+    def bump(self, event_ids) -> None:
+        cache.set_many({self._version_key(event_id): uuid.uuid4().hex for event_id in event_ids}, timeout=None)
+
+    @staticmethod
+    def _version_key(event_id: int) -> str:
+        return f'roster-version:{event_id}'
+
+    @staticmethod
+    def _build(event: Event, viewer: RosterViewer | None) -> list[RosterRide]:
+        rides = Ride.objects.filter(event=event).select_related('route').prefetch_related('speed_ranges')
+
+        roster = {}
+        groups = {}
+        for ride in rides:
+            # Speed ranges come back ordered by lower limit, which is the display order
+            ride_groups = [RosterGroup(speed_range) for speed_range in ride.speed_ranges.all()]
+            groups.update({(ride.pk, group.speed_range.pk): group for group in ride_groups})
+            roster[ride.pk] = RosterRide(ride, ride_groups)
+
+        if viewer is None:
+            return list(roster.values())
+
+        registrations = list(Registration.objects.filter(
+            event=event,
+            state=Registration.STATE_CONFIRMED,
+            ride__isnull=False,
+        ).select_related('user__profile'))
+        RegistrationService().mask_hidden_names(
+            registrations,
+            viewer_is_authenticated=viewer is not RosterViewer.ANONYMOUS,
+            viewer_is_privileged=viewer is RosterViewer.PRIVILEGED,
+        )
+
+        # One sort by the displayed name leaves every group's riders in order as they
+        # are dealt out
+        registrations.sort(key=lambda registration: registration.name)
+        for registration in registrations:
+            key = (registration.ride_id, registration.speed_range_preference_id)
+            group = groups.get(key)
+            if group is None:
+                # Riders without a preference get a group after the ride's speed ranges;
+                # a preference the ride no longer offers leaves the rider out
+                if registration.speed_range_preference_id is not None or registration.ride_id not in roster:
+                    continue
+                group = groups[key] = RosterGroup(None)
+                roster[registration.ride_id].groups.append(group)
+
+            group.riders.append(RosterRider(registration.name, registration.is_ride_leader))
+            group.ride_leader_count += registration.is_ride_leader
+
+        return list(roster.values())
@@ -0,0 +1,95 @@
+import logging
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from backoffice.models import Event, Registration, UserRideStats
+
+logger = logging.getLogger(__name__)
+
+
+def _confirmed_ride_count() -> Coalesce:
+    rides = (
+        Registration.objects.filter(user_id=OuterRef('user_id'), state=Registration.STATE_CONFIRMED)
+        .exclude(event__state=Event.STATE_CANCELLED)
+        .order_by()
+        .values('user_id')
+        .annotate(value=Count('event', distinct=True))
+        .values('value')[:1]
+    )
+    return Coalesce(Subquery(rides, output_field=IntegerField()), Value(0))
+
+
+class UserRideStatsService:
+    def fetch_ride_counts(self, user_ids) -> dict[int, int]:
+        return dict(
+            UserRideStats.objects.filter(user_id__in=user_ids, confirmed_ride_count__gt=0)
+            .values_list('user_id', 'confirmed_ride_count')
+        )
+
+    def count_confirmation(self, user_id: int, event_id: int, change: int, registration_id: int) -> None:
+        """
+        Move the user's count as their registration for the event enters (+1) or leaves (-1)
+        the confirmed state. Cancelled events don't count, and neither does a second confirmed
+        registration for an event the user is already counted for.
+        """
+        others = Registration.objects.filter(
+            event_id=OuterRef('pk'), user_id=user_id, state=Registration.STATE_CONFIRMED,
+        ).exclude(pk=registration_id)
+        counted = (
+            Event.objects.filter(pk=event_id)
+            .exclude(state=Event.STATE_CANCELLED)
+            .exclude(Exists(others))
+            .exists()
+        )
+        if not counted:
+            return
+
+        if change > 0:
+            UserRideStats.objects.bulk_create([UserRideStats(user_id=user_id)], ignore_conflicts=True)
+        stats = UserRideStats.objects.filter(user_id=user_id)
+        if change < 0:
+            stats = stats.filter(confirmed_ride_count__gte=-change)
+        stats.update(
+            confirmed_ride_count=F('confirmed_ride_count') + change,
+            updated_at=timezone.now(),
+        )
+
+    def refresh(self, user_ids) -> int:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+        UserRideStats.objects.bulk_create(
+            [UserRideStats(user_id=user_id) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+        return self._refresh(UserRideStats.objects.filter(user_id__in=user_ids))
+
+    def refresh_for_event(self, event_id: int) -> int:
+        return self.refresh(
+            Registration.objects.filter(event_id=event_id, user__isnull=False)
+            .values_list('user_id', flat=True)
+            .distinct()
+        )
+
+    def rebuild(self) -> int:
+        with transaction.atomic():
+            missing = (
+                Registration.objects.filter(user__isnull=False, user__ride_stats__isnull=True)
+                .values_list('user_id', flat=True)
+                .distinct()
+            )
+            UserRideStats.objects.bulk_create(
+                [UserRideStats(user_id=user_id) for user_id in missing],
+                ignore_conflicts=True,
+            )
+            rebuilt = self._refresh(UserRideStats.objects.all())
+
+        logger.info('Rebuilt ride counts for %s users', rebuilt)
+        return rebuilt
+
+    @staticmethod
+    def _refresh(queryset: QuerySet[UserRideStats]) -> int:
+        return queryset.update(updated_at=timezone.now(), confirmed_ride_count=_confirmed_ride_count())
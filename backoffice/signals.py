@@ -1,13 +1,25 @@
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
 from django.dispatch import receiver
 
 from audit.context import get_actor
 from audit.services import AuditService
+from backoffice.services.calendar_feed_service import CalendarFeedService
+from backoffice.services.event_search_service import EventSearchService
+from backoffice.services.event_stats_service import EventStatsService
+from backoffice.services.forecast_prefetch_service import VISIBLE_STATES, ForecastPrefetchService
+from backoffice.services.listing_cache_service import ListingCacheService
+from backoffice.services.registration_service import RegistrationService
+from backoffice.services.roster_service import RosterService
+from backoffice.services.user_ride_stats_service import UserRideStatsService
 from .models import (
     Announcement,
     Event,
+    Forecast,
     Program,
+    Registration,
     Ride,
     Route,
     SpeedRange,
@@ -64,4 +76,233 @@ for model in AUDITED_MODELS:
     post_save.connect(log_audited_save, sender=model,
                       dispatch_uid=f'audit_save_{model.__name__}')
     post_delete.connect(log_audited_delete, sender=model,
-                        dispatch_uid=f'audit_delete_{model.__name__}')
\ No newline at end of file
+                        dispatch_uid=f'audit_delete_{model.__name__}')
+
+
+@receiver(post_save, sender=Event)
+def create_event_stats(sender, instance, created, **kwargs):
+    if created:
+        EventStatsService().ensure(instance)
+
+
+@receiver(post_init, sender=Event)
+def remember_registration_limit(sender, instance, **kwargs):
+    instance._stored_registration_limit = instance.__dict__.get('registration_limit')
+
+
+@receiver(post_save, sender=Event)
+def promote_waitlist_for_raised_limit(sender, instance, created, **kwargs):
+    was_limit = instance._stored_registration_limit
+    instance._stored_registration_limit = instance.registration_limit
+    if created or was_limit is None:
+        return
+    if instance.registration_limit is None or instance.registration_limit > was_limit:
+        RegistrationService().promote_from_waitlist(instance)
+
+
+@receiver(post_init, sender=Registration)
+def remember_confirmed_event(sender, instance, **kwargs):
+    # The event and user whose confirmed counts this registration is part of, as stored;
+    # read from __dict__ so a deferred state isn't fetched for every loaded row
+    stored = instance.pk is not None and instance.__dict__.get('state') == Registration.STATE_CONFIRMED
+    instance._confirmed_event_id = instance.__dict__.get('event_id') if stored else None
+    instance._confirmed_user_id = instance.__dict__.get('user_id') if stored else None
+
+
+def _count_confirmation(registration, event_id, user_id, change):
+    if event_id is None:
+        return
+    EventStatsService().count_confirmation(event_id, change)
+    if user_id is not None:
+        UserRideStatsService().count_confirmation(user_id, event_id, change, registration.pk)
+
+
+@receiver(post_save, sender=Registration)
+def count_registration_confirmation(sender, instance, **kwargs):
+    was_counted_as = (instance._confirmed_event_id, instance._confirmed_user_id)
+    if instance.state == Registration.STATE_CONFIRMED:
+        counted_as = (instance.event_id, instance.user_id)
+    else:
+        counted_as = (None, None)
+    if was_counted_as != counted_as:
+        _count_confirmation(instance, *was_counted_as, -1)
+        _count_confirmation(instance, *counted_as, 1)
+    instance._confirmed_event_id, instance._confirmed_user_id = counted_as
+
+
+@receiver(post_delete, sender=Registration)
+def release_registration_confirmation(sender, instance, **kwargs):
+    _count_confirmation(instance, instance._confirmed_event_id, instance._confirmed_user_id, -1)
+
+
+@receiver(post_save, sender=Ride)
+@receiver(post_delete, sender=Ride)
+def refresh_event_stats(sender, instance, **kwargs):
+    EventStatsService().refresh(instance.event_id)
+
+
+@receiver(post_init, sender=Event)
+def remember_cancelled(sender, instance, **kwargs):
+    instance._stored_cancelled = instance.__dict__.get('state') == Event.STATE_CANCELLED
+
+
+@receiver(post_save, sender=Event)
+def refresh_user_ride_stats_for_event(sender, instance, created, **kwargs):
+    # Cancelling or reinstating the event changes every registrant's count
+    cancelled = instance.state == Event.STATE_CANCELLED
+    if not created and cancelled != instance._stored_cancelled:
+        UserRideStatsService().refresh_for_event(instance.pk)
+    instance._stored_cancelled = cancelled
+
+
+@receiver(post_save, sender=Event)
+def index_event_for_search(sender, instance, **kwargs):
+    EventSearchService().index(instance)
+
+
+@receiver(post_delete, sender=Event)
+def remove_event_from_search(sender, instance, **kwargs):
+    EventSearchService().remove(instance.pk)
+
+
+def _forecast_window(event):
+    # What decides which forecast an event shows; read from __dict__ so a
+    # deferred field isn't fetched for every loaded row
+    fields = event.__dict__
+    return (
+        fields.get('state') in VISIBLE_STATES,
+        fields.get('virtual'),
+        fields.get('starts_at'),
+        fields.get('ends_at'),
+        fields.get('latitude'),
+        fields.get('longitude'),
+    )
+
+
+@receiver(post_init, sender=Event)
+def remember_forecast_window(sender, instance, **kwargs):
+    instance._stored_forecast_window = _forecast_window(instance)
+
+
+@receiver(post_save, sender=Event)
+def prefetch_event_forecast(sender, instance, created, **kwargs):
+    # Publishing, rescheduling or moving an event leaves a window with no forecast;
+    # fetch it now rather than when the scheduled refresh next runs
+    window = _forecast_window(instance)
+    if settings.FORECAST_PREFETCH_ON_SAVE and (created or window != instance._stored_forecast_window):
+        ForecastPrefetchService().request(instance)
+    instance._stored_forecast_window = window
+
+
+@receiver(post_save, sender=Program)
+def refresh_event_search_for_program(sender, instance, created, **kwargs):
+    if not created:
+        EventSearchService().refresh_for_program(instance)
+
+
+@receiver(post_save, sender=Route)
+def refresh_event_stats_for_route(sender, instance, **kwargs):
+    EventStatsService().refresh_for_route(instance.pk)
+
+
+LISTING_MODELS = (
+    Program,
+    Event,
+    Route,
+    Ride,
+    Registration,
+    Forecast,
+    Announcement,
+)
+
+
+def bump_listing_version(sender, instance, **kwargs):
+    transaction.on_commit(ListingCacheService().bump)
+
+
+for model in LISTING_MODELS:
+    post_save.connect(bump_listing_version, sender=model,
+                      dispatch_uid=f'listing_save_{model.__name__}')
+    post_delete.connect(bump_listing_version, sender=model,
+                        dispatch_uid=f'listing_delete_{model.__name__}')
+
+
+EVENT_FEED_MODELS = (
+    Program,
+    Event,
+)
+
+
+def bump_event_feed_version(sender, instance, **kwargs):
+    transaction.on_commit(CalendarFeedService().bump_event_feed)
+
+
+for model in EVENT_FEED_MODELS:
+    post_save.connect(bump_event_feed_version, sender=model,
+                      dispatch_uid=f'event_feed_save_{model.__name__}')
+    post_delete.connect(bump_event_feed_version, sender=model,
+                        dispatch_uid=f'event_feed_delete_{model.__name__}')
+
+
+@receiver(post_save, sender=Registration)
+@receiver(post_delete, sender=Registration)
+def bump_calendar_feed_version(sender, instance, **kwargs):
+    if instance.user_id is not None:
+        user_ids = [instance.user_id]
+        transaction.on_commit(lambda: CalendarFeedService().bump(user_ids))
+
+
+@receiver(post_save, sender=Event)
+def bump_calendar_feed_versions_for_event(sender, instance, created, **kwargs):
+    if created:
+        return
+    user_ids = set(
+        Registration.objects.filter(event_id=instance.pk, user__isnull=False).values_list('user_id', flat=True)
+    )
+    if user_ids:
+        transaction.on_commit(lambda: CalendarFeedService().bump(user_ids))
+
+
+def _bump_rosters(event_ids):
+    event_ids = set(event_ids)
+    if event_ids:
+        transaction.on_commit(lambda: RosterService().bump(event_ids))
+
+
+@receiver(post_save, sender=Registration)
+@receiver(post_delete, sender=Registration)
+@receiver(post_save, sender=Ride)
+@receiver(post_delete, sender=Ride)
+def bump_roster_version(sender, instance, **kwargs):
+    _bump_rosters([instance.event_id])
+
+
+@receiver(m2m_changed, sender=Ride.speed_ranges.through)
+def bump_roster_version_for_ride_speed_ranges(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            _bump_rosters([instance.event_id])
+    elif action == 'pre_clear':
+        # Which rides had the speed range is only known before the clear
+        _bump_rosters(Ride.objects.filter(speed_ranges=instance).values_list('event_id', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        _bump_rosters(Ride.objects.filter(pk__in=pk_set).values_list('event_id', flat=True))
+
+
+@receiver(post_save, sender=SpeedRange)
+def bump_roster_versions_for_speed_range(sender, instance, created, **kwargs):
+    if not created:
+        _bump_rosters(Ride.objects.filter(speed_ranges=instance).values_list('event_id', flat=True))
+
+
+@receiver(post_save, sender=Route)
+def bump_roster_versions_for_route(sender, instance, created, **kwargs):
+    if not created:
+        _bump_rosters(Ride.objects.filter(route=instance).values_list('event_id', flat=True))
+
+
+@receiver(post_save, sender=UserProfile)
+def bump_roster_versions_for_profile(sender, instance, created, **kwargs):
+    # The profile decides whether the registrant's name is shown
+    if not created:
+        _bump_rosters(Registration.objects.filter(user_id=instance.user_id).values_list('event_id', flat=True))
@@ -1,8 +1,14 @@
 import logging
+from decimal import Decimal
 
 from celery import shared_task
 
+from backoffice.services.email_service import EmailService
+from backoffice.services.event_notification_service import EventNotificationService
 from backoffice.services.event_service import EventService
+from backoffice.services.forecast_compaction_service import ForecastCompactionService
+from backoffice.services.forecast_prefetch_service import ForecastPrefetchService
+from backoffice.services.forecast_schedule_service import ForecastScheduleService
 from backoffice.services.registration_alert_service import RegistrationAlertService
 
 logger = logging.getLogger(__name__)
@@ -19,6 +25,25 @@ def alert_unconfirmed_registrations() -> int:
     return RegistrationAlertService().alert_unconfirmed_registrations()
 
 
+@shared_task
+def deliver_outbound_emails() -> int:
+    return EmailService().deliver_pending()
+
+
+@shared_task
+def prune_outbound_emails() -> int:
+    return EmailService().prune()
+
+
+@shared_task(
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={'max_retries': 3},
+)
+def send_event_notification_chunk(notification_id: int, registration_ids: list[int]) -> int:
+    return EventNotificationService().send_chunk(notification_id, registration_ids)
+
+
 @shared_task(
     autoretry_for=(Exception,),
     retry_backoff=True,
@@ -30,10 +55,23 @@ def refresh_forecasts() -> int:
 
     if not events:
         logger.info('No events within the forecast horizon, nothing to refresh')
-        return 0
+        refreshed = 0
+    else:
+        refreshed = service.refresh_forecasts(events)
+        logger.info(
+            'Forecast refresh finished: %s windows covered for %s events', refreshed, len(events)
+        )
 
-    refreshed = service.refresh_forecasts(events)
-    logger.info(
-        'Forecast refresh finished: %s windows covered for %s events', refreshed, len(events)
-    )
+    ForecastScheduleService().schedule_next()
     return refreshed
+
+
+@shared_task
+def prefetch_forecasts(latitude: str, longitude: str) -> int:
+    return ForecastPrefetchService().prefetch(Decimal(latitude), Decimal(longitude))
+
+
+@shared_task
+def compact_forecasts() -> int:
+    result = ForecastCompactionService().compact()
+    return result.forecasts + result.readings
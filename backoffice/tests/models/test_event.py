@@ -1,4 +1,5 @@
 from datetime import timedelta
+from decimal import Decimal
 
 from django.core.exceptions import ValidationError
 from django.test import TestCase
@@ -188,6 +189,33 @@ class EventTimeValidationTestCase(TestCase):
         )
         event.full_clean()
 
+    def test_coordinates_must_be_given_together(self):
+        event = Event(
+            program=self.program,
+            name="Test Event",
+            description="Test description",
+            starts_at=self.one_hour_later,
+            registration_closes_at=self.now,
+            latitude=Decimal('45.30880'),
+        )
+        with self.assertRaises(ValidationError) as context:
+            event.full_clean()
+        self.assertIn('longitude', context.exception.message_dict)
+
+    def test_latitude_out_of_range_raises_error(self):
+        event = Event(
+            program=self.program,
+            name="Test Event",
+            description="Test description",
+            starts_at=self.one_hour_later,
+            registration_closes_at=self.now,
+            latitude=Decimal('95'),
+            longitude=Decimal('-75.89850'),
+        )
+        with self.assertRaises(ValidationError) as context:
+            event.full_clean()
+        self.assertIn('latitude', context.exception.message_dict)
+
     def test_registration_closes_at_after_starts_at_raises_error(self):
         event = Event(
             program=self.program,
@@ -105,6 +105,59 @@ class ForecastModelTestCase(TestCase):
         # Assert
         self.assertEqual(Forecast.objects.count(), 2)
 
+    def test_newest_forecast_for_a_window_is_current(self):
+        # Arrange
+        older = self._build_forecast(prepared_at=timezone.now() - timedelta(hours=1))
+        older.save()
+
+        # Act
+        newer = self._build_forecast()
+        newer.save()
+
+        # Assert
+        older.refresh_from_db()
+        self.assertTrue(newer.is_current)
+        self.assertFalse(older.is_current)
+
+    def test_storing_an_older_forecast_leaves_the_current_one(self):
+        # Arrange
+        newer = self._build_forecast()
+        newer.save()
+
+        # Act
+        older = self._build_forecast(prepared_at=timezone.now() - timedelta(hours=1))
+        older.save()
+
+        # Assert
+        newer.refresh_from_db()
+        self.assertTrue(newer.is_current)
+        self.assertFalse(older.is_current)
+
+    def test_forecast_without_readings_never_becomes_current(self):
+        # Arrange
+        with_readings = self._build_forecast(prepared_at=timezone.now() - timedelta(hours=1))
+        with_readings.save()
+
+        # Act
+        empty = self._build_forecast(hourly=[])
+        empty.save()
+
+        # Assert
+        with_readings.refresh_from_db()
+        self.assertFalse(empty.has_readings)
+        self.assertFalse(empty.is_current)
+        self.assertTrue(with_readings.is_current)
+
+    def test_current_forecast_is_per_window(self):
+        # Arrange
+        self._build_forecast().save()
+
+        # Act
+        self._build_forecast(end_time=self.time + timedelta(hours=4)).save()
+
+        # Assert
+        self.assertEqual(Forecast.objects.current().count(), 2)
+
     def test_empty_hourly_rejected(self):
         # Arrange
         forecast = self._build_forecast(hourly=[])
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from backoffice.models import Event, Program, Registration
+from backoffice.services.calendar_feed_service import CalendarFeedService
+from backoffice.services.roster_service import RosterService
+
+
+class CalendarFeedServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='rider', email='rider@example.com')
+        self.service = CalendarFeedService()
+
+    def test_token_resolves_to_its_user(self):
+        # Act
+        token = self.service.token_for(self.user)
+
+        # Assert
+        self.assertEqual(self.service.user_for(token), self.user)
+        self.assertEqual(self.service.token_for(self.user), token)
+
+    def test_revoked_token_no_longer_resolves(self):
+        # Arrange
+        token = self.service.token_for(self.user)
+
+        # Act
+        self.service.revoke(self.user)
+
+        # Assert
+        self.assertIsNone(self.service.user_for(token))
+        self.assertEqual(self.service.user_for(self.service.token_for(self.user)), self.user)
+
+    def test_issuing_and_revoking_tokens_leaves_rosters_cached(self):
+        # Arrange
+        starts_at = timezone.now() + timedelta(days=1)
+        event = Event.objects.create(
+            program=Program.objects.create(name='Program'), name='Event',
+            starts_at=starts_at, registration_closes_at=starts_at - timedelta(hours=1),
+        )
+        Registration.objects.create(event=event, user=self.user, email=self.user.email, name='Rider')
+        version = RosterService().version(event.pk)
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.token_for(self.user)
+            self.service.revoke(self.user)
+
+        # Assert
+        self.assertEqual(RosterService().version(event.pk), version)
+
+    def test_tampered_token_does_not_resolve(self):
+        # Arrange
+        token = self.service.token_for(self.user)
+
+        # Act
+        user = self.service.user_for(token[:-1] + ('a' if token[-1] != 'a' else 'b'))
+
+        # Assert
+        self.assertIsNone(user)
+
+    def test_inactive_user_token_does_not_resolve(self):
+        # Arrange
+        token = self.service.token_for(self.user)
+        self.user.is_active = False
+        self.user.save()
+
+        # Act
+        user = self.service.user_for(token)
+
+        # Assert
+        self.assertIsNone(user)
+
+    def test_bump_changes_only_that_users_feed_key(self):
+        # Arrange
+        other = User.objects.create_user(username='other', email='other@example.com')
+        key = self.service.feed_key(self.user)
+        other_key = self.service.feed_key(other)
+
+        # Act
+        self.service.bump([self.user.pk])
+
+        # Assert
+        self.assertNotEqual(self.service.feed_key(self.user), key)
+        self.assertEqual(self.service.feed_key(other), other_key)
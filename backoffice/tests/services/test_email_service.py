@@ -0,0 +1,169 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from backoffice.models import OutboundEmail
+from backoffice.services.email_service import EmailService
+from backoffice.tasks import deliver_outbound_emails, prune_outbound_emails
+
+
+class EmailServiceTests(TestCase):
+    def setUp(self):
+        self.service = EmailService()
+        self.context = {'base_url': 'https://example.com', 'login_link': 'https://example.com/login'}
+
+    def _send(self, idempotency_key=None) -> OutboundEmail:
+        return self.service.send_email(
+            template_name='login_link',
+            context=self.context,
+            subject='Sign in',
+            recipient_list=['rider@example.com'],
+            idempotency_key=idempotency_key,
+        )
+
+    def test_queued_message_is_delivered_and_marked_sent(self):
+        # Act
+        message = self._send(idempotency_key='login-1')
+
+        # Assert
+        message = OutboundEmail.objects.get(pk=message.pk)
+        self.assertEqual(message.state, OutboundEmail.STATE_SENT)
+        self.assertEqual(message.attempts, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, '[OBC] Sign in')
+        self.assertEqual(mail.outbox[0].to, ['rider@example.com'])
+        self.assertTrue(mail.outbox[0].extra_headers['Message-ID'].startswith('<login-1@'))
+        self.assertIn('https://example.com/login', mail.outbox[0].body)
+        self.assertEqual((message.text_body, message.html_body), ('', ''))
+
+    def test_same_idempotency_key_sends_once(self):
+        # Act
+        self._send(idempotency_key='login-1')
+        self._send(idempotency_key='login-1')
+
+        # Assert
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_OUTBOX_DELIVER_ON_COMMIT=True)
+    def test_delivery_waits_for_the_transaction_to_commit(self):
+        # Act
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            message = self._send()
+
+        # Assert
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(message.state, OutboundEmail.STATE_PENDING)
+        self.assertEqual(len(callbacks), 1)
+
+        callbacks[0]()
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_OUTBOX_DELIVER_ON_COMMIT=True)
+    def test_batch_is_delivered_over_one_connection(self):
+        # Arrange
+        for _ in range(3):
+            self._send()
+
+        # Act
+        with patch('backoffice.services.email_service.get_connection', wraps=get_connection) as connect:
+            sent = self.service.deliver_pending()
+
+        # Assert
+        self.assertEqual(sent, 3)
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(OutboundEmail.objects.filter(state=OutboundEmail.STATE_SENT).count(), 3)
+
+    @override_settings(EMAIL_OUTBOX_DELIVER_ON_COMMIT=True)
+    def test_batches_are_claimed_until_nothing_is_due(self):
+        # Arrange
+        for _ in range(5):
+            self._send()
+        claimed_while_sending = []
+
+        def send(email):
+            claimed_while_sending.append(OutboundEmail.objects.filter(state=OutboundEmail.STATE_SENDING).count())
+            return 1
+
+        # Act
+        with patch('django.core.mail.EmailMultiAlternatives.send', autospec=True, side_effect=send):
+            sent = self.service.deliver_pending(batch_size=2)
+
+        # Assert
+        self.assertEqual(sent, 5)
+        self.assertEqual(claimed_while_sending, [2, 1, 2, 1, 1])
+        self.assertEqual(OutboundEmail.objects.filter(state=OutboundEmail.STATE_SENT).count(), 5)
+
+    @override_settings(EMAIL_OUTBOX_DELIVER_ON_COMMIT=True)
+    def test_message_left_sending_is_reclaimed_once_its_lease_expires(self):
+        # Arrange
+        message = self._send()
+        OutboundEmail.objects.filter(pk=message.pk).update(
+            state=OutboundEmail.STATE_SENDING, attempts=1, next_attempt_at=timezone.now() + timedelta(minutes=5),
+        )
+        leased = self.service.deliver_pending()
+        OutboundEmail.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+
+        # Act
+        reclaimed = self.service.deliver_pending()
+
+        # Assert
+        message = OutboundEmail.objects.get(pk=message.pk)
+        self.assertEqual((leased, reclaimed), (0, 1))
+        self.assertEqual(message.state, OutboundEmail.STATE_SENT)
+        self.assertEqual(message.attempts, 2)
+
+    def test_failed_delivery_is_retried_later(self):
+        # Act
+        with patch('django.core.mail.EmailMultiAlternatives.send', side_effect=OSError('relay down')):
+            message = self._send()
+
+        # Assert
+        message = OutboundEmail.objects.get(pk=message.pk)
+        self.assertEqual(message.state, OutboundEmail.STATE_PENDING)
+        self.assertEqual(message.attempts, 1)
+        self.assertEqual(message.last_error, 'relay down')
+        self.assertGreater(message.next_attempt_at, timezone.now())
+        self.assertEqual(self.service.deliver_pending(), 0)
+
+    def test_message_fails_after_max_attempts(self):
+        # Arrange
+        with patch('django.core.mail.EmailMultiAlternatives.send', side_effect=OSError('relay down')):
+            message = self._send()
+
+            # Act
+            for _ in range(OutboundEmail.MAX_ATTEMPTS - 1):
+                OutboundEmail.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+                deliver_outbound_emails()
+
+        # Assert
+        message = OutboundEmail.objects.get(pk=message.pk)
+        self.assertEqual(message.state, OutboundEmail.STATE_FAILED)
+        self.assertEqual(message.attempts, OutboundEmail.MAX_ATTEMPTS)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual((message.text_body, message.html_body), ('', ''))
+
+    @override_settings(EMAIL_OUTBOX_RETENTION_DAYS=30)
+    def test_prune_deletes_finished_messages_past_retention(self):
+        # Arrange
+        old_sent = self._send()
+        old_failed = self._send()
+        OutboundEmail.objects.filter(pk=old_failed.pk).update(state=OutboundEmail.STATE_FAILED)
+        recent_sent = self._send()
+        old_pending = self._send()
+        OutboundEmail.objects.filter(pk=old_pending.pk).update(state=OutboundEmail.STATE_PENDING)
+        OutboundEmail.objects.exclude(pk=recent_sent.pk).update(created_at=timezone.now() - timedelta(days=31))
+
+        # Act
+        pruned = prune_outbound_emails()
+
+        # Assert
+        self.assertEqual(pruned, 2)
+        self.assertFalse(OutboundEmail.objects.filter(pk__in=[old_sent.pk, old_failed.pk]).exists())
+        self.assertEqual(
+            set(OutboundEmail.objects.values_list('pk', flat=True)), {old_pending.pk, recent_sent.pk}
+        )
@@ -0,0 +1,91 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.test import TestCase
+from django.utils import timezone
+
+from backoffice.models import Event, EventNotification, OutboundEmail, Program, Registration
+from backoffice.services.event_notification_service import EventNotificationService
+
+
+class EventNotificationServiceTests(TestCase):
+    def setUp(self):
+        self.program = Program.objects.create(name='Test Program')
+        self.event = Event.objects.create(
+            program=self.program,
+            name='Big Tour',
+            starts_at=timezone.now() + timedelta(days=3),
+            registration_closes_at=timezone.now() + timedelta(days=2),
+        )
+        self.registrations = [
+            Registration.objects.create(
+                event=self.event,
+                name=f'Rider {index}',
+                email=f'rider{index}@example.com',
+                state=Registration.STATE_CONFIRMED,
+            )
+            for index in range(5)
+        ]
+        self.service = EventNotificationService()
+
+    def test_every_confirmed_registrant_is_emailed_in_chunks(self):
+        # Arrange
+        Registration.objects.create(
+            event=self.event,
+            name='Withdrawn Rider',
+            email='withdrawn@example.com',
+            state=Registration.STATE_WITHDRAWN,
+        )
+
+        # Act
+        with patch('backoffice.services.event_notification_service.NOTIFICATION_CHUNK_SIZE', 2), \
+                patch('backoffice.services.email_service.get_connection', wraps=get_connection) as connect:
+            notification = self.service.notify_registrants(
+                self.event, EventNotification.KIND_CANCELLED, reason='Flooding', base_url='https://example.com',
+            )
+
+        # Assert
+        self.assertEqual(notification.recipient_count, 5)
+        self.assertEqual(connect.call_count, 3)
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox),
+                         [f'rider{index}@example.com' for index in range(5)])
+        self.assertIn('RIDE CANCELLED Big Tour', mail.outbox[0].subject)
+        self.assertIn('Flooding', mail.outbox[0].body)
+        self.assertEqual(notification.emails.filter(state=OutboundEmail.STATE_SENT).count(), 5)
+
+    def test_rerunning_a_chunk_does_not_email_twice(self):
+        # Arrange
+        notification = self.service.notify_registrants(
+            self.event, EventNotification.KIND_RESCHEDULED, reason='Heat', base_url='https://example.com',
+        )
+        registration_ids = [registration.pk for registration in self.registrations]
+
+        # Act
+        sent = self.service.send_chunk(notification.id, registration_ids)
+
+        # Assert
+        self.assertEqual(sent, 0)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(notification.emails.count(), 5)
+
+    def test_registrant_who_withdrew_before_the_chunk_ran_is_skipped(self):
+        # Arrange
+        notification = EventNotification.objects.create(
+            event=self.event,
+            kind=EventNotification.KIND_CANCELLED,
+            reason='Flooding',
+            base_url='https://example.com',
+            recipient_count=5,
+        )
+        withdrawn = self.registrations[0]
+        withdrawn.withdraw()
+        withdrawn.save()
+
+        # Act
+        sent = self.service.send_chunk(notification.id, [registration.pk for registration in self.registrations])
+
+        # Assert
+        self.assertEqual(sent, 4)
+        self.assertNotIn(['rider0@example.com'], [email.to for email in mail.outbox])
@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from backoffice.models import Event, Program
+from backoffice.services.event_search_service import EventSearchService
+
+
+class EventSearchServiceTests(TestCase):
+    def setUp(self):
+        self.program = Program.objects.create(name='Touring')
+        self.service = EventSearchService()
+
+    def _event(self, name, **kwargs):
+        return Event.objects.create(
+            program=kwargs.pop('program', self.program),
+            name=name,
+            starts_at=timezone.now() + timedelta(days=1),
+            state=Event.STATE_LIVE,
+            **kwargs,
+        )
+
+    def _search(self, query):
+        return list(self.service.filter(Event.objects.all(), query).order_by('-search_rank'))
+
+    def test_matches_location_and_description_text(self):
+        # Arrange
+        at_park = self._event('Morning Ride', location='Andrew Haydon Park')
+        with_description = self._event('Evening Ride', description='<p>Bring a <strong>headlamp</strong></p>')
+
+        # Act
+        by_location = self._search('haydon')
+        by_description = self._search('headlamp')
+
+        # Assert
+        self.assertEqual([at_park], by_location)
+        self.assertEqual([with_description], by_description)
+
+    def test_matches_word_prefixes(self):
+        # Arrange
+        event = self._event('Tuesday Morning Ride')
+
+        # Act
+        result = self._search('tues')
+
+        # Assert
+        self.assertEqual([event], result)
+
+    def test_requires_every_word(self):
+        # Arrange
+        both = self._event('Gravel Explorer')
+        self._event('Gravel Sprint')
+
+        # Act
+        result = self._search('gravel explorer')
+
+        # Assert
+        self.assertEqual([both], result)
+
+    def test_search_syntax_in_the_query_is_treated_as_text(self):
+        # Arrange
+        event = self._event('Hills OR Valleys')
+
+        # Act
+        result = self._search('hills) OR (valleys*')
+
+        # Assert
+        self.assertEqual([event], result)
+
+    def test_query_without_words_matches_nothing(self):
+        # Arrange
+        self._event('Morning Ride')
+
+        # Act
+        result = self._search('*"')
+
+        # Assert
+        self.assertEqual([], result)
+
+    def test_better_matches_rank_higher(self):
+        # Arrange
+        passing = self._event('Coffee Ride', description='<p>Ends at the lake.</p>')
+        focused = self._event('Lake Loop', location='Lake Shore', description='<p>Laps of the lake.</p>')
+
+        # Act
+        result = self._search('lake')
+
+        # Assert
+        self.assertEqual([focused, passing], result)
+
+    def test_renaming_a_program_reindexes_its_events(self):
+        # Arrange
+        event = self._event('Morning Ride')
+
+        # Act
+        self.program.name = 'Randonneuring'
+        self.program.save()
+
+        # Assert
+        self.assertEqual([event], self._search('randonneuring'))
+        self.assertEqual([], self._search('touring'))
+
+    def test_saving_with_update_fields_keeps_the_document_current(self):
+        # Arrange
+        event = self._event('Morning Ride')
+
+        # Act
+        event.name = 'Sunrise Ride'
+        event.save(update_fields=['name'])
+
+        # Assert
+        self.assertEqual([event], self._search('sunrise'))
+
+    def test_deleted_events_are_removed_from_the_index(self):
+        # Arrange
+        event = self._event('Morning Ride')
+
+        # Act
+        event.delete()
+
+        # Assert
+        self.assertEqual([], self._search('morning'))
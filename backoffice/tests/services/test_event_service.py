@@ -1,5 +1,6 @@
 import datetime
 from datetime import timedelta
+from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
 from django.contrib.auth.models import User
@@ -8,7 +9,7 @@ from django.utils import timezone
 
 from backoffice.models import Event, Forecast, Program, Registration, Ride, Route, SpeedRange
 from backoffice.services.event_service import EventService
-from backoffice.services.forecast_service import YOW_LOCATION
+from backoffice.services.forecast_service import YOW_LOCATION, forecast_cell
 
 
 class BaseEventServiceTest(TestCase):
@@ -727,6 +728,61 @@ class FetchUpcomingEventsQueryFilterTests(TestCase):
         road_events = [e for e in result if e.name == 'Road Special']
         self.assertEqual(1, len(road_events))
 
+    def test_query_orders_best_matches_first_within_a_day(self):
+        starts_at = timezone.now() + timedelta(days=5)
+        passing = Event.objects.create(
+            program=self.road, name='Coffee Ride', description='<p>Ends at the lake.</p>',
+            starts_at=starts_at, state=Event.STATE_LIVE,
+        )
+        focused = Event.objects.create(
+            program=self.road, name='Lake Loop', location='Lake Shore',
+            starts_at=starts_at + timedelta(hours=1), state=Event.STATE_LIVE,
+        )
+
+        result = list(self.service.fetch_upcoming_events(query='lake'))
+
+        self.assertEqual([focused, passing], result)
+
+
+class SearchPastEventsTests(TestCase):
+    def setUp(self):
+        self.program = Program.objects.create(name='Road')
+        self.service = EventService()
+
+    def _event(self, name, days_from_now, state=Event.STATE_LIVE):
+        return Event.objects.create(
+            program=self.program, name=name,
+            starts_at=timezone.now() + timedelta(days=days_from_now), state=state,
+        )
+
+    def test_returns_matching_past_events_including_archived(self):
+        recent = self._event('Lake Loop', -10)
+        archived = self._event('Lake Century', -400, state=Event.STATE_ARCHIVED)
+        self._event('Lake Draft', -5, state=Event.STATE_DRAFT)
+        self._event('Lake Future', 5)
+        self._event('Hill Repeats', -3)
+
+        result = list(self.service.search_past_events('lake'))
+
+        self.assertCountEqual([recent, archived], result)
+
+    def test_is_limited(self):
+        for days in range(1, 5):
+            self._event('Lake Loop', -days)
+
+        result = list(self.service.search_past_events('lake', limit=3))
+
+        self.assertEqual(3, len(result))
+
+    def test_loads_programs_with_the_events(self):
+        for days in range(1, 4):
+            self._event('Lake Loop', -days)
+
+        with self.assertNumQueries(1):
+            programs = [event.program.name for event in self.service.search_past_events('lake')]
+
+        self.assertEqual(['Road'] * 3, programs)
+
 
 class FetchEventsForMonthQueryFilterTests(TestCase):
     def setUp(self):
@@ -860,6 +916,27 @@ class EventServiceForecastTestCase(TestCase):
         # Assert
         self.assertEqual(forecasts, {event.id: forecast})
 
+    def test_fetch_forecasts_uses_the_grid_cell_of_the_event_start(self):
+        # Arrange
+        event = self._create_event()
+        Event.objects.filter(pk=event.pk).update(latitude=Decimal('45.30880'), longitude=Decimal('-75.89850'))
+        event.refresh_from_db()
+        self._create_forecast()
+        cell = forecast_cell(event.latitude, event.longitude)
+        forecast = Forecast.objects.create(
+            latitude=cell.latitude,
+            longitude=cell.longitude,
+            start_time=self.starts_at,
+            end_time=self.starts_at + timedelta(hours=1),
+            hourly=[{'time': self.starts_at.isoformat(), 'condition': 'rain', 'temperature': 10, 'aqhi': 3}],
+        )
+
+        # Act
+        forecasts = self.service.fetch_forecasts([event])
+
+        # Assert
+        self.assertEqual(forecasts, {event.id: forecast})
+
     def test_fetch_forecasts_omits_events_with_only_stale_data(self):
         # Arrange
         event = self._create_event()
@@ -901,7 +978,7 @@ class EventServiceForecastTestCase(TestCase):
         # Arrange
         event = self._create_event()
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             # Act
             self.service.fetch_forecasts([event])
 
@@ -935,7 +1012,7 @@ class EventServiceForecastTestCase(TestCase):
         first = self._create_event('First', self.starts_at + timedelta(minutes=1))
         second = self._create_event('Second', self.starts_at + timedelta(minutes=55))
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=2))
 
             # Act
@@ -949,7 +1026,7 @@ class EventServiceForecastTestCase(TestCase):
         # Arrange
         event = self._create_event(virtual=True)
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             # Act
             refreshed = self.service.refresh_forecasts([event])
 
@@ -985,6 +1062,23 @@ class EventServiceForecastTestCase(TestCase):
         # Assert
         self.assertEqual(events, [upcoming])
 
+    def test_forecast_refresh_deadlines_cover_windows_in_range_and_the_next_to_enter(self):
+        # Arrange
+        now = timezone.now()
+        self._create_event('Unforecast', self.starts_at)
+        fresh = self._create_event('Fresh', self.starts_at + timedelta(days=2))
+        self._create_forecast(fresh.starts_at)
+        beyond = self._create_event('Beyond', now + timedelta(days=9))
+
+        # Act
+        deadlines = self.service.forecast_refresh_deadlines(now)
+
+        # Assert
+        self.assertEqual(len(deadlines), 3)
+        self.assertEqual(deadlines[0], now)
+        self.assertGreater(deadlines[1], now + timedelta(hours=1))
+        self.assertEqual(deadlines[2], beyond.starts_at - timedelta(days=7))
+
     def test_fetch_forecast_history_returns_forecasts_for_event_window_newest_first(self):
         # Arrange
         event = self._create_event()
@@ -0,0 +1,183 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from backoffice.models import Event, EventStats, Program, Registration, Ride, Route
+from backoffice.services.event_service import EventService
+from backoffice.services.event_stats_service import EventStatsService
+
+
+class EventStatsServiceTests(TestCase):
+    def setUp(self):
+        self.program = Program.objects.create(name='Test Program')
+        self.event = Event.objects.create(
+            program=self.program,
+            name='Stats Event',
+            starts_at=timezone.now() + timedelta(days=3),
+            registration_closes_at=timezone.now() + timedelta(days=2),
+        )
+        self.short_route = Route.objects.create(name='Short', distance=40)
+        self.long_route = Route.objects.create(name='Long', distance=90)
+
+    def _stats(self) -> EventStats:
+        return EventStats.objects.get(event=self.event)
+
+    def _registration(self, email: str) -> Registration:
+        return Registration.objects.create(
+            name='Rider',
+            first_name='Rider',
+            last_name='One',
+            email=email,
+            event=self.event,
+        )
+
+    def test_stats_row_is_created_with_the_event(self):
+        # Arrange
+        # (Setup creates the event)
+
+        # Act
+        stats = self._stats()
+
+        # Assert
+        self.assertEqual(stats.confirmed_registration_count, 0)
+        self.assertEqual(stats.ride_count, 0)
+        self.assertIsNone(stats.min_distance)
+        self.assertIsNone(stats.max_distance)
+
+    def test_confirm_and_withdraw_maintain_confirmed_count(self):
+        # Arrange
+        first = self._registration('first@example.com')
+        second = self._registration('second@example.com')
+
+        # Act
+        first.confirm()
+        first.save()
+        second.confirm()
+        second.save()
+        confirmed_count = self._stats().confirmed_registration_count
+        first.withdraw()
+        first.save()
+
+        # Assert
+        self.assertEqual(confirmed_count, 2)
+        self.assertEqual(self._stats().confirmed_registration_count, 1)
+
+    def test_deleting_a_confirmed_registration_releases_its_seat(self):
+        # Arrange
+        registration = self._registration('deleted@example.com')
+        registration.confirm()
+        registration.save()
+        Registration.objects.get(pk=registration.pk).save()
+
+        # Act
+        Registration.objects.get(pk=registration.pk).delete()
+
+        # Assert
+        self.assertEqual(self._stats().confirmed_registration_count, 0)
+
+    def test_unconfirmed_registrations_are_not_counted(self):
+        # Arrange
+        registration = self._registration('pending@example.com')
+
+        # Act
+        registration.hold_for_verification()
+        registration.save()
+
+        # Assert
+        self.assertEqual(self._stats().confirmed_registration_count, 0)
+
+    def test_ride_create_and_delete_maintain_ride_count_and_distance_range(self):
+        # Arrange
+        Ride.objects.create(name='Short ride', event=self.event, route=self.short_route)
+        long_ride = Ride.objects.create(name='Long ride', event=self.event, route=self.long_route)
+
+        # Act
+        stats_with_both = self._stats()
+        long_ride.delete()
+
+        # Assert
+        self.assertEqual(stats_with_both.ride_count, 2)
+        self.assertEqual((stats_with_both.min_distance, stats_with_both.max_distance), (40, 90))
+        stats = self._stats()
+        self.assertEqual(stats.ride_count, 1)
+        self.assertEqual((stats.min_distance, stats.max_distance), (40, 40))
+
+    def test_route_distance_change_updates_every_event_using_it(self):
+        # Arrange
+        other_event = Event.objects.create(
+            program=self.program,
+            name='Other Event',
+            starts_at=timezone.now() + timedelta(days=4),
+            registration_closes_at=timezone.now() + timedelta(days=3),
+        )
+        Ride.objects.create(name='Ride', event=self.event, route=self.short_route)
+        Ride.objects.create(name='Ride', event=other_event, route=self.short_route)
+
+        # Act
+        self.short_route.distance = 55
+        self.short_route.save()
+
+        # Assert
+        self.assertEqual(self._stats().max_distance, 55)
+        self.assertEqual(EventStats.objects.get(event=other_event).max_distance, 55)
+
+    def test_routes_without_distance_are_ignored(self):
+        # Arrange
+        no_distance = Route.objects.create(name='Unknown')
+
+        # Act
+        Ride.objects.create(name='Ride', event=self.event, route=no_distance)
+
+        # Assert
+        stats = self._stats()
+        self.assertEqual(stats.ride_count, 1)
+        self.assertIsNone(stats.min_distance)
+
+    def test_rebuild_creates_missing_rows_and_repairs_drift(self):
+        # Arrange
+        Ride.objects.create(name='Ride', event=self.event, route=self.long_route)
+        EventStats.objects.filter(event=self.event).update(ride_count=7, max_distance=None)
+        other_event = Event.objects.create(
+            program=self.program,
+            name='Other Event',
+            starts_at=timezone.now() + timedelta(days=4),
+            registration_closes_at=timezone.now() + timedelta(days=3),
+        )
+        EventStats.objects.filter(event=other_event).delete()
+
+        # Act
+        rebuilt = EventStatsService().rebuild()
+
+        # Assert
+        self.assertEqual(rebuilt, 2)
+        self.assertEqual(self._stats().ride_count, 1)
+        self.assertEqual(self._stats().max_distance, 90)
+        self.assertTrue(EventStats.objects.filter(event=other_event).exists())
+
+    def test_rebuild_command_reports_rebuilt_events(self):
+        # Arrange
+        out = StringIO()
+
+        # Act
+        call_command('rebuildeventstats', stdout=out)
+
+        # Assert
+        self.assertIn('Rebuilt stats for 1 events.', out.getvalue())
+
+    def test_upcoming_listing_reads_maintained_stats(self):
+        # Arrange
+        Ride.objects.create(name='Ride', event=self.event, route=self.long_route)
+        registration = self._registration('listed@example.com')
+        registration.confirm()
+        registration.save()
+
+        # Act
+        event = EventService().fetch_upcoming_events().get(pk=self.event.pk)
+
+        # Assert
+        self.assertEqual(event.registration_count, 1)
+        self.assertEqual(event.ride_count, 1)
+        self.assertEqual(event.distance_range, (90, 90))
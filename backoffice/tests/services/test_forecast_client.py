@@ -0,0 +1,171 @@
+import json
+import threading
+import time
+from unittest.mock import patch
+from datetime import timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from django.test import TestCase
+from django.utils import timezone
+
+from backoffice.models import Forecast
+from backoffice.services.forecast_client import CircuitOpenError, ForecastClient
+from backoffice.services.forecast_service import ForecastService, YOW_LOCATION
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.requests.append((url.path, parse_qs(url.query)))
+        time.sleep(self.server.delay)
+
+        if self.server.status != 200:
+            body = b'{"error": true}'
+        else:
+            body = json.dumps(self.server.payloads.get(url.path, {})).encode()
+        self.send_response(self.server.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubOpenMeteoTestCase(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+        self.server.daemon_threads = True
+        self.server.connections = 0
+        self.server.requests = []
+        self.server.delay = 0
+        self.server.status = 200
+        self.server.payloads = {'/weather': {'feed': 'weather'}, '/air': {'feed': 'air'}}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self.client = ForecastClient(weather_url=f'{base_url}/weather', air_quality_url=f'{base_url}/air')
+        self.latitude, self.longitude = YOW_LOCATION
+
+
+class ForecastClientTests(StubOpenMeteoTestCase):
+    def test_fetches_both_feeds_in_utc(self):
+        # Act
+        weather, air_quality = self.client.fetch(self.latitude, self.longitude)
+
+        # Assert
+        self.assertEqual(weather, {'feed': 'weather'})
+        self.assertEqual(air_quality, {'feed': 'air'})
+        self.assertEqual(
+            sorted((path, query['timezone']) for path, query in self.server.requests),
+            [('/air', ['UTC']), ('/weather', ['UTC'])],
+        )
+
+    def test_fetches_the_feeds_concurrently(self):
+        # Arrange
+        self.server.delay = 0.4
+
+        # Act
+        started = time.monotonic()
+        self.client.fetch(self.latitude, self.longitude)
+        elapsed = time.monotonic() - started
+
+        # Assert
+        self.assertLess(elapsed, 0.7)
+
+    def test_reuses_connections_across_fetches(self):
+        # Act
+        for _ in range(3):
+            self.client.fetch(self.latitude, self.longitude)
+
+        # Assert
+        self.assertEqual(len(self.server.requests), 6)
+        self.assertLessEqual(self.server.connections, 2)
+
+    def test_opens_the_circuit_after_repeated_failures(self):
+        # Arrange
+        self.server.status = 503
+        for _ in range(3):
+            with self.assertRaises(requests.HTTPError):
+                self.client.fetch(self.latitude, self.longitude)
+        requests_before = len(self.server.requests)
+
+        # Act
+        with self.assertRaises(CircuitOpenError):
+            self.client.fetch(self.latitude, self.longitude)
+
+        # Assert
+        self.assertTrue(self.client.circuit_open)
+        self.assertEqual(len(self.server.requests), requests_before)
+
+    def test_a_success_resets_the_failure_count(self):
+        # Arrange
+        self.server.status = 503
+        for _ in range(2):
+            with self.assertRaises(requests.HTTPError):
+                self.client.fetch(self.latitude, self.longitude)
+        self.server.status = 200
+
+        # Act
+        self.client.fetch(self.latitude, self.longitude)
+
+        # Assert
+        self.assertEqual(self.client.consecutive_failures, 0)
+
+
+    def test_a_failed_feed_leaves_no_request_running(self):
+        # Arrange
+        def get_json(url, params):
+            if url.endswith('/weather'):
+                raise requests.ConnectionError('weather is down')
+            time.sleep(0.2)
+            return {'feed': 'air'}
+
+        # Act
+        with patch.object(ForecastClient, '_get_json', side_effect=get_json):
+            with self.assertRaises(requests.ConnectionError):
+                self.client.fetch(self.latitude, self.longitude)
+
+        # Assert
+        self.assertFalse([thread for thread in threading.enumerate() if thread.name.startswith('open-meteo')])
+
+class ForecastServiceAgainstStubServerTests(StubOpenMeteoTestCase):
+    def _hourly_feed(self, start, fields):
+        hours = [start + timedelta(hours=n) for n in range(-2, 3)]
+        return {
+            'hourly': {
+                'time': [hour.strftime('%Y-%m-%dT%H:%M') for hour in hours],
+                **{field: [value] * len(hours) for field, value in fields.items()},
+            },
+        }
+
+    def test_refresh_stores_forecasts_from_the_stub(self):
+        # Arrange
+        starts_at = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        window = (starts_at, starts_at + timedelta(hours=1))
+        self.server.payloads = {
+            '/weather': self._hourly_feed(starts_at, {'weather_code': 61, 'temperature_2m': 14.2}),
+            '/air': self._hourly_feed(starts_at, {'pm2_5': 8.0, 'nitrogen_dioxide': 15.0, 'ozone': 60.0}),
+        }
+
+        # Act
+        forecasts = ForecastService(client=self.client).refresh_forecasts_for_windows([window])
+
+        # Assert
+        forecast = forecasts[window]
+        self.assertEqual(Forecast.objects.count(), 1)
+        self.assertEqual([entry['condition'] for entry in forecast.hourly], ['rain', 'rain'])
+        self.assertEqual(forecast.latitude, Decimal('45.32250'))
+        self.assertEqual(len(self.server.requests), 2)
@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from backoffice.models import Forecast, ForecastReading
+from backoffice.services.forecast_compaction_service import (
+    ESTIMATED_ROW_BYTES,
+    CompactionResult,
+    ForecastCompactionService,
+)
+from backoffice.services.forecast_service import YOW_LOCATION
+
+
+class ForecastCompactionServiceTestCase(TestCase):
+    def setUp(self):
+        self.service = ForecastCompactionService()
+        self.latitude, self.longitude = YOW_LOCATION
+        self.now = timezone.now().replace(minute=30, second=0, microsecond=0)
+        self.past_start = self.now.replace(minute=0) - timedelta(days=2)
+        self.upcoming_start = self.now.replace(minute=0) + timedelta(days=2)
+
+    def _revision(self, start, prepared_at, condition='sun', material=True, hours=2):
+        return Forecast.objects.create(
+            latitude=self.latitude,
+            longitude=self.longitude,
+            start_time=start,
+            end_time=start + timedelta(hours=hours - 1),
+            prepared_at=prepared_at,
+            material=material,
+            hourly=[
+                {
+                    'time': (start + timedelta(hours=n)).isoformat(),
+                    'condition': condition,
+                    'temperature': 10,
+                    'aqhi': 3,
+                }
+                for n in range(hours)
+            ],
+        )
+
+    def _history(self, start, conditions):
+        return [
+            self._revision(
+                start, start - timedelta(hours=len(conditions) - n), condition,
+                material=n == 0 or condition != conditions[n - 1],
+            )
+            for n, condition in enumerate(conditions)
+        ]
+
+    def test_thins_an_ended_window_to_the_revisions_whose_badge_changed(self):
+        # Arrange
+        history = self._history(self.past_start, ['sun', 'sun', 'sun', 'rain', 'rain', 'sun'])
+
+        # Act
+        result = self.service.compact(now=self.now)
+
+        # Assert
+        kept = list(Forecast.objects.order_by('prepared_at').values_list('pk', flat=True))
+        self.assertEqual(kept, [history[0].pk, history[3].pk, history[5].pk])
+        self.assertEqual(result.forecasts, 3)
+
+    def test_keeps_every_revision_of_an_upcoming_window(self):
+        # Arrange
+        self._history(self.upcoming_start, ['sun', 'sun', 'sun', 'sun'])
+
+        # Act
+        result = self.service.compact(now=self.now)
+
+        # Assert
+        self.assertEqual(Forecast.objects.count(), 4)
+        self.assertEqual(result, CompactionResult(0, 0, 0))
+
+    def test_deletes_the_readings_of_removed_revisions(self):
+        # Arrange
+        history = self._history(self.past_start, ['sun', 'sun', 'sun'])
+
+        # Act
+        result = self.service.compact(now=self.now)
+
+        # Assert
+        self.assertFalse(ForecastReading.objects.filter(prepared_at=history[1].prepared_at).exists())
+        self.assertEqual(ForecastReading.objects.count(), 4)
+        self.assertEqual(result.readings, 2)
+
+    def test_keeps_readings_still_covered_by_another_window_from_the_same_fetch(self):
+        # Arrange
+        history = self._history(self.past_start, ['sun', 'sun', 'sun'])
+        shared_fetch = history[1].prepared_at
+        self._revision(self.upcoming_start, shared_fetch)
+
+        # Act
+        self.service.compact(now=self.now)
+
+        # Assert
+        self.assertEqual(
+            list(ForecastReading.objects.filter(prepared_at=shared_fetch).values_list('hour', flat=True)),
+            [self.upcoming_start, self.upcoming_start + timedelta(hours=1)],
+        )
+
+    def test_deletes_in_batches(self):
+        # Arrange
+        self._history(self.past_start, ['sun'] * 7)
+
+        # Act
+        result = self.service.compact(now=self.now, batch_size=2)
+
+        # Assert
+        self.assertEqual(Forecast.objects.count(), 2)
+        self.assertEqual(result.forecasts, 5)
+        self.assertEqual(result.readings, 10)
+
+    def test_reports_the_bytes_reclaimed(self):
+        # Arrange
+        self._history(self.past_start, ['sun', 'sun', 'sun'])
+
+        # Act
+        with self.assertLogs('backoffice.services.forecast_compaction_service', level='INFO') as logs:
+            result = self.service.compact(now=self.now)
+
+        # Assert
+        expected = ESTIMATED_ROW_BYTES[Forecast] + 2 * ESTIMATED_ROW_BYTES[ForecastReading]
+        self.assertEqual(result.bytes, expected)
+        self.assertIn(f'removed 1 revisions and 2 hourly readings, about {expected} bytes', logs.output[0])
+
+    def test_a_second_run_has_nothing_left_to_remove(self):
+        # Arrange
+        self._history(self.past_start, ['sun', 'rain', 'rain', 'sun', 'sun'])
+        self.service.compact(now=self.now)
+
+        # Act
+        result = self.service.compact(now=self.now)
+
+        # Assert
+        self.assertEqual(result, CompactionResult(0, 0, 0))
+        self.assertEqual(Forecast.objects.count(), 4)
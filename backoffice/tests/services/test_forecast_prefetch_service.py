@@ -0,0 +1,134 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from backoffice.models import Event, Program
+from backoffice.services.forecast_prefetch_service import ForecastPrefetchService, pending_key
+from backoffice.services.forecast_service import DEFAULT_CELL, forecast_cell
+
+
+class ForecastPrefetchServiceTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = ForecastPrefetchService()
+        self.program = Program.objects.create(name='Test Program')
+        self.starts_at = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+
+    def _create_event(self, name='Test Event', **fields):
+        return Event.objects.create(
+            program=self.program,
+            name=name,
+            starts_at=fields.pop('starts_at', self.starts_at),
+            registration_closes_at=self.starts_at - timedelta(hours=1),
+            **fields,
+        )
+
+    def _request(self, *events):
+        with patch('backoffice.tasks.prefetch_forecasts.apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                for event in events:
+                    self.service.request(event)
+        return apply_async
+
+    def test_a_burst_of_edits_queues_one_delayed_fetch_per_cell(self):
+        # Arrange
+        event = self._create_event()
+        kanata = self._create_event('Kanata', latitude=Decimal('45.30880'), longitude=Decimal('-75.89850'))
+
+        # Act
+        apply_async = self._request(event, event, kanata, event)
+
+        # Assert
+        cell = forecast_cell(kanata.latitude, kanata.longitude)
+        self.assertEqual(apply_async.call_count, 2)
+        apply_async.assert_any_call(args=[str(DEFAULT_CELL.latitude), str(DEFAULT_CELL.longitude)], countdown=10)
+        apply_async.assert_any_call(args=[str(cell.latitude), str(cell.longitude)], countdown=10)
+
+    def test_ignores_events_that_are_not_shown_or_not_in_range(self):
+        # Arrange
+        draft = self._create_event('Draft', state=Event.STATE_DRAFT)
+        virtual = self._create_event('Virtual', virtual=True)
+        distant = self._create_event('Distant', starts_at=self.starts_at + timedelta(days=10))
+
+        # Act
+        apply_async = self._request(draft, virtual, distant)
+
+        # Assert
+        apply_async.assert_not_called()
+
+    def test_nothing_is_queued_if_the_edit_rolls_back(self):
+        # Arrange
+        event = self._create_event()
+
+        # Act
+        with patch('backoffice.tasks.prefetch_forecasts.apply_async') as apply_async:
+            self.service.request(event)
+
+        # Assert
+        apply_async.assert_not_called()
+        self.assertIsNone(cache.get(pending_key(DEFAULT_CELL)))
+
+    def test_prefetch_refreshes_the_events_in_its_cell(self):
+        # Arrange
+        event = self._create_event()
+        self._create_event('Kanata', latitude=Decimal('45.30880'), longitude=Decimal('-75.89850'))
+        cache.add(pending_key(DEFAULT_CELL), True)
+
+        with patch('backoffice.services.event_service.EventService.refresh_forecasts') as refresh:
+            refresh.return_value = 1
+
+            # Act
+            refreshed = self.service.prefetch(*DEFAULT_CELL)
+
+        # Assert
+        self.assertEqual(refreshed, 1)
+        refresh.assert_called_once_with([event])
+        self.assertIsNone(cache.get(pending_key(DEFAULT_CELL)))
+
+    @override_settings(FORECAST_PREFETCH_ON_SAVE=True)
+    def test_publishing_an_event_queues_a_prefetch(self):
+        # Arrange
+        event = self._create_event(state=Event.STATE_DRAFT)
+
+        # Act
+        with patch('backoffice.tasks.prefetch_forecasts.apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                event.live()
+                event.save()
+
+        # Assert
+        apply_async.assert_called_once()
+
+    @override_settings(FORECAST_PREFETCH_ON_SAVE=True)
+    def test_rescheduling_an_event_queues_a_prefetch(self):
+        # Arrange
+        event = self._create_event()
+        event = Event.objects.get(pk=event.pk)
+
+        # Act
+        with patch('backoffice.tasks.prefetch_forecasts.apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                event.starts_at += timedelta(hours=2)
+                event.save()
+
+        # Assert
+        apply_async.assert_called_once()
+
+    @override_settings(FORECAST_PREFETCH_ON_SAVE=True)
+    def test_edits_that_leave_the_window_alone_queue_nothing(self):
+        # Arrange
+        event = self._create_event()
+        event = Event.objects.get(pk=event.pk)
+
+        # Act
+        with patch('backoffice.tasks.prefetch_forecasts.apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                event.name = 'Renamed'
+                event.save()
+
+        # Assert
+        apply_async.assert_not_called()
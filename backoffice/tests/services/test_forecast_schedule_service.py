@@ -0,0 +1,103 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from backoffice.services.forecast_schedule_service import (
+    NEXT_REFRESH_CACHE_KEY,
+    ForecastScheduleService,
+    coalesced_deadline,
+)
+
+
+class CoalescedDeadlineTestCase(TestCase):
+    def test_waits_for_windows_falling_due_just_after_the_first(self):
+        # Arrange
+        now = timezone.now()
+        deadlines = [now + timedelta(minutes=10), now + timedelta(minutes=13), now + timedelta(hours=2)]
+
+        # Act
+        deadline = coalesced_deadline(deadlines)
+
+        # Assert
+        self.assertEqual(deadline, now + timedelta(minutes=13))
+
+    def test_is_none_without_deadlines(self):
+        # Act / Assert
+        self.assertIsNone(coalesced_deadline([]))
+
+
+class ForecastScheduleServiceTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = ForecastScheduleService()
+        self.now = timezone.now()
+
+    def _schedule(self, deadlines, now=None):
+        with patch(
+            'backoffice.services.event_service.EventService.forecast_refresh_deadlines',
+            return_value=deadlines,
+        ), patch('backoffice.tasks.refresh_forecasts.apply_async') as apply_async:
+            eta = self.service.schedule_next(now or self.now)
+        return eta, apply_async
+
+    def test_queues_a_run_for_the_earliest_deadline(self):
+        # Act
+        eta, apply_async = self._schedule([self.now + timedelta(minutes=20), self.now + timedelta(hours=3)])
+
+        # Assert
+        self.assertEqual(eta, self.now + timedelta(minutes=20))
+        apply_async.assert_called_once_with(eta=eta)
+
+    def test_reaches_a_distant_deadline_in_hops(self):
+        # Act
+        eta, _ = self._schedule([self.now + timedelta(hours=6)])
+
+        # Assert
+        self.assertEqual(eta, self.now + timedelta(minutes=55))
+
+    def test_backs_off_when_a_window_is_still_due(self):
+        # Act
+        eta, _ = self._schedule([self.now])
+
+        # Assert
+        self.assertEqual(eta, self.now + timedelta(minutes=15))
+
+    def test_leaves_an_earlier_queued_run_to_do_the_work(self):
+        # Arrange
+        first, _ = self._schedule([self.now + timedelta(minutes=20)])
+
+        # Act
+        eta, apply_async = self._schedule([self.now + timedelta(minutes=40)], self.now + timedelta(minutes=5))
+
+        # Assert
+        self.assertEqual(eta, first)
+        apply_async.assert_not_called()
+
+    def test_queues_ahead_of_a_later_queued_run(self):
+        # Arrange
+        self._schedule([self.now + timedelta(minutes=40)])
+
+        # Act
+        eta, apply_async = self._schedule([self.now + timedelta(minutes=10)])
+
+        # Assert
+        apply_async.assert_called_once_with(eta=self.now + timedelta(minutes=10))
+        self.assertEqual(cache.get(NEXT_REFRESH_CACHE_KEY), eta)
+
+    def test_returns_none_when_the_broker_is_unavailable(self):
+        # Arrange
+        with patch(
+            'backoffice.services.event_service.EventService.forecast_refresh_deadlines',
+            return_value=[self.now + timedelta(minutes=20)],
+        ), patch(
+            'backoffice.tasks.refresh_forecasts.apply_async', side_effect=ConnectionError('refused'),
+        ), self.assertLogs('backoffice.services.forecast_schedule_service', level='ERROR'):
+            # Act
+            eta = self.service.schedule_next(self.now)
+
+        # Assert
+        self.assertIsNone(eta)
+        self.assertIsNone(cache.get(NEXT_REFRESH_CACHE_KEY))
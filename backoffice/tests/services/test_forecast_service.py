@@ -1,19 +1,32 @@
+import random
 from datetime import datetime, timedelta, timezone as datetime_timezone
+from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
 import requests
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from backoffice.models import Forecast
+from backoffice.models import Forecast, ForecastReading
+from backoffice.services.forecast_client import AIR_QUALITY_URL, WEATHER_URL, ForecastClient
 from backoffice.services.forecast_service import (
-    AIR_QUALITY_URL,
+    DEFAULT_CELL,
+    Cell,
     ForecastService,
-    WEATHER_URL,
+    HourlySeries,
+    Window,
     YOW_LOCATION,
+    aqhi_series,
     compute_aqhi,
     condition_from_weather_code,
+    cell_fetch_lock,
+    due,
+    forecast_cell,
+    next_due_at,
     refresh_interval,
+    refresh_run_duration,
     snap_to_hour_ceiling,
 )
 
@@ -100,7 +113,7 @@ class ForecastServiceTestCase(TestCase):
         ends_at = self.starts_at + timedelta(hours=2, minutes=30)
         window_end = self.starts_at + timedelta(hours=3)
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(
                 self.starts_at, window_end,
                 weather_codes=[0, 95, 3, 0],
@@ -126,6 +139,60 @@ class ForecastServiceTestCase(TestCase):
         self.assertEqual([entry['aqhi'] for entry in forecast.hourly], [3, 3, 3, 3])
         self.assertEqual(Forecast.objects.count(), 1)
 
+    def test_stores_the_badge_summary_with_the_forecast(self):
+        # Arrange
+        window_end = self.starts_at + timedelta(hours=1)
+
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
+            mock_get.side_effect = _mock_get(self.starts_at, window_end, temperatures=[12.0, 16.0])
+
+            # Act
+            forecast = self.service.refresh_forecast(self.latitude, self.longitude, self.starts_at, window_end)
+
+        # Assert
+        forecast.refresh_from_db()
+        self.assertEqual(forecast.summary['condition_primary'], 'sun')
+        self.assertEqual(forecast.summary['temperature_display'], '12–16')
+        self.assertNotIn('hourly', forecast.summary)
+        self.assertTrue(forecast.material)
+
+    def test_refetch_with_an_unchanged_badge_is_not_material(self):
+        # Arrange
+        window_end = self.starts_at + timedelta(hours=1)
+
+        # Act
+        for temperatures in ([12.0, 12.0], [12.0, 12.0], [20.0, 20.0]):
+            with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
+                mock_get.side_effect = _mock_get(self.starts_at, window_end, temperatures=temperatures)
+                self.service.refresh_forecast(self.latitude, self.longitude, self.starts_at, window_end)
+
+        # Assert
+        self.assertEqual(
+            list(Forecast.objects.order_by('prepared_at').values_list('material', flat=True)),
+            [True, False, True],
+        )
+
+    def test_backfill_summarizes_forecasts_stored_without_a_summary(self):
+        # Arrange
+        for hours_ago, condition in ((3, 'sun'), (2, 'sun'), (1, 'rain')):
+            Forecast.objects.create(
+                latitude=self.latitude,
+                longitude=self.longitude,
+                start_time=self.starts_at,
+                end_time=self.starts_at,
+                prepared_at=timezone.now() - timedelta(hours=hours_ago),
+                hourly=_hourly_entry(self.starts_at, condition=condition),
+            )
+
+        # Act
+        summarized = self.service.backfill_summaries()
+
+        # Assert
+        forecasts = Forecast.objects.order_by('prepared_at')
+        self.assertEqual(summarized, 3)
+        self.assertEqual([forecast.summary['condition_primary'] for forecast in forecasts], ['sun', 'sun', 'rain'])
+        self.assertEqual([forecast.material for forecast in forecasts], [True, False, True])
+
     def test_fresh_forecast_returned_without_fetching(self):
         # Arrange
         window_end = self.starts_at + timedelta(hours=1)
@@ -138,7 +205,7 @@ class ForecastServiceTestCase(TestCase):
         )
 
         # Act
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             fresh = self.service.get_forecast(self.starts_at, window_end)
 
         # Assert
@@ -160,7 +227,7 @@ class ForecastServiceTestCase(TestCase):
         )
 
         # Act
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             fresh = self.service.get_forecast(self.starts_at, window_end)
 
         # Assert
@@ -302,7 +369,7 @@ class ForecastServiceTestCase(TestCase):
 
     def test_no_stored_forecast_yields_no_fresh_forecast(self):
         # Act
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             fresh = self.service.get_forecast(self.starts_at)
 
         # Assert
@@ -316,7 +383,7 @@ class ForecastServiceTestCase(TestCase):
         )
 
         # Act
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             fresh = self.service.get_forecast(far_starts_at)
 
         # Assert
@@ -334,7 +401,7 @@ class ForecastServiceTestCase(TestCase):
             unrelated_end = unrelated_start + timedelta(hours=1)
             return _mock_response(_air_quality_payload(unrelated_start, unrelated_end))
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = side_effect
 
             # Act
@@ -355,7 +422,7 @@ class ForecastServiceTestCase(TestCase):
             partial_end = self.starts_at + timedelta(hours=1)
             return _mock_response(_air_quality_payload(self.starts_at, partial_end))
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = side_effect
 
             # Act
@@ -367,7 +434,7 @@ class ForecastServiceTestCase(TestCase):
 
     def test_missing_end_defaults_to_one_hour_window(self):
         # Arrange
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=1))
 
             # Act
@@ -386,7 +453,7 @@ class ForecastServiceTestCase(TestCase):
             hourly=_hourly_entry(self.starts_at, condition='sun'),
         )
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=1))
 
             # Act
@@ -401,7 +468,7 @@ class ForecastServiceTestCase(TestCase):
         short_end = self.starts_at + timedelta(hours=1)
         long_end = self.starts_at + timedelta(hours=4)
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, long_end)
 
             # Act
@@ -425,7 +492,7 @@ class ForecastServiceTestCase(TestCase):
             prepared_at=timezone.now() - timedelta(hours=2)
         )
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(
                 self.starts_at, self.starts_at + timedelta(hours=1),
                 weather_codes=[61, 61],
@@ -457,7 +524,7 @@ class ForecastServiceTestCase(TestCase):
         )
         newer = Forecast.objects.create(hourly=_hourly_entry(self.starts_at, condition='sun'), **common)
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             # Act
             forecast = self.service.get_forecast(self.starts_at)
 
@@ -467,7 +534,7 @@ class ForecastServiceTestCase(TestCase):
 
     def test_start_times_in_same_hour_share_a_window(self):
         # Arrange
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=1))
 
             # Act
@@ -487,7 +554,7 @@ class ForecastServiceTestCase(TestCase):
         available_end = self.starts_at + timedelta(hours=1)
         requested_end = self.starts_at + timedelta(hours=6)
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, available_end)
 
             # Act
@@ -504,7 +571,7 @@ class ForecastServiceTestCase(TestCase):
         before = timezone.now()
         requested_end = self.starts_at + timedelta(days=30)
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=2))
 
             # Act
@@ -527,7 +594,7 @@ class ForecastServiceTestCase(TestCase):
         ends_at = now + timedelta(hours=1)
 
         with patch('backoffice.services.forecast_service.timezone.now', return_value=now):
-            with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+            with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
                 # Act
                 forecast = self.service.refresh_forecast(
                     self.latitude, self.longitude, starts_at, ends_at
@@ -544,7 +611,7 @@ class ForecastServiceTestCase(TestCase):
         ends_at = starts_at + timedelta(hours=2)
 
         with patch('backoffice.services.forecast_service.timezone.now', return_value=now):
-            with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+            with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
                 # Act
                 forecast = self.service.refresh_forecast(
                     self.latitude, self.longitude, starts_at, ends_at
@@ -560,7 +627,7 @@ class ForecastServiceTestCase(TestCase):
         past = now - timedelta(days=1)
 
         with patch('backoffice.services.forecast_service.timezone.now', return_value=now):
-            with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+            with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
                 # Act
                 forecast = self.service.refresh_forecast(self.latitude, self.longitude, past)
 
@@ -576,7 +643,7 @@ class ForecastServiceTestCase(TestCase):
         ends_at = starts_at + timedelta(hours=2)
 
         with patch('backoffice.services.forecast_service.timezone.now', return_value=now):
-            with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+            with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
                 # Act
                 forecast = self.service.refresh_forecast(
                     self.latitude, self.longitude, starts_at, ends_at
@@ -593,7 +660,7 @@ class ForecastServiceTestCase(TestCase):
         starts_at = now - timedelta(hours=25)
 
         with patch('backoffice.services.forecast_service.timezone.now', return_value=now):
-            with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+            with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
                 # Act
                 forecast = self.service.refresh_forecast(
                     self.latitude, self.longitude, starts_at, starts_at + timedelta(hours=2)
@@ -607,7 +674,7 @@ class ForecastServiceTestCase(TestCase):
         # Arrange
         window_end = self.starts_at + timedelta(hours=1)
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, window_end)
 
             # Act
@@ -625,7 +692,7 @@ class ForecastServiceTestCase(TestCase):
         # Arrange
         window_end = self.starts_at + timedelta(hours=1)
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, window_end)
 
             # Act
@@ -641,7 +708,7 @@ class ForecastServiceTestCase(TestCase):
         starts_at = now - timedelta(hours=4)
 
         with patch('backoffice.services.forecast_service.timezone.now', return_value=now):
-            with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+            with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
                 # Act
                 forecast = self.service.refresh_forecast(
                     self.latitude, self.longitude, starts_at, starts_at + timedelta(hours=6)
@@ -655,7 +722,7 @@ class ForecastServiceTestCase(TestCase):
         # Arrange
         far_future = timezone.now() + timedelta(days=9)
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             # Act
             forecast = self.service.refresh_forecast(self.latitude, self.longitude, far_future)
 
@@ -676,7 +743,7 @@ class ForecastServiceTestCase(TestCase):
             prepared_at=timezone.now() - timedelta(hours=7)
         )
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = requests.ConnectionError('boom')
 
             # Act
@@ -691,7 +758,7 @@ class ForecastServiceTestCase(TestCase):
 
     def test_fetch_failure_without_stored_forecast_returns_none(self):
         # Arrange
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = requests.ConnectionError('boom')
 
             # Act
@@ -830,6 +897,49 @@ class AqhiComputationTestCase(TestCase):
         # Assert
         self.assertEqual(aqhi, 3)
 
+    def test_series_matches_the_single_hour_computation(self):
+        # Arrange
+        concentrations = [None, 0.0, 1.0, 8, 10.5, 50.0, 250.0, 1000.0, 5000.0]
+        combinations = [
+            (pm2_5, nitrogen_dioxide, ozone)
+            for pm2_5 in concentrations
+            for nitrogen_dioxide in concentrations
+            for ozone in concentrations
+        ]
+        hourly = {
+            'time': [str(index) for index in range(len(combinations))],
+            **self._hourly(*(list(series) for series in zip(*combinations))),
+        }
+
+        # Act
+        series = aqhi_series(hourly)
+
+        # Assert
+        self.assertEqual(series, [compute_aqhi(hourly, index) for index in range(len(combinations))])
+
+    def test_series_matches_the_single_hour_computation_over_a_week(self):
+        # Arrange
+        rng = random.Random(19)
+
+        def reading(high):
+            return None if rng.random() < 0.1 else rng.uniform(0, high)
+
+        hours = 7 * 24
+        hourly = {
+            'time': [str(index) for index in range(hours)],
+            **self._hourly(
+                [reading(60) for _ in range(hours)],
+                [reading(120) for _ in range(hours)],
+                [reading(250) for _ in range(hours)],
+            ),
+        }
+
+        # Act
+        series = aqhi_series(hourly)
+
+        # Assert
+        self.assertEqual(series, [compute_aqhi(hourly, index) for index in range(hours)])
+
     def test_missing_pollutant_data_still_produces_forecast_without_aqhi(self):
         # Arrange
         service = ForecastService()
@@ -847,7 +957,7 @@ class AqhiComputationTestCase(TestCase):
             payload['hourly']['ozone'] = [None] * hour_count
             return _mock_response(payload)
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = side_effect
 
             # Act
@@ -906,7 +1016,7 @@ class ForecastServiceWindowsTestCase(TestCase):
         first = (self.starts_at + timedelta(minutes=1), self.starts_at + timedelta(hours=1, minutes=1))
         second = (self.starts_at + timedelta(minutes=55), self.starts_at + timedelta(hours=1, minutes=55))
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=2))
 
             # Act
@@ -921,7 +1031,7 @@ class ForecastServiceWindowsTestCase(TestCase):
         short = (self.starts_at, self.starts_at + timedelta(hours=1))
         long = (self.starts_at, self.starts_at + timedelta(hours=4))
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=4))
 
             # Act
@@ -930,12 +1040,177 @@ class ForecastServiceWindowsTestCase(TestCase):
         # Assert
         self.assertNotEqual(forecasts[short].pk, forecasts[long].pk)
 
+    def test_many_windows_share_one_download_per_feed(self):
+        # Arrange
+        windows = [
+            (self.starts_at + timedelta(hours=offset), self.starts_at + timedelta(hours=offset + 1))
+            for offset in range(10)
+        ]
+
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
+            mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=11))
+
+            # Act
+            forecasts = self.service.refresh_forecasts_for_windows(windows)
+
+        # Assert
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(len({forecast.pk for forecast in forecasts.values()}), 10)
+
+    def test_fetches_once_per_grid_cell(self):
+        # Arrange
+        kanata = forecast_cell(Decimal('45.30880'), Decimal('-75.89850'))
+        windows = [
+            (self.starts_at, self.starts_at + timedelta(hours=1)),
+            (self.starts_at, self.starts_at + timedelta(hours=1), kanata),
+            (self.starts_at + timedelta(hours=1), self.starts_at + timedelta(hours=2), kanata),
+        ]
+
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
+            mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=3))
+
+            # Act
+            forecasts = self.service.refresh_forecasts_for_windows(windows)
+
+        # Assert
+        self.assertEqual(mock_get.call_count, 4)
+        self.assertEqual(
+            [Cell(forecast.latitude, forecast.longitude) for forecast in forecasts.values()],
+            [DEFAULT_CELL, kanata, kanata],
+        )
+        self.assertEqual(self.service.get_forecasts_for_windows(windows), forecasts)
+
+    def test_skips_a_cell_another_run_is_fetching(self):
+        # Arrange
+        window = (self.starts_at, self.starts_at + timedelta(hours=1))
+
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get, \
+                cell_fetch_lock(DEFAULT_CELL):
+            # Act
+            forecasts = self.service.refresh_forecasts_for_windows([window])
+
+        # Assert
+        mock_get.assert_not_called()
+        self.assertIsNone(forecasts[window])
+
+    def test_stops_fetching_cells_once_the_circuit_opens(self):
+        # Arrange
+        service = ForecastService(client=ForecastClient(failure_threshold=1))
+        windows = [
+            (self.starts_at, self.starts_at + timedelta(hours=1), forecast_cell(Decimal(latitude), Decimal('-75.7')))
+            for latitude in ('45.1', '45.5', '45.9')
+        ]
+
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
+            mock_get.side_effect = requests.ConnectionError('refused')
+
+            # Act
+            with self.assertLogs('backoffice.services.forecast_service', level='WARNING') as logs:
+                forecasts = service.refresh_forecasts_for_windows(windows)
+
+        # Assert
+        self.assertLessEqual(mock_get.call_count, 2)
+        self.assertEqual(list(forecasts.values()), [None, None, None])
+        self.assertTrue(any('circuit is open' in line for line in logs.output))
+
+    def test_overlapping_windows_from_one_run_store_each_hour_once(self):
+        # Arrange
+        windows = [
+            (self.starts_at, self.starts_at + timedelta(hours=duration))
+            for duration in (1, 2, 3)
+        ]
+
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
+            mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=3))
+
+            # Act
+            forecasts = self.service.refresh_forecasts_for_windows(windows)
+
+        # Assert
+        self.assertEqual(ForecastReading.objects.count(), 4)
+        for window in windows:
+            stored = Forecast.objects.get(pk=forecasts[window].pk)
+            self.assertEqual(stored.hourly, forecasts[window].hourly)
+            self.assertEqual(len(stored.hourly), len(forecasts[window].hourly))
+        self.assertEqual([len(forecasts[window].hourly) for window in windows], [2, 3, 4])
+
+    def test_lookup_reads_only_the_current_revision_of_each_window(self):
+        # Arrange
+        window = (self.starts_at, self.starts_at + timedelta(hours=1))
+        for minutes_ago in (90, 60, 30):
+            forecast = self._create_forecast(*window)
+            Forecast.objects.filter(pk=forecast.pk).update(prepared_at=timezone.now() - timedelta(minutes=minutes_ago))
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            forecasts = self.service.get_forecasts_for_windows([window])
+
+        # Assert
+        self.assertEqual(forecasts[window], Forecast.objects.latest('prepared_at'))
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertIn('"is_current"', queries.captured_queries[0]['sql'])
+
+    @patch('backoffice.services.forecast_service.CURRENT_LOOKUP_BATCH_SIZE', 2)
+    def test_lookup_probes_each_window_in_batches(self):
+        # Arrange
+        windows = [
+            (self.starts_at + timedelta(hours=offset), self.starts_at + timedelta(hours=offset + 1))
+            for offset in range(3)
+        ]
+        created = [self._create_forecast(start, end) for start, end in windows]
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            forecasts = self.service.get_forecasts_for_windows(windows)
+
+        # Assert
+        self.assertEqual([forecasts[window] for window in windows], created)
+        self.assertEqual(len(queries.captured_queries), 2)
+        self.assertIn('UNION ALL', queries.captured_queries[0]['sql'])
+        self.assertNotIn(' OR ', queries.captured_queries[0]['sql'])
+
+    def test_lookup_leaves_readings_to_be_loaded_for_every_window_in_one_query(self):
+        # Arrange
+        windows = [
+            (self.starts_at + timedelta(hours=offset), self.starts_at + timedelta(hours=offset + 1))
+            for offset in range(3)
+        ]
+        for start, end in windows:
+            self._create_forecast(start, end)
+
+        # Act
+        with self.assertNumQueries(1):
+            forecasts = self.service.get_forecasts_for_windows(windows)
+        with self.assertNumQueries(1):
+            Forecast.load_readings(forecasts.values())
+            hours = [forecast.hourly for forecast in forecasts.values()]
+
+        # Assert
+        self.assertTrue(all(hours))
+
+    def test_failed_download_is_not_retried_for_each_window(self):
+        # Arrange
+        windows = [
+            (self.starts_at + timedelta(hours=offset), self.starts_at + timedelta(hours=offset + 1))
+            for offset in range(3)
+        ]
+
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
+            mock_get.side_effect = requests.RequestException('provider down')
+
+            # Act
+            forecasts = self.service.refresh_forecasts_for_windows(windows)
+
+        # Assert
+        self.assertLessEqual(mock_get.call_count, 2)
+        self.assertEqual(list(forecasts.values()), [None, None, None])
+
     def test_window_outside_forecast_range_maps_to_none(self):
         # Arrange
         far_out = timezone.now() + timedelta(days=9)
         window = (far_out, far_out + timedelta(hours=1))
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             # Act
             forecasts = self.service.refresh_forecasts_for_windows([window])
 
@@ -955,7 +1230,7 @@ class ForecastServiceWindowsTestCase(TestCase):
         window = (self.starts_at, self.starts_at + timedelta(hours=1))
         existing = self._create_forecast(window[0], window[1])
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             # Act
             forecasts = self.service.refresh_forecasts_for_windows([window])
 
@@ -968,7 +1243,7 @@ class ForecastServiceWindowsTestCase(TestCase):
         # Arrange
         window = (self.starts_at, self.starts_at + timedelta(hours=1))
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=1))
 
             # Act
@@ -989,7 +1264,7 @@ class ForecastServiceWindowsTestCase(TestCase):
             prepared_at=timezone.now() - timedelta(hours=2, minutes=1)
         )
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=1))
 
             # Act
@@ -1007,7 +1282,7 @@ class ForecastServiceWindowsTestCase(TestCase):
             prepared_at=timezone.now() - timedelta(minutes=90)
         )
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=1))
 
             # Act
@@ -1026,7 +1301,7 @@ class ForecastServiceWindowsTestCase(TestCase):
             prepared_at=timezone.now() - timedelta(minutes=45)
         )
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             # Act
             forecasts = self.service.refresh_forecasts_for_windows([window])
 
@@ -1043,7 +1318,7 @@ class ForecastServiceWindowsTestCase(TestCase):
             prepared_at=timezone.now() - timedelta(minutes=90)
         )
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = requests.RequestException('provider down')
 
             # Act
@@ -1062,7 +1337,7 @@ class ForecastServiceWindowsTestCase(TestCase):
             prepared_at=now - timedelta(hours=1) + timedelta(seconds=1)
         )
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             mock_get.side_effect = _mock_get(self.starts_at, self.starts_at + timedelta(hours=1))
 
             # Act
@@ -1080,7 +1355,7 @@ class ForecastServiceWindowsTestCase(TestCase):
             prepared_at=now - timedelta(minutes=6)
         )
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             # Act
             forecasts = self.service.refresh_forecasts_for_windows([window], now=now)
 
@@ -1099,7 +1374,7 @@ class ForecastServiceWindowsTestCase(TestCase):
             prepared_at=timezone.now() - timedelta(hours=11)
         )
 
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             # Act
             forecasts = self.service.refresh_forecasts_for_windows([window])
 
@@ -1147,6 +1422,139 @@ class ForecastRefreshIntervalTestCase(TestCase):
         self.assertEqual(far_out, timedelta(hours=12))
 
 
+class HourlySeriesTestCase(TestCase):
+    def setUp(self):
+        self.start = datetime(2026, 6, 1, 4, tzinfo=datetime_timezone.utc)
+        self.series = HourlySeries({'hourly': {
+            'time': [(self.start + timedelta(hours=n)).strftime('%Y-%m-%dT%H:%M') for n in range(6)],
+        }})
+
+    def test_indexes_window_hours_by_offset_from_the_first_hour(self):
+        # Arrange
+        window = Window(self.start + timedelta(hours=2), self.start + timedelta(hours=3))
+
+        # Act
+        hours = self.series.indexed_hours(window)
+
+        # Assert
+        self.assertEqual(hours, [(window.start, 2), (window.end, 3)])
+
+    def test_stops_at_the_end_of_the_feed(self):
+        # Arrange
+        window = Window(self.start + timedelta(hours=4), self.start + timedelta(hours=8))
+
+        # Act
+        hours = self.series.indexed_hours(window)
+
+        # Assert
+        self.assertEqual([index for _, index in hours], [4, 5])
+
+    def test_has_no_hours_for_a_window_before_the_feed(self):
+        # Arrange
+        window = Window(self.start - timedelta(hours=1), self.start + timedelta(hours=1))
+
+        # Act
+        hours = self.series.indexed_hours(window)
+
+        # Assert
+        self.assertEqual(hours, [])
+
+    def test_rejects_a_feed_with_gaps(self):
+        # Arrange
+        series = HourlySeries({'hourly': {'time': ['2026-06-01T04:00', '2026-06-01T06:00']}})
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            series.indexed_hours(Window(self.start, self.start + timedelta(hours=1)))
+
+
+class ForecastCellTestCase(TestCase):
+    def test_events_without_coordinates_use_the_default_location(self):
+        # Act / Assert
+        self.assertEqual(forecast_cell(None, None), DEFAULT_CELL)
+
+    def test_snaps_to_the_grid_anchored_on_the_default_location(self):
+        # Act
+        cell = forecast_cell(Decimal('45.42150'), Decimal('-75.69720'))
+
+        # Assert
+        self.assertEqual(cell, Cell(Decimal('45.42250'), Decimal('-75.66920')))
+
+    def test_nearby_starts_share_the_default_cell(self):
+        # Act
+        cell = forecast_cell(Decimal('45.35000'), Decimal('-75.70000'))
+
+        # Assert
+        self.assertEqual(cell, DEFAULT_CELL)
+
+    @override_settings(FORECAST_GRID_CELL_DEGREES=Decimal('0.5'))
+    def test_cell_size_is_configurable(self):
+        # Act
+        cell = forecast_cell(Decimal('45.42150'), Decimal('-75.89850'))
+
+        # Assert
+        self.assertEqual(cell, DEFAULT_CELL)
+
+
+class ForecastNextDueTestCase(TestCase):
+    def setUp(self):
+        self.now = timezone.now().replace(microsecond=0)
+        start = (self.now + timedelta(days=3)).replace(minute=0, second=0)
+        self.window = Window(start, start + timedelta(hours=2))
+
+    def test_a_window_without_a_forecast_is_due_now(self):
+        # Act
+        deadline = next_due_at(None, self.window, self.now)
+
+        # Assert
+        self.assertEqual(deadline, self.now)
+
+    def test_is_the_first_second_the_window_is_due(self):
+        # Arrange
+        forecast = Forecast(prepared_at=self.now)
+
+        # Act
+        deadline = next_due_at(forecast, self.window, self.now)
+
+        # Assert
+        self.assertGreater(deadline, self.now + timedelta(hours=3))
+        self.assertLess(deadline, self.now + timedelta(hours=5))
+        self.assertTrue(due(forecast, self.window, deadline))
+        self.assertFalse(due(forecast, self.window, deadline - timedelta(seconds=1)))
+
+    def test_a_window_not_due_before_it_starts_has_no_deadline(self):
+        # Arrange
+        start = (self.now + timedelta(minutes=30)).replace(second=0)
+        window = Window(start, start + timedelta(hours=1))
+
+        # Act
+        deadline = next_due_at(Forecast(prepared_at=self.now), window, self.now)
+
+        # Assert
+        self.assertIsNone(deadline)
+
+    def test_a_run_over_more_cells_allows_for_a_later_fetch(self):
+        # Arrange
+        forecast = Forecast(prepared_at=self.now)
+        deadline = next_due_at(forecast, self.window, self.now)
+
+        # Act
+        many_cells_deadline = next_due_at(forecast, self.window, self.now, cells=20)
+
+        # Assert
+        self.assertEqual(deadline - many_cells_deadline, refresh_run_duration(20) - refresh_run_duration(1))
+        self.assertFalse(due(forecast, self.window, many_cells_deadline - timedelta(seconds=1), cells=20))
+
+    def test_run_duration_grows_with_cells_up_to_a_cap(self):
+        # Act
+        durations = [refresh_run_duration(cells) for cells in (0, 1, 2, 10_000)]
+
+        # Assert
+        self.assertEqual(durations[0], durations[1])
+        self.assertEqual(durations[2], 2 * durations[1])
+        self.assertLess(durations[3], timedelta(hours=1))
+
+
 class ForecastServiceHistoryTestCase(TestCase):
     def setUp(self):
         self.service = ForecastService()
@@ -1193,7 +1601,8 @@ class ForecastServiceHistoryTestCase(TestCase):
         # Arrange
         with_readings = self._create_forecast()
         empty = self._create_forecast()
-        Forecast.objects.filter(pk=empty.pk).update(hourly=[])
+        ForecastReading.objects.filter(prepared_at=empty.readings_prepared_at).delete()
+        Forecast.objects.filter(pk=empty.pk).update(has_readings=False)
 
         # Act
         forecasts = list(self.service.get_forecast_history(self.latitude, self.longitude, self.starts_at))
@@ -1,3 +1,5 @@
+import json
+from dataclasses import replace
 from datetime import timedelta
 from decimal import Decimal
 
@@ -5,7 +7,7 @@ from django.test import TestCase
 from django.utils import timezone
 
 from backoffice.models import Forecast
-from backoffice.services.forecast_summary import summarize
+from backoffice.services.forecast_summary import stored_summary, summarize, summary_record
 
 
 class ForecastSummaryTestCase(TestCase):
@@ -373,3 +375,20 @@ class ForecastSummaryTestCase(TestCase):
         self.assertIsNone(summary.hourly[0].aqhi)
         self.assertIsNone(summary.hourly[0].aqhi_display)
         self.assertIsNone(summary.hourly[0].aqhi_category)
+
+    def test_stored_summary_matches_the_one_computed_from_readings(self):
+        # Arrange
+        forecast = self._build_forecast([
+            self._hour(0, 'cloud', 12, 4),
+            self._hour(1, 'cloud', 14, 4),
+            self._hour(2, 'thunder', 18, 8),
+        ])
+        computed = summarize(forecast)
+        forecast.summary = json.loads(json.dumps(summary_record(computed)))
+
+        # Act
+        stored = stored_summary(forecast)
+
+        # Assert
+        self.assertEqual(stored, replace(computed, hourly=None))
+        self.assertEqual(stored.condition_warning, Forecast.Condition.THUNDER)
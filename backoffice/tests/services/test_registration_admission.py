@@ -0,0 +1,246 @@
+import threading
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from backoffice.models import Event, EventStats, Program, Registration
+from backoffice.services.registration_service import (
+    RegistrationDetail, RegistrationResult, RegistrationService, UserDetail,
+)
+
+
+def _create_event(program: Program, registration_limit: int) -> Event:
+    return Event.objects.create(
+        program=program,
+        name='Limited Event',
+        starts_at=timezone.now() + timedelta(days=7),
+        registration_closes_at=timezone.now() + timedelta(days=6),
+        registration_limit=registration_limit,
+    )
+
+
+def _register(service: RegistrationService, event: Event, index: int) -> RegistrationResult:
+    email = f'rider{index}@example.com'
+    user = User.objects.create_user(username=email, email=email)
+    user_detail = UserDetail(first_name='Rider', last_name=str(index), email=email, phone='+16135550000')
+    registration_detail = RegistrationDetail(
+        ride=None,
+        ride_leader_preference=Registration.RideLeaderPreference.NO,
+        speed_range_preference=None,
+        emergency_contact_name='Contact',
+        emergency_contact_phone='+16135551111',
+    )
+    return service.register(user_detail, registration_detail, event, acting_user=user)
+
+
+class RegistrationAdmissionTests(TestCase):
+    def setUp(self):
+        self.program = Program.objects.create(name='Admission Program')
+        self.event = _create_event(self.program, registration_limit=3)
+        self.service = RegistrationService()
+
+    def _states(self) -> list[str]:
+        return list(Registration.objects.filter(event=self.event).order_by('pk').values_list('state', flat=True))
+
+    def test_burst_past_the_limit_is_waitlisted(self):
+        # Arrange
+        # (Setup creates an event limited to 3)
+
+        # Act
+        results = [_register(self.service, self.event, index) for index in range(6)]
+
+        # Assert
+        self.assertEqual(results, [RegistrationResult.CONFIRMED] * 3 + [RegistrationResult.WAITLISTED] * 3)
+        self.assertEqual(self._states(), [Registration.STATE_CONFIRMED] * 3 + [Registration.STATE_WAITLISTED] * 3)
+        self.assertEqual(EventStats.objects.get(event=self.event).confirmed_registration_count, 3)
+
+    def test_waitlisted_registration_is_emailed(self):
+        # Arrange
+        for index in range(3):
+            _register(self.service, self.event, index)
+        mail.outbox = []
+
+        # Act
+        _register(self.service, self.event, 3)
+
+        # Assert
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, '[OBC] Waitlisted for Limited Event')
+
+    def test_withdrawing_confirmed_registration_promotes_oldest_waitlisted(self):
+        # Arrange
+        for index in range(5):
+            _register(self.service, self.event, index)
+        withdrawn = Registration.objects.filter(event=self.event).order_by('pk').first()
+        mail.outbox = []
+
+        # Act
+        self.service.withdraw_registration(withdrawn, withdrawn.user)
+
+        # Assert
+        self.assertEqual(self._states(), [
+            Registration.STATE_WITHDRAWN,
+            Registration.STATE_CONFIRMED,
+            Registration.STATE_CONFIRMED,
+            Registration.STATE_CONFIRMED,
+            Registration.STATE_WAITLISTED,
+        ])
+        self.assertIn('[OBC] Confirmed for Limited Event', [message.subject for message in mail.outbox])
+
+    def test_staff_withdrawal_from_a_cancelled_event_does_not_promote(self):
+        # Arrange
+        for index in range(5):
+            _register(self.service, self.event, index)
+        Event.objects.filter(pk=self.event.pk).update(state=Event.STATE_CANCELLED)
+        withdrawn = Registration.objects.select_related('event').filter(event=self.event).order_by('pk').first()
+        staff_user = User.objects.create_user(username='staff', email='staff@example.com', is_staff=True)
+        mail.outbox = []
+
+        # Act
+        self.service.staff_withdraw(withdrawn, staff_user)
+
+        # Assert
+        self.assertEqual(Registration.objects.filter(event=self.event, state=Registration.STATE_WAITLISTED).count(), 2)
+        self.assertNotIn('[OBC] Confirmed for Limited Event', [message.subject for message in mail.outbox])
+
+    def test_finished_event_does_not_promote(self):
+        # Arrange
+        for index in range(5):
+            _register(self.service, self.event, index)
+        Registration.objects.filter(event=self.event).order_by('pk').first().delete()
+        Event.objects.filter(pk=self.event.pk).update(
+            starts_at=timezone.now() - timedelta(hours=3), ends_at=timezone.now() - timedelta(hours=1),
+        )
+        event = Event.objects.get(pk=self.event.pk)
+
+        # Act
+        promoted = self.service.promote_from_waitlist(event)
+
+        # Assert
+        self.assertEqual(promoted, 0)
+        self.assertEqual(Registration.objects.filter(event=self.event, state=Registration.STATE_WAITLISTED).count(), 2)
+
+    def test_withdrawing_waitlisted_registration_does_not_promote(self):
+        # Arrange
+        for index in range(5):
+            _register(self.service, self.event, index)
+        waitlisted = Registration.objects.filter(event=self.event, state=Registration.STATE_WAITLISTED).first()
+
+        # Act
+        self.service.withdraw_registration(waitlisted, waitlisted.user)
+
+        # Assert
+        self.assertEqual(Registration.objects.filter(event=self.event, state=Registration.STATE_CONFIRMED).count(), 3)
+        self.assertEqual(Registration.objects.filter(event=self.event, state=Registration.STATE_WAITLISTED).count(), 1)
+
+    def test_unrelated_registration_saved_between_claims_keeps_the_seat(self):
+        # Arrange
+        event = _create_event(self.program, registration_limit=1)
+        # A seat taken by a transaction whose confirmation other connections can't see yet
+        EventStats.objects.filter(event=event).update(confirmed_registration_count=1)
+
+        # Act
+        Registration.objects.create(event=event, name='Unrelated Rider', email='unrelated@example.com')
+        with transaction.atomic():
+            claimed = self.service.event_stats_service.claim_seat(event)
+
+        # Assert
+        self.assertFalse(claimed)
+        self.assertEqual(EventStats.objects.get(event=event).confirmed_registration_count, 1)
+
+    def test_full_event_still_accepts_registrations_for_the_waitlist(self):
+        # Arrange
+        for index in range(3):
+            _register(self.service, self.event, index)
+
+        # Act
+        allowed, reason = self.service.is_registration_allowed(self.event)
+
+        # Assert
+        self.assertEqual((allowed, reason), (True, None))
+
+    def test_raising_the_limit_promotes_waitlisted_riders(self):
+        # Arrange
+        for index in range(6):
+            _register(self.service, self.event, index)
+        event = Event.objects.get(pk=self.event.pk)
+
+        # Act
+        event.registration_limit = 5
+        event.save()
+
+        # Assert
+        self.assertEqual(self._states(), [Registration.STATE_CONFIRMED] * 5 + [Registration.STATE_WAITLISTED])
+
+    def test_removing_the_limit_promotes_the_whole_waitlist(self):
+        # Arrange
+        for index in range(5):
+            _register(self.service, self.event, index)
+        event = Event.objects.get(pk=self.event.pk)
+
+        # Act
+        event.registration_limit = None
+        event.save()
+
+        # Assert
+        self.assertEqual(self._states(), [Registration.STATE_CONFIRMED] * 5)
+
+    def test_lowering_the_limit_confirms_no_one(self):
+        # Arrange
+        for index in range(4):
+            _register(self.service, self.event, index)
+        event = Event.objects.get(pk=self.event.pk)
+
+        # Act
+        event.registration_limit = 2
+        event.save()
+        event.registration_limit = 3
+        event.save()
+
+        # Assert
+        self.assertEqual(self._states(), [Registration.STATE_CONFIRMED] * 3 + [Registration.STATE_WAITLISTED])
+
+    def test_unlimited_event_confirms_everyone(self):
+        # Arrange
+        event = _create_event(self.program, registration_limit=None)
+
+        # Act
+        results = {_register(self.service, event, index) for index in range(5)}
+
+        # Assert
+        self.assertEqual(results, {RegistrationResult.CONFIRMED})
+
+
+class ConcurrentRegistrationAdmissionTests(TransactionTestCase):
+    def test_parallel_registrations_never_exceed_the_limit(self):
+        # Arrange
+        program = Program.objects.create(name='Concurrent Program')
+        event = _create_event(program, registration_limit=25)
+        barrier = threading.Barrier(200)
+        errors = []
+
+        def worker(index):
+            try:
+                barrier.wait()
+                _register(RegistrationService(), event, index)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(200)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        self.assertEqual(errors, [])
+        self.assertEqual(Registration.objects.filter(event=event, state=Registration.STATE_CONFIRMED).count(), 25)
+        self.assertEqual(Registration.objects.filter(event=event, state=Registration.STATE_WAITLISTED).count(), 175)
@@ -1696,7 +1696,7 @@ class IsRegistrationAllowedTestCase(TestCase):
         self.assertFalse(allowed)
         self.assertEqual(reason, 'Event uses external registration.')
 
-    def test_registration_not_allowed_when_at_capacity(self):
+    def test_registration_allowed_when_at_capacity(self):
         event = Event.objects.create(
             program=self.program,
             name="Full Event",
@@ -1718,8 +1718,9 @@ class IsRegistrationAllowedTestCase(TestCase):
 
         allowed, reason = self.service.is_registration_allowed(event)
 
-        self.assertFalse(allowed)
-        self.assertEqual(reason, 'Event has reached capacity.')
+        # The registration is waitlisted rather than turned away
+        self.assertTrue(allowed)
+        self.assertIsNone(reason)
 
     def test_is_registration_allowed_blocks_disabled(self):
         # Arrange
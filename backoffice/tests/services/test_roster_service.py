@@ -0,0 +1,156 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from backoffice.models import Event, Program, Registration, Ride, Route, SpeedRange, UserProfile
+from backoffice.services.roster_service import RosterService, RosterViewer
+
+
+class RosterServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = RosterService()
+        program = Program.objects.create(name='Test Program')
+        self.event = Event.objects.create(
+            program=program,
+            name='Test Event',
+            starts_at=timezone.now() + timedelta(days=7),
+            registration_closes_at=timezone.now() + timedelta(days=6),
+        )
+        self.route = Route.objects.create(name='Test Route')
+        self.ride = Ride.objects.create(name='Long', event=self.event, route=self.route, ordering=1)
+        self.fast = SpeedRange.objects.create(lower_limit=30, upper_limit=35)
+        self.slow = SpeedRange.objects.create(lower_limit=20, upper_limit=25)
+        self.ride.speed_ranges.add(self.fast, self.slow)
+
+    def _register(self, name, ride=None, speed_range=None, leader=False, user=None):
+        first_name, last_name = name.split()
+        return Registration.objects.create(
+            event=self.event,
+            ride=ride or self.ride,
+            speed_range_preference=speed_range,
+            first_name=first_name,
+            last_name=last_name,
+            name=name,
+            email=f'{first_name.lower()}@example.com',
+            user=user,
+            ride_leader_preference=(
+                Registration.RideLeaderPreference.YES if leader else Registration.RideLeaderPreference.NO
+            ),
+            state=Registration.STATE_CONFIRMED,
+        )
+
+    def test_groups_riders_by_speed_range_in_display_order(self):
+        # Arrange
+        short = Ride.objects.create(name='Short', event=self.event, route=self.route, ordering=2)
+        self._register('Zoe Zed', speed_range=self.slow)
+        self._register('Amy Able', speed_range=self.slow, leader=True)
+        self._register('Bob Bell', speed_range=self.fast)
+        self._register('Nan None')
+        self._register('Sid Short', ride=short, speed_range=self.fast)
+        Registration.objects.create(
+            event=self.event, ride=self.ride, speed_range_preference=self.slow, name='Wes Withdrawn',
+            email='wes@example.com', state=Registration.STATE_WITHDRAWN,
+        )
+
+        # Act
+        roster = self.service.roster(self.event, RosterViewer.PRIVILEGED)
+
+        # Assert
+        self.assertEqual([entry.ride for entry in roster], [self.ride, short])
+        long_groups = roster[0].groups
+        self.assertEqual([group.speed_range for group in long_groups], [self.slow, self.fast, None])
+        self.assertEqual([rider.name for rider in long_groups[0].riders], ['Amy Able', 'Zoe Zed'])
+        self.assertEqual((long_groups[0].ride_leader_count, long_groups[0].non_leader_count), (1, 1))
+        self.assertEqual([rider.name for rider in long_groups[2].riders], ['Nan None'])
+        # The short ride doesn't offer that speed range
+        self.assertEqual(roster[1].groups, [])
+
+    def test_rides_leaves_out_the_riders(self):
+        # Arrange
+        self._register('Amy Able', speed_range=self.slow)
+
+        # Act
+        rides = self.service.rides(self.event)
+
+        # Assert
+        [entry] = rides
+        self.assertEqual([group.riders for group in entry.groups], [[], []])
+
+    def test_hidden_names_are_masked_for_anonymous_viewers_only(self):
+        # Arrange
+        user = User.objects.create_user(username='hidden@example.com', email='hidden@example.com')
+        user.profile.name_visibility = UserProfile.NameVisibility.ONLY_USERS
+        user.profile.save()
+        self._register('Hal Hidden', speed_range=self.slow, user=user)
+
+        # Act
+        anonymous = self.service.roster(self.event, RosterViewer.ANONYMOUS)
+        member = self.service.roster(self.event, RosterViewer.MEMBER)
+
+        # Assert
+        self.assertNotEqual(anonymous[0].groups[0].riders[0].name, 'Hal Hidden')
+        self.assertEqual(member[0].groups[0].riders[0].name, 'Hal Hidden')
+
+    def test_builds_in_the_same_number_of_queries_however_many_riders(self):
+        # Arrange
+        for ordering in range(2, 5):
+            ride = Ride.objects.create(name=f'Ride {ordering}', event=self.event, route=self.route, ordering=ordering)
+            ride.speed_ranges.add(self.slow)
+        Registration.objects.bulk_create(
+            Registration(
+                event=self.event, ride=self.ride, speed_range_preference=self.fast,
+                first_name='Rider', last_name=f'{index:03}', name=f'Rider {index:03}',
+                email=f'rider{index}@example.com', state=Registration.STATE_CONFIRMED,
+            )
+            for index in range(200)
+        )
+
+        # Act
+        with self.assertNumQueries(3):
+            roster = self.service.roster(self.event, RosterViewer.MEMBER)
+
+        # Assert
+        self.assertEqual(len(roster[0].groups[1].riders), 200)
+
+    @override_settings(ROSTER_CACHE_TIMEOUT=300)
+    def test_cached_roster_is_reused_until_a_registration_changes(self):
+        # Arrange
+        self._register('Amy Able', speed_range=self.slow)
+        self.service.roster(self.event, RosterViewer.MEMBER)
+
+        # Act
+        with self.assertNumQueries(0):
+            cached = self.service.roster(self.event, RosterViewer.MEMBER)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._register('Bob Bell', speed_range=self.slow)
+        rebuilt = self.service.roster(self.event, RosterViewer.MEMBER)
+
+        # Assert
+        self.assertEqual(len(cached[0].groups[0].riders), 1)
+        self.assertEqual(len(rebuilt[0].groups[0].riders), 2)
+
+    def test_speed_range_and_profile_changes_bump_the_version(self):
+        # Arrange
+        user = User.objects.create_user(username='amy@example.com', email='amy@example.com')
+        self._register('Amy Able', speed_range=self.slow, user=user)
+        version = self.service.version(self.event.pk)
+
+        # Act / Assert
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ride.speed_ranges.remove(self.fast)
+        self.assertNotEqual(self.service.version(self.event.pk), version)
+
+        version = self.service.version(self.event.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.slow.ride_set.clear()
+        self.assertNotEqual(self.service.version(self.event.pk), version)
+
+        version = self.service.version(self.event.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.profile.name_visibility = UserProfile.NameVisibility.ONLY_USERS
+            user.profile.save()
+        self.assertNotEqual(self.service.version(self.event.pk), version)
@@ -0,0 +1,170 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from backoffice.models import Event, Program, Registration, UserRideStats
+from backoffice.services.user_ride_stats_service import UserRideStatsService
+
+
+class UserRideStatsServiceTests(TestCase):
+    def setUp(self):
+        self.service = UserRideStatsService()
+        self.program = Program.objects.create(name='Test Program')
+        self.user = User.objects.create_user(username='counted', email='counted@example.com')
+
+    def _create_event(self, name, offset_days=1):
+        return Event.objects.create(
+            program=self.program,
+            name=name,
+            starts_at=timezone.now() + timedelta(days=offset_days),
+            registration_closes_at=timezone.now() + timedelta(days=offset_days - 1),
+        )
+
+    def _create_confirmed(self, event, user=None):
+        user = user or self.user
+        registration = Registration.objects.create(
+            user=user, event=event, name=user.username, email=user.email,
+        )
+        registration.confirm()
+        registration.save()
+        return registration
+
+    def _count(self, user=None):
+        return UserRideStats.objects.get(user=user or self.user).confirmed_ride_count
+
+    def test_confirm_and_withdraw_maintain_the_count(self):
+        # Arrange
+        first = self._create_confirmed(self._create_event('First'))
+        self._create_confirmed(self._create_event('Second', 2))
+        counted = self._count()
+
+        # Act
+        first.withdraw()
+        first.save()
+
+        # Assert
+        self.assertEqual(counted, 2)
+        self.assertEqual(self._count(), 1)
+
+    def test_cancelling_an_event_drops_it_from_every_registrant_count(self):
+        # Arrange
+        other = User.objects.create_user(username='other', email='other@example.com')
+        event = self._create_event('Cancelled')
+        self._create_confirmed(event)
+        self._create_confirmed(event, other)
+
+        # Act
+        event.cancel()
+        event.save()
+
+        # Assert
+        self.assertEqual((self._count(), self._count(other)), (0, 0))
+        self.assertEqual(self.service.fetch_ride_counts([self.user.pk, other.pk]), {})
+
+    def test_reinstating_a_cancelled_event_counts_it_again(self):
+        # Arrange
+        event = self._create_event('Reinstated')
+        self._create_confirmed(event)
+        event.cancel()
+        event.save()
+
+        # Act
+        event.state = Event.STATE_LIVE
+        event.save()
+
+        # Assert
+        self.assertEqual(self._count(), 1)
+
+    def test_saving_an_event_without_cancelling_it_leaves_counts_alone(self):
+        # Arrange
+        event = self._create_event('Edited')
+        self._create_confirmed(event)
+
+        # Act
+        with patch.object(UserRideStatsService, 'refresh_for_event') as refresh_for_event:
+            event.name = 'Renamed'
+            event.save()
+            event.cancel()
+            event.save()
+
+        # Assert
+        refresh_for_event.assert_called_once_with(event.pk)
+
+    def test_repeat_registrations_for_an_event_count_once(self):
+        # Arrange
+        event = self._create_event('Twice')
+
+        # Act
+        self._create_confirmed(event)
+        self._create_confirmed(event)
+
+        # Assert
+        self.assertEqual(self._count(), 1)
+
+    def test_withdrawing_one_of_two_registrations_for_an_event_keeps_it_counted(self):
+        # Arrange
+        event = self._create_event('Twice')
+        first = self._create_confirmed(event)
+        self._create_confirmed(event)
+
+        # Act
+        first.withdraw()
+        first.save()
+
+        # Assert
+        self.assertEqual(self._count(), 1)
+
+    def test_confirmations_move_the_count_without_recounting(self):
+        # Arrange
+        self._create_confirmed(self._create_event('First'))
+        UserRideStats.objects.filter(user=self.user).update(confirmed_ride_count=5)
+
+        # Act
+        second = self._create_confirmed(self._create_event('Second', 2))
+        after_confirming = self._count()
+        second.delete()
+
+        # Assert
+        self.assertEqual((after_confirming, self._count()), (6, 5))
+
+    def test_reads_counts_without_touching_registrations(self):
+        # Arrange
+        self._create_confirmed(self._create_event('Counted'))
+
+        # Act
+        with self.assertNumQueries(1):
+            counts = self.service.fetch_ride_counts([self.user.pk])
+
+        # Assert
+        self.assertEqual(counts, {self.user.pk: 1})
+
+    def test_rebuild_creates_missing_rows_and_repairs_drift(self):
+        # Arrange
+        other = User.objects.create_user(username='other', email='other@example.com')
+        self._create_confirmed(self._create_event('First'))
+        self._create_confirmed(self._create_event('Second', 2), other)
+        UserRideStats.objects.filter(user=self.user).update(confirmed_ride_count=9)
+        UserRideStats.objects.filter(user=other).delete()
+
+        # Act
+        rebuilt = self.service.rebuild()
+
+        # Assert
+        self.assertEqual(rebuilt, 2)
+        self.assertEqual((self._count(), self._count(other)), (1, 1))
+
+    def test_rebuild_command_reports_rebuilt_users(self):
+        # Arrange
+        self._create_confirmed(self._create_event('Counted'))
+        out = StringIO()
+
+        # Act
+        call_command('rebuilduserridestats', stdout=out)
+
+        # Assert
+        self.assertIn('Rebuilt ride counts for 1 users.', out.getvalue())
@@ -7,7 +7,7 @@ from django.urls import reverse
 from django.utils import timezone
 
 from audit.models import AuditEvent
-from backoffice.models import Program, Event, Registration
+from backoffice.models import Program, Event, EventNotification, Registration
 
 
 class EventAdminActionsTestCase(TestCase):
@@ -471,7 +471,7 @@ class EventRescheduleActionTestCase(TestCase):
     def local_input(self, moment):
         return timezone.localtime(moment).strftime('%Y-%m-%dT%H:%M')
 
-    def post_reschedule(self, **overrides):
+    def post_reschedule(self, follow=False, **overrides):
         data = {
             'action': 'reschedule_event',
             '_selected_action': [self.event.pk],
@@ -483,7 +483,7 @@ class EventRescheduleActionTestCase(TestCase):
             'notify_registrants': 'on',
         }
         data.update(overrides)
-        return self.client.post(self.changelist_url, data)
+        return self.client.post(self.changelist_url, data, follow=follow)
 
     def test_action_shows_reschedule_page(self):
         # Act
@@ -520,6 +520,21 @@ class EventRescheduleActionTestCase(TestCase):
         self.assertEqual(len(mail.outbox), 1)
         self.assertIn('RIDE RESCHEDULED', mail.outbox[0].subject)
 
+    def test_action_reports_notification_progress_link(self):
+        # Arrange
+        self.create_confirmed_registration()
+
+        # Act
+        response = self.post_reschedule(follow=True)
+
+        # Assert
+        self.assertContains(response, 'Notifying 1 registrant in the background.')
+        self.assertContains(response, reverse('admin:backoffice_eventnotification_changelist'))
+        notification = EventNotification.objects.get(event=self.event)
+        self.assertEqual(notification.kind, EventNotification.KIND_RESCHEDULED)
+        progress = self.client.get(reverse('admin:backoffice_eventnotification_changelist'))
+        self.assertContains(progress, self.event.name)
+
     def test_action_skips_notification_when_unchecked(self):
         # Arrange
         self.create_confirmed_registration()
@@ -0,0 +1,19 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class BenchmarkAqhiCommandTests(TestCase):
+    def test_reports_both_paths_and_that_they_match(self):
+        # Arrange
+        out = StringIO()
+
+        # Act
+        call_command('benchmarkaqhi', '--repeat', '1', stdout=out)
+
+        # Assert
+        output = out.getvalue()
+        self.assertIn('Per hour:', output)
+        self.assertIn('Whole series:', output)
+        self.assertIn('Results match over 168 hours', output)
@@ -6,6 +6,7 @@ from audit.context import actor
 from audit.models import AuditEvent
 from backoffice.admin import ProgramAdmin
 from backoffice.models import Program
+from backoffice.services.listing_cache_service import ListingCacheService
 
 
 class AuditSignalsTestCase(TestCase):
@@ -78,3 +79,35 @@ class AuditSignalsTestCase(TestCase):
         # Assert
         events = AuditEvent.objects.filter(actor=self.staff_user, action='deleted')
         self.assertEqual(events.count(), 2)
+
+
+class ListingVersionSignalsTestCase(TestCase):
+    def setUp(self):
+        self.service = ListingCacheService()
+
+    def test_saving_listing_model_bumps_version_after_commit(self):
+        # Arrange
+        version = self.service.version()
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Program.objects.create(name='Test Program')
+        version_before_commit = self.service.version()
+        for callback in callbacks:
+            callback()
+
+        # Assert
+        self.assertEqual(version_before_commit, version)
+        self.assertNotEqual(self.service.version(), version)
+
+    def test_deleting_listing_model_bumps_version(self):
+        # Arrange
+        program = Program.objects.create(name='Test Program')
+        version = self.service.version()
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            program.delete()
+
+        # Assert
+        self.assertNotEqual(self.service.version(), version)
@@ -1,8 +1,17 @@
+from decimal import Decimal
 from unittest.mock import patch
 
 from django.test import TestCase
 
-from backoffice.tasks import alert_unconfirmed_registrations, debug_ping, refresh_forecasts
+from backoffice.services.forecast_compaction_service import CompactionResult
+from backoffice.tasks import (
+    alert_unconfirmed_registrations,
+    compact_forecasts,
+    debug_ping,
+    deliver_outbound_emails,
+    prefetch_forecasts,
+    refresh_forecasts,
+)
 
 
 class DebugPingTaskTests(TestCase):
@@ -24,6 +33,13 @@ class DebugPingTaskTests(TestCase):
 
 class RefreshForecastsTaskTests(TestCase):
 
+    def setUp(self):
+        schedule_next = patch(
+            'backoffice.services.forecast_schedule_service.ForecastScheduleService.schedule_next'
+        )
+        self.schedule_next = schedule_next.start()
+        self.addCleanup(schedule_next.stop)
+
     def test_refreshes_forecasts_for_events_within_the_horizon(self):
         # Arrange
         events = [object()]
@@ -41,6 +57,7 @@ class RefreshForecastsTaskTests(TestCase):
         # Assert
         self.assertEqual(result, 2)
         refresh.assert_called_once_with(events)
+        self.schedule_next.assert_called_once_with()
 
     def test_logs_a_summary_of_the_run(self):
         # Arrange
@@ -60,7 +77,7 @@ class RefreshForecastsTaskTests(TestCase):
         # Assert
         self.assertIn('2 windows covered for 1 events', logs.output[0])
 
-    def test_logs_and_stops_when_no_events_are_within_the_horizon(self):
+    def test_logs_and_schedules_the_next_run_when_no_events_are_within_the_horizon(self):
         # Arrange
         with patch(
             'backoffice.services.event_service.EventService.fetch_events_within_forecast_horizon'
@@ -77,6 +94,41 @@ class RefreshForecastsTaskTests(TestCase):
         self.assertEqual(result, 0)
         refresh.assert_not_called()
         self.assertIn('nothing to refresh', logs.output[0])
+        self.schedule_next.assert_called_once_with()
+
+
+class PrefetchForecastsTaskTests(TestCase):
+
+    def test_prefetches_the_cell_it_was_given(self):
+        # Arrange
+        with patch(
+            'backoffice.services.forecast_prefetch_service.ForecastPrefetchService.prefetch'
+        ) as prefetch:
+            prefetch.return_value = 1
+
+            # Act
+            result = prefetch_forecasts('45.32250', '-75.66920')
+
+        # Assert
+        self.assertEqual(result, 1)
+        prefetch.assert_called_once_with(Decimal('45.32250'), Decimal('-75.66920'))
+
+
+class CompactForecastsTaskTests(TestCase):
+
+    def test_returns_the_number_of_rows_removed(self):
+        # Arrange
+        with patch(
+            'backoffice.services.forecast_compaction_service.ForecastCompactionService.compact'
+        ) as compact:
+            compact.return_value = CompactionResult(forecasts=3, readings=12, bytes=1920)
+
+            # Act
+            result = compact_forecasts()
+
+        # Assert
+        self.assertEqual(result, 15)
+        compact.assert_called_once_with()
 
 
 class AlertUnconfirmedRegistrationsTaskTests(TestCase):
@@ -92,3 +144,18 @@ class AlertUnconfirmedRegistrationsTaskTests(TestCase):
         # Assert
         self.assertEqual(result, 3)
         alert.assert_called_once()
+
+
+class DeliverOutboundEmailsTaskTests(TestCase):
+
+    def test_delivers_pending_emails(self):
+        # Act
+        with patch(
+            'backoffice.services.email_service.EmailService.deliver_pending'
+        ) as deliver:
+            deliver.return_value = 3
+            result = deliver_outbound_emails()
+
+        # Assert
+        deliver.assert_called_once_with()
+        self.assertEqual(result, 3)
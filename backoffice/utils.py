@@ -1,5 +1,7 @@
 import logging
 
+from django.utils.html import strip_tags
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,3 +21,7 @@ def lower_email(email: str|None) -> str|None:
         return email.lower()
     else:
         return None
+
+
+def search_document(*parts: str | None) -> str:
+    return ' '.join(' '.join(strip_tags(part).split()) for part in parts if part)
@@ -1,5 +1,6 @@
 import os
 import sys
+from decimal import Decimal
 from pathlib import Path
 
 import dj_database_url
@@ -9,6 +10,8 @@ from celery.schedules import crontab
 from sentry_sdk.integrations.django import DjangoIntegration
 from sentry_sdk.integrations.celery import CeleryIntegration
 
+from ridehub.redis_url import cache_redis_url
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY_FOR_DEVELOPMENT = 'not-so-secret-default-for-development'
@@ -153,6 +156,17 @@ else:
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            # Transactions take the write lock when they begin, so a seat check and the
+            # write that claims it can't interleave with another writer; others wait
+            "OPTIONS": {
+                "transaction_mode": "IMMEDIATE",
+                "timeout": 20,
+            },
+            # On disk rather than in memory, so threads in concurrency tests wait on
+            # each other's locks instead of failing with "table is locked"
+            "TEST": {
+                "NAME": BASE_DIR / "test_db.sqlite3",
+            },
         }
     }
 
@@ -246,23 +260,75 @@ CELERY_TASK_IGNORE_RESULT = False
 CELERY_RESULT_EXPIRES = 60 * 60
 CELERY_TASK_ALWAYS_EAGER = 'test' in sys.argv or 'behave' in sys.argv
 
+EMAIL_OUTBOX_DELIVER_ON_COMMIT = 'test' not in sys.argv
+
+# Sent and failed outbox rows are deleted after this many days
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.environ.get('EMAIL_OUTBOX_RETENTION_DAYS', '30'))
+
+# Off under test and behave, where Celery runs eagerly and would call Open-Meteo
+FORECAST_PREFETCH_ON_SAVE = 'test' not in sys.argv and 'behave' not in sys.argv
+
 CELERY_BEAT_SCHEDULE = {
+    'deliver-outbound-emails': {
+        'task': 'backoffice.tasks.deliver_outbound_emails',
+        'schedule': crontab(),
+    },
+    'prune-outbound-emails': {
+        'task': 'backoffice.tasks.prune_outbound_emails',
+        'schedule': crontab(hour=3, minute=47),
+    },
     'alert-unconfirmed-registrations': {
         'task': 'backoffice.tasks.alert_unconfirmed_registrations',
         'schedule': crontab(minute=5),
     },
     'refresh-forecasts': {
         'task': 'backoffice.tasks.refresh_forecasts',
-        'schedule': crontab(minute=42),
+        # Each run schedules the next for when a window falls due; this only restarts
+        # that chain if its queued run is lost
+        'schedule': crontab(minute=42, hour='*/6'),
     },
-}
-
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'compact-forecasts': {
+        'task': 'backoffice.tasks.compact_forecasts',
+        'schedule': crontab(hour=3, minute=17),
     },
 }
 
+
+def _caches():
+    if 'test' in sys.argv or not os.environ.get('REDIS_URL'):
+        return {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+        }
+
+    return {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': cache_redis_url(),
+            'KEY_PREFIX': f"ridehub:{os.environ.get('HEROKU_RELEASE_VERSION', 'unknown')}",
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                'socket_connect_timeout': 2,
+                'socket_timeout': 2,
+            },
+        },
+    }
+
+
+CACHES = _caches()
+
+LISTING_PAGE_CACHE_TIMEOUT = 0 if 'test' in sys.argv else 300
+
+EVENT_FEED_CACHE_TIMEOUT = 0 if 'test' in sys.argv else 3600
+
+# Rosters are invalidated by version bumps; the timeout only bounds how long a stale one can linger
+ROSTER_CACHE_TIMEOUT = 0 if 'test' in sys.argv else 3600
+
+# Events with start coordinates share a forecast with every event in the same grid
+# cell; larger cells mean fewer Open-Meteo requests and coarser forecasts
+FORECAST_GRID_CELL_DEGREES = Decimal(os.environ.get('FORECAST_GRID_CELL_DEGREES', '0.1'))
+
 REGISTRATION_ALERT_EMAILS = [
     e.strip() for e in os.environ.get('REGISTRATION_ALERT_EMAILS', '').split(',') if e.strip()
 ]
@@ -0,0 +1,45 @@
+import hashlib
+import os
+from datetime import datetime
+from typing import Callable
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def release_version() -> str:
+    return os.environ.get('HEROKU_RELEASE_VERSION', 'dev')
+
+
+def release_created_at() -> datetime | None:
+    try:
+        return datetime.fromisoformat(os.environ.get('HEROKU_RELEASE_CREATED_AT', '').replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def viewer_key(user) -> str:
+    if not user.is_authenticated:
+        return 'anonymous'
+    return f'{user.pk}:{user.is_staff}:{user.first_name}:{user.email}'
+
+
+def make_etag(*parts) -> str:
+    return quote_etag(hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()[:32])
+
+
+def respond_conditionally(request: HttpRequest, etag: str, last_modified: datetime,
+                          render_page: Callable[[], HttpResponse]) -> HttpResponse:
+    last_modified_timestamp = int(last_modified.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified_timestamp)
+    if response is None:
+        response = render_page()
+        if response.status_code != 200:
+            return response
+
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified_timestamp)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -1,6 +1,7 @@
 import django_filters
 from django import forms
-from django.db.models import Q
+from django.core.validators import EMPTY_VALUES
+from django.db.models import Model, Q
 
 from backoffice.models import Registration, Ride, SpeedRange
 
@@ -53,3 +54,23 @@ class PublicRegistrationFilter(BaseRegistrationFilter):
             self.filters['speed_range_preference'].queryset = (
                 SpeedRange.objects.filter(ride__event=event).distinct()
             )
+
+    def filter_list(self, registrations: list[Registration]) -> list[Registration]:
+        """Apply the submitted filters to registrations that are already loaded."""
+        if not self.is_bound:
+            return list(registrations)
+
+        # Like .qs, a filter whose value doesn't validate is left out rather than failing the page
+        self.is_valid()
+        criteria = []
+        for name in self.filters:
+            value = self.form.cleaned_data.get(name)
+            if value in EMPTY_VALUES:
+                continue
+            field = Registration._meta.get_field(name)
+            criteria.append((field.attname, value.pk if isinstance(value, Model) else value))
+
+        return [
+            registration for registration in registrations
+            if all(getattr(registration, attname) == expected for attname, expected in criteria)
+        ]
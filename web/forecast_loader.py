@@ -0,0 +1,50 @@
+from django.http import HttpRequest
+
+from backoffice.models import Event, Forecast
+from backoffice.services.event_service import EventService
+
+
+class ForecastLoader:
+    """Resolves forecasts for every event a request asks about in one lookup.
+
+    Events passed to prime() are only recorded; the first get() resolves them all,
+    together with its own event, in a single get_forecasts_for_windows call, and
+    every later get() for a known event is answered from memory.
+    """
+
+    def __init__(self):
+        self._pending: dict[int, Event] = {}
+        self._forecasts: dict[int, Forecast | None] = {}
+
+    @classmethod
+    def for_request(cls, request: HttpRequest | None) -> 'ForecastLoader':
+        if request is None:
+            return cls()
+        loader = getattr(request, '_forecast_loader', None)
+        if loader is None:
+            loader = request._forecast_loader = cls()
+        return loader
+
+    def prime(self, events) -> None:
+        for event in events:
+            if event.id not in self._forecasts:
+                self._pending[event.id] = event
+
+    def get(self, event: Event) -> Forecast | None:
+        return self.get_many([event]).get(event.id)
+
+    def get_many(self, events) -> dict:
+        events = list(events)
+        self.prime(events)
+        if self._pending:
+            self._load()
+        return {
+            event.id: self._forecasts[event.id]
+            for event in events
+            if self._forecasts[event.id]
+        }
+
+    def _load(self) -> None:
+        pending, self._pending = list(self._pending.values()), {}
+        forecasts = EventService().fetch_forecasts(pending)
+        self._forecasts.update({event.id: forecasts.get(event.id) for event in pending})
@@ -0,0 +1,25 @@
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+
+from backoffice.services.announcement_service import AnnouncementService
+from backoffice.services.listing_cache_service import ListingCacheService
+
+
+def cached_for_anonymous(request: HttpRequest, query: str, render_page: Callable[[], HttpResponse]) -> HttpResponse:
+    timeout = settings.LISTING_PAGE_CACHE_TIMEOUT
+    if request.user.is_authenticated or not timeout:
+        return render_page()
+
+    announcement_ids = AnnouncementService().fetch_active_announcements(request.user).values_list('id', flat=True)
+    key = ListingCacheService().page_key(request.path, query, announcement_ids)
+    content = cache.get(key)
+    if content is not None:
+        return HttpResponse(content)
+
+    response = render_page()
+    if response.status_code == 200:
+        cache.set(key, response.content, timeout)
+    return response
@@ -90,8 +90,8 @@ class PublicRegistrationTable(tables.Table):
     RIDE_COUNT_LABELS = {1: '1st', 2: '2nd', 3: '3rd'}
 
     name = tables.Column(order_by=('last_name', 'first_name'))
-    ride = tables.Column()
-    speed_range_preference = tables.Column(verbose_name="Speed group")
+    ride = tables.Column(order_by=('ride.ordering',))
+    speed_range_preference = tables.Column(verbose_name="Speed group", order_by=('speed_range_preference.lower_limit',))
     first_time_attendee = tables.Column(verbose_name="First time")
     prospective_member = tables.Column(verbose_name="Prospective member")
     email = tables.Column()
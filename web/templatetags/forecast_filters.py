@@ -1,22 +1,27 @@
 from django import template
 
-from backoffice.services.event_service import EventService
-from backoffice.services.forecast_summary import summarize
+from backoffice.services.forecast_summary import hourly_readings, stored_summary
+from web.forecast_loader import ForecastLoader
 
 register = template.Library()
 
 
-@register.inclusion_tag('web/events/_forecast_badge_slot.html')
-def forecast_badge(event, compact=False):
+@register.inclusion_tag('web/events/_forecast_badge_slot.html', takes_context=True)
+def forecast_badge(context, event, compact=False):
     return {
         'event': event,
-        'forecast': EventService().fetch_forecast(event),
+        'forecast': ForecastLoader.for_request(context.get('request')).get(event),
         'compact': compact,
     }
 
 
 @register.filter
 def forecast_summary(forecast):
-    if not forecast or not forecast.has_readings:
+    if not forecast:
         return None
-    return summarize(forecast)
+    return stored_summary(forecast)
+
+
+@register.filter
+def forecast_hourly(forecast):
+    return hourly_readings(forecast)
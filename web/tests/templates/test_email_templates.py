@@ -393,3 +393,49 @@ class TestEventRescheduledEmail(BaseEmailTestCase):
 
         event_url = f"{self.base_url}{reverse('event_detail', args=[self.event.id])}"
         self.assertIn(event_url, text_content)
+
+
+class TestWaitlistedEmail(BaseEmailTestCase):
+    def setUp(self):
+        super().setUp()
+        self.program = Program.objects.create(name="Test Program")
+
+        event_start = datetime(2024, 12, 25, 10, 0, tzinfo=timezone.utc)
+        self.event = Event.objects.create(
+            name="Popular Event",
+            starts_at=event_start,
+            registration_closes_at=event_start - timedelta(hours=1),
+            program=self.program,
+            registration_limit=10,
+        )
+        self.registration = Registration.objects.create(
+            name="Wait Listed",
+            first_name="Wait",
+            last_name="Listed",
+            email="waitlisted@example.com",
+            event=self.event,
+        )
+        self.context = {
+            'registration': self.registration,
+            'base_url': self.base_url,
+        }
+
+    def test_contains_event_name(self):
+        html_content = render_to_string('email/waitlisted.html', self.context)
+        self.assertIn(self.event.name, html_content)
+
+        text_content = render_to_string('email/waitlisted.txt', self.context)
+        self.assertIn(self.event.name, text_content)
+
+    def test_links_are_absolute(self):
+        html_content = render_to_string('email/waitlisted.html', self.context)
+        self.assert_all_links_absolute(html_content)
+
+        profile_url = f"{self.base_url}{reverse('profile')}"
+        self.assertRegex(html_content, rf'href="{re.escape(profile_url)}"')
+
+    def test_text_version_has_absolute_urls(self):
+        text_content = render_to_string('email/waitlisted.txt', self.context)
+
+        profile_url = f"{self.base_url}{reverse('profile')}"
+        self.assertIn(profile_url, text_content)
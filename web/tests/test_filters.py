@@ -176,6 +176,36 @@ class PublicRegistrationFilterTests(BaseFilterTestCase):
         result_ids = set(f.qs.values_list('id', flat=True))
         self.assertEqual(result_ids, {self.reg_a.id})
 
+    def test_filter_list_matches_the_queryset_filter(self):
+        # Arrange
+        registrations = list(self.base_qs)
+        cases = [
+            {},
+            {'ride': self.ride_a.id},
+            {'speed_range_preference': self.speed_slow.id},
+            {'ride': self.ride_a.id, 'ride_leader_preference': 'y'},
+            {'ride': 'not-a-ride', 'ride_leader_preference': 'n'},
+        ]
+
+        for data in cases:
+            with self.subTest(data=data):
+                # Act
+                f = PublicRegistrationFilter(data, queryset=self.base_qs, event=self.event)
+                filtered = f.filter_list(registrations)
+
+                # Assert
+                self.assertEqual({reg.id for reg in filtered}, set(f.qs.values_list('id', flat=True)))
+
+    def test_unbound_filter_list_returns_every_registration(self):
+        # Arrange
+        registrations = list(self.base_qs)
+
+        # Act
+        filtered = PublicRegistrationFilter(event=self.event).filter_list(registrations)
+
+        # Assert
+        self.assertEqual(filtered, registrations)
+
 
 class RegistrationFilterTests(BaseFilterTestCase):
     def test_search_by_name(self):
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from backoffice.models import Event, Forecast, Program
+from backoffice.services.forecast_service import YOW_LOCATION
+from web.forecast_loader import ForecastLoader
+
+
+class ForecastLoaderTestCase(TestCase):
+    def setUp(self):
+        self.program = Program.objects.create(name='Test Program')
+        self.starts_at = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.latitude, self.longitude = YOW_LOCATION
+
+    def _create_event_with_forecast(self, hours_later):
+        starts_at = self.starts_at + timedelta(hours=hours_later)
+        event = Event.objects.create(
+            program=self.program,
+            name=f'Event {hours_later}',
+            starts_at=starts_at,
+            registration_closes_at=starts_at - timedelta(hours=1),
+        )
+        Forecast.objects.create(
+            latitude=self.latitude,
+            longitude=self.longitude,
+            start_time=starts_at,
+            end_time=starts_at + timedelta(hours=1),
+            hourly=[{'time': starts_at.isoformat(), 'condition': 'sun', 'temperature': 20, 'aqhi': 2}],
+        )
+        return event
+
+    def test_resolves_every_primed_event_in_one_query(self):
+        # Arrange
+        events = [self._create_event_with_forecast(hours) for hours in range(3)]
+        loader = ForecastLoader()
+        loader.prime(events)
+
+        # Act
+        with self.assertNumQueries(1):
+            forecasts = [loader.get(event) for event in events]
+
+        # Assert
+        self.assertEqual([forecast.start_time for forecast in forecasts], [event.starts_at for event in events])
+
+    def test_remembers_events_without_a_forecast(self):
+        # Arrange
+        event = Event.objects.create(
+            program=self.program,
+            name='No forecast',
+            starts_at=self.starts_at,
+            registration_closes_at=self.starts_at - timedelta(hours=1),
+        )
+        loader = ForecastLoader()
+        loader.get(event)
+
+        # Act
+        with self.assertNumQueries(0):
+            forecast = loader.get(event)
+
+        # Assert
+        self.assertIsNone(forecast)
+
+    def test_is_shared_for_the_lifetime_of_a_request(self):
+        # Arrange
+        request = RequestFactory().get('/')
+
+        # Act
+        loader = ForecastLoader.for_request(request)
+
+        # Assert
+        self.assertIs(ForecastLoader.for_request(request), loader)
+        self.assertIsNot(ForecastLoader.for_request(RequestFactory().get('/')), loader)
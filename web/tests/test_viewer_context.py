@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from backoffice.models import Event, Program, Registration
+from backoffice.services.roster_service import RosterViewer
+from web.viewer_context import ViewerContext
+
+
+class ViewerContextTestCase(TestCase):
+    def setUp(self):
+        program = Program.objects.create(name='Test Program')
+        starts_at = timezone.now() + timedelta(days=7)
+        self.event = Event.objects.create(
+            program=program,
+            name='Test Event',
+            starts_at=starts_at,
+            registration_closes_at=starts_at - timedelta(days=1),
+        )
+        self.user = User.objects.create_user(username='rider@example.com', email='rider@example.com')
+
+    def _request(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+
+    def _register(self, leader=False, state=Registration.STATE_CONFIRMED):
+        return Registration.objects.create(
+            event=self.event,
+            user=self.user,
+            name='Rider One',
+            email=self.user.email,
+            ride_leader_preference=(
+                Registration.RideLeaderPreference.YES if leader else Registration.RideLeaderPreference.NO
+            ),
+            state=state,
+        )
+
+    def test_resolves_every_check_in_one_query_per_request(self):
+        # Arrange
+        self._register(state=Registration.STATE_WITHDRAWN)
+        registration = self._register(leader=True)
+        request = self._request(self.user)
+
+        # Act
+        with self.assertNumQueries(1):
+            viewer = ViewerContext.for_request(request, self.event.id)
+            checks = (viewer.registration, viewer.is_ride_leader, viewer.is_privileged, viewer.roster_viewer)
+            again = ViewerContext.for_request(request, self.event.id)
+            again.is_privileged
+
+        # Assert
+        self.assertIs(again, viewer)
+        self.assertEqual(checks, (registration, True, True, RosterViewer.PRIVILEGED))
+
+    def test_registered_rider_who_is_not_leading_is_a_member(self):
+        # Arrange
+        self._register()
+
+        # Act
+        viewer = ViewerContext.for_request(self._request(self.user), self.event.id)
+
+        # Assert
+        self.assertIsNotNone(viewer.registration)
+        self.assertFalse(viewer.is_privileged)
+        self.assertEqual(viewer.roster_viewer, RosterViewer.MEMBER)
+
+    def test_waitlisted_rider_is_not_a_confirmed_registrant_or_leader(self):
+        # Arrange
+        waitlisted = self._register(leader=True, state=Registration.STATE_WAITLISTED)
+
+        # Act
+        viewer = ViewerContext.for_request(self._request(self.user), self.event.id)
+
+        # Assert
+        self.assertIsNone(viewer.registration)
+        self.assertEqual(viewer.waitlisted_registration, waitlisted)
+        self.assertFalse(viewer.is_privileged)
+
+    def test_staff_are_privileged_without_registering(self):
+        # Arrange
+        self.user.is_staff = True
+        self.user.save()
+
+        # Act
+        viewer = ViewerContext.for_request(self._request(self.user), self.event.id)
+
+        # Assert
+        self.assertIsNone(viewer.registration)
+        self.assertTrue(viewer.is_privileged)
+
+    def test_anonymous_viewer_needs_no_query(self):
+        # Arrange
+        request = self._request(AnonymousUser())
+
+        # Act
+        with self.assertNumQueries(0):
+            viewer = ViewerContext.for_request(request, self.event.id)
+            checks = (viewer.registration, viewer.is_privileged, viewer.roster_viewer)
+
+        # Assert
+        self.assertEqual(checks, (None, False, RosterViewer.ANONYMOUS))
@@ -0,0 +1,197 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from backoffice.models import Event, Program, Registration, Ride, Route, SpeedRange, UserProfile
+
+
+class ConditionalEventPageTests(TestCase):
+    def setUp(self):
+        self.program = Program.objects.create(name='Test Program')
+        self.event = Event.objects.create(
+            program=self.program,
+            name='Validated Ride',
+            starts_at=timezone.now() + timedelta(days=2),
+            registration_closes_at=timezone.now() + timedelta(days=1),
+            state=Event.STATE_LIVE,
+        )
+        self.detail_url = reverse('event_detail', args=[self.event.id])
+        self.registrations_url = reverse('riders_list', args=[self.event.id])
+
+    def test_detail_page_sends_validators(self):
+        # Act
+        response = self.client.get(self.detail_url)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_matching_etag_is_answered_without_rendering(self):
+        # Arrange
+        etag = self.client.get(self.detail_url)['ETag']
+
+        # Act
+        with patch('web.views.events.RosterService.roster') as get_rides:
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        get_rides.assert_not_called()
+
+    def test_unchanged_page_is_not_modified_since_its_last_modified(self):
+        # Arrange
+        last_modified = self.client.get(self.detail_url)['Last-Modified']
+
+        # Act
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+
+    def test_saving_the_event_changes_the_etag(self):
+        # Arrange
+        etag = self.client.get(self.detail_url)['ETag']
+
+        # Act
+        self.event.name = 'Renamed Ride'
+        self.event.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Renamed Ride')
+
+    def test_new_registration_changes_the_registrations_etag(self):
+        # Arrange
+        etag = self.client.get(self.registrations_url)['ETag']
+
+        # Act
+        Registration.objects.create(
+            event=self.event, name='New Rider', email='new@example.com', state=Registration.STATE_CONFIRMED,
+        )
+        response = self.client.get(self.registrations_url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+
+    def test_hiding_a_registrant_name_changes_the_detail_etag(self):
+        # Arrange
+        user = User.objects.create_user(username='shown', email='shown@example.com')
+        Registration.objects.create(
+            event=self.event, user=user, name='Shown Rider', email=user.email, state=Registration.STATE_CONFIRMED,
+        )
+        etag = self.client.get(self.detail_url)['ETag']
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            user.profile.name_visibility = UserProfile.NameVisibility.ONLY_USERS
+            user.profile.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+
+    def test_editing_a_speed_range_changes_the_detail_etag(self):
+        # Arrange
+        speed_range = SpeedRange.objects.create(lower_limit=25, upper_limit=30)
+        ride = Ride.objects.create(name='Long', event=self.event, route=Route.objects.create(name='Loop'))
+        ride.speed_ranges.add(speed_range)
+        etag = self.client.get(self.detail_url)['ETag']
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            speed_range.upper_limit = 32
+            speed_range.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '32')
+
+    def test_renaming_the_program_changes_the_detail_etag(self):
+        # Arrange
+        etag = self.client.get(self.detail_url)['ETag']
+
+        # Act
+        self.program.name = 'Renamed Program'
+        self.program.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Renamed Program')
+
+    def test_signing_in_changes_the_etag(self):
+        # Arrange
+        etag = self.client.get(self.detail_url)['ETag']
+        user = User.objects.create_user(username='rider', email='rider@example.com', password='password')
+        self.client.force_login(user)
+
+        # Act
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_event_is_not_found(self):
+        # Act
+        response = self.client.get(reverse('event_detail', args=[self.event.id + 100]))
+
+        # Assert
+        self.assertEqual(response.status_code, 404)
+
+
+class ConditionalListingPageTests(TestCase):
+    def setUp(self):
+        self.program = Program.objects.create(name='Test Program')
+        Event.objects.create(
+            program=self.program,
+            name='Listed Ride',
+            starts_at=timezone.now() + timedelta(days=2),
+            registration_closes_at=timezone.now() + timedelta(days=1),
+            state=Event.STATE_LIVE,
+        )
+
+    def test_matching_etag_is_answered_without_querying_events(self):
+        # Arrange
+        etag = self.client.get(reverse('upcoming'))['ETag']
+
+        # Act
+        with patch('web.views.events.EventService.fetch_upcoming_events') as fetch_upcoming_events:
+            response = self.client.get(reverse('upcoming'), HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+        fetch_upcoming_events.assert_not_called()
+
+    def test_search_query_changes_the_etag(self):
+        # Arrange
+        etag = self.client.get(reverse('upcoming'))['ETag']
+
+        # Act
+        response = self.client.get(reverse('upcoming'), {'q': 'Listed'}, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_modified_calendar_still_records_view_preference(self):
+        # Arrange
+        today = timezone.localdate()
+        url = reverse('calendar_month', kwargs={'year': today.year, 'month': today.month})
+        etag = self.client.get(url)['ETag']
+        self.client.get(reverse('upcoming'))
+
+        # Act
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.session['preferred_events_view'], 'calendar')
@@ -0,0 +1,147 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from backoffice.models import Event, Program, Registration
+
+
+class EventFeedViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.program = Program.objects.create(name='Test Program')
+        self.other_program = Program.objects.create(name='Other Program')
+        self.url = reverse('event_feed')
+
+    def _event(self, name, days_from_now, program=None):
+        starts_at = timezone.now() + timedelta(days=days_from_now)
+        return Event.objects.create(
+            program=program or self.program,
+            name=name,
+            starts_at=starts_at,
+            registration_closes_at=starts_at - timedelta(hours=1),
+            state=Event.STATE_LIVE,
+        )
+
+    def test_default_window_excludes_old_and_distant_events(self):
+        # Arrange
+        self._event('Recent Ride', -30)
+        self._event('Upcoming Ride', 30)
+        self._event('Ancient Ride', -200)
+        self._event('Distant Ride', 500)
+
+        # Act
+        response = self.client.get(self.url)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertContains(response, 'Recent Ride')
+        self.assertContains(response, 'Upcoming Ride')
+        self.assertNotContains(response, 'Ancient Ride')
+        self.assertNotContains(response, 'Distant Ride')
+
+    def test_since_until_and_program_narrow_the_feed(self):
+        # Arrange
+        self._event('Ancient Ride', -200)
+        self._event('Recent Ride', -30)
+        self._event('Other Ancient Ride', -200, program=self.other_program)
+        since = (timezone.localdate() - timedelta(days=250)).isoformat()
+        until = (timezone.localdate() - timedelta(days=100)).isoformat()
+
+        # Act
+        response = self.client.get(self.url, {'since': since, 'until': until, 'program': self.program.id})
+
+        # Assert
+        self.assertContains(response, 'Ancient Ride')
+        self.assertNotContains(response, 'Recent Ride')
+        self.assertNotContains(response, 'Other Ancient Ride')
+
+    def test_invalid_window_is_rejected(self):
+        # Act
+        responses = [
+            self.client.get(self.url, {'since': 'yesterday'}),
+            self.client.get(self.url, {'since': '2025-06-01', 'until': '2025-01-01'}),
+            self.client.get(self.url, {'since': '2020-01-01', 'until': '2025-01-01'}),
+            self.client.get(self.url, {'program': 'touring'}),
+        ]
+
+        # Assert
+        for response in responses:
+            self.assertEqual(response.status_code, 400)
+
+    def test_matching_etag_is_answered_without_building_the_feed(self):
+        # Arrange
+        self._event('Upcoming Ride', 30)
+        etag = self.client.get(self.url)['ETag']
+
+        # Act
+        with patch('web.views.events_ical.EventService.fetch_events_between') as fetch_events_between:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+        fetch_events_between.assert_not_called()
+
+    def test_changing_an_event_changes_the_etag(self):
+        # Arrange
+        event = self._event('Upcoming Ride', 30)
+        etag = self.client.get(self.url)['ETag']
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            event.name = 'Renamed Ride'
+            event.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Renamed Ride')
+
+    def test_registrations_leave_the_etag_alone(self):
+        # Arrange
+        event = self._event('Upcoming Ride', 30)
+        etag = self.client.get(self.url)['ETag']
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            Registration.objects.create(
+                event=event, name='New Rider', email='new@example.com', state=Registration.STATE_CONFIRMED,
+            )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+
+    def test_renaming_a_program_changes_the_etag(self):
+        # Arrange
+        self._event('Upcoming Ride', 30)
+        etag = self.client.get(self.url)['ETag']
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            self.program.name = 'Renamed Program'
+            self.program.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(EVENT_FEED_CACHE_TIMEOUT=60)
+    def test_serialized_feed_is_reused_until_the_version_changes(self):
+        # Arrange
+        self._event('Upcoming Ride', 30)
+        first = self.client.get(self.url)
+
+        # Act
+        with patch('web.views.events_ical.EventService.fetch_events_between') as fetch_events_between:
+            second = self.client.get(self.url)
+
+        # Assert
+        fetch_events_between.assert_not_called()
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+        self.assertEqual(second['Content-Disposition'], 'attachment; filename="event.ics"')
@@ -5,7 +5,7 @@ from django.urls import reverse
 from django.utils import timezone
 
 from backoffice.models import Event, Forecast, Program
-from backoffice.services.forecast_service import YOW_LOCATION
+from backoffice.services.forecast_service import ForecastService, YOW_LOCATION
 
 
 class EventForecastsViewTestCase(TestCase):
@@ -100,6 +100,7 @@ class EventForecastsViewTestCase(TestCase):
         oldest = self._create_forecast_prepared_minutes_ago(90, temperature=20)
         middle = self._create_forecast_prepared_minutes_ago(60, temperature=20)
         newest = self._create_forecast_prepared_minutes_ago(30, temperature=25)
+        ForecastService().backfill_summaries()
 
         # Act
         response = self.client.get(reverse('event_forecasts', args=[event.id]))
@@ -118,6 +119,7 @@ class EventForecastsViewTestCase(TestCase):
         oldest = self._create_forecast_prepared_minutes_ago(90)
         self._create_forecast_prepared_minutes_ago(60)
         newest = self._create_forecast_prepared_minutes_ago(30)
+        ForecastService().backfill_summaries()
 
         # Act
         response = self.client.get(reverse('event_forecasts', args=[event.id]))
@@ -155,8 +157,7 @@ class EventForecastsViewTestCase(TestCase):
     def test_ignores_forecasts_without_hourly_readings(self):
         # Arrange
         event = self._create_event()
-        forecast = self._create_forecast()
-        Forecast.objects.filter(pk=forecast.pk).update(hourly=[])
+        self._create_forecast(hourly=[])
 
         # Act
         response = self.client.get(reverse('event_forecasts', args=[event.id]))
@@ -225,15 +226,3 @@ class EventForecastsViewTestCase(TestCase):
         # Assert
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'No forecasts have been prepared')
-
-    def test_forecast_with_a_non_list_hourly_does_not_break_the_page(self):
-        # Arrange
-        event = self._create_event()
-        forecast = self._create_forecast()
-        Forecast.objects.filter(pk=forecast.pk).update(hourly={})
-
-        # Act
-        response = self.client.get(reverse('event_forecasts', args=[event.id]))
-
-        # Assert
-        self.assertEqual(response.status_code, 200)
@@ -3,7 +3,10 @@ from zoneinfo import ZoneInfo
 
 from django.contrib.auth.models import Permission, User
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -426,7 +429,7 @@ class PastEventDetailVisibilityTests(BaseEventViewTestCase):
         # Assert
         self.assertEqual(response.status_code, 200)
         self.assertFalse(response.context['registrations_available'])
-        self.assertEqual(response.context['rides'], {})
+        self.assertFalse(any(group.riders for entry in response.context['rides'] for group in entry.groups))
 
 
 class PastEventEmergencyContactsVisibilityTests(BaseEventViewTestCase):
@@ -956,6 +959,45 @@ class EventRegistrationsSortTests(BaseEventViewTestCase):
         self.assertGreater(leader_idx, regular_idx)
 
 
+class EventRegistrationsQueryCountTests(BaseEventViewTestCase):
+    def setUp(self):
+        super().setUp()
+        Registration.objects.bulk_create(
+            Registration(
+                first_name='Rider', last_name=f'{index:03}', name=f'Rider {index:03}',
+                email=f'rider{index}@example.com', event=self.event, ride=self.ride,
+                speed_range_preference=self.speed_range, state=Registration.STATE_CONFIRMED,
+            )
+            for index in range(40)
+        )
+        self.client.login(username='leader_user', password='password123')
+        # Start from the same caches whichever tests ran before: waffle switches cold,
+        # and the event content type (looked up for audit entries) warm
+        cache.clear()
+        ContentType.objects.get_for_model(Event)
+
+    def test_filtered_riders_list_reads_the_registrations_once(self):
+        # Act
+        with self.assertNumQueries(16):
+            response = self.client.get(
+                reverse('riders_list', args=[self.event.id]),
+                {'ride': self.ride.id, 'ride_leader_preference': Registration.RideLeaderPreference.YES},
+            )
+
+        # Assert
+        self.assertEqual(len(response.context['all_riders']), 42)
+        self.assertEqual(response.context['filtered_riders'], [self.leader_registration])
+        self.assertTrue(response.context['has_ride_leaders'])
+
+    def test_printable_list_reads_the_registrations_once(self):
+        # Act
+        with self.assertNumQueries(11):
+            response = self.client.get(reverse('event_registrations_print', args=[self.event.id]))
+
+        # Assert
+        self.assertEqual(len(response.context['filtered_riders']), 42)
+
+
 class EventRegistrationsColumnTests(BaseEventViewTestCase):
     def setUp(self):
         super().setUp()
@@ -1231,6 +1273,66 @@ class EventDetailViewTests(BaseEventViewTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Registration for this event is closed')
 
+    def test_page_queries_do_not_grow_with_the_roster(self):
+        # Arrange
+        with CaptureQueriesContext(connection) as small_roster:
+            self.client.get(self.url)
+        second_ride = Ride.objects.create(name='Second Ride', event=self.event, route=Route.objects.create(name='Other'))
+        second_ride.speed_ranges.add(self.speed_range_slow)
+        Registration.objects.bulk_create(
+            Registration(
+                first_name='Rider', last_name=f'{index:03}', name=f'Rider {index:03}',
+                email=f'rider{index}@example.com', event=self.event,
+                ride=second_ride if index % 2 else self.ride,
+                speed_range_preference=self.speed_range_slow if index % 2 else self.speed_range_fast,
+                state=Registration.STATE_CONFIRMED,
+            )
+            for index in range(200)
+        )
+
+        # Act
+        with CaptureQueriesContext(connection) as large_roster:
+            response = self.client.get(self.url)
+
+        # Assert
+        self.assertContains(response, '(100 riders)', count=2)
+        self.assertEqual(len(large_roster), len(small_roster))
+
+    def test_full_event_offers_the_waitlist(self):
+        # Arrange
+        self.event.registration_limit = 2
+        self.event.save()
+
+        # Act
+        response = self.client.get(self.url)
+
+        # Assert
+        self.assertContains(response, 'Join the waitlist')
+        self.assertNotContains(response, 'btn btn-primary">Register</a>')
+
+    def test_waitlisted_user_sees_their_place_and_can_leave(self):
+        # Arrange
+        earlier = Registration.objects.create(
+            name='Earlier Rider', email='earlier@example.com', event=self.event,
+            state=Registration.STATE_WAITLISTED,
+        )
+        Registration.objects.filter(pk=earlier.pk).update(
+            submitted_at=self.regular_registration.submitted_at - timedelta(minutes=1),
+        )
+        Registration.objects.filter(pk=self.regular_registration.pk).update(state=Registration.STATE_WAITLISTED)
+        self.client.login(username='regular_user', password='password123')
+
+        # Act
+        response = self.client.get(self.url)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['user_is_registered'])
+        self.assertEqual(response.context['waitlist_position'], 2)
+        self.assertContains(response, "You're on the waitlist for this event (number 2)")
+        self.assertContains(response, reverse('registration_withdraw', args=[self.regular_registration.id]))
+        self.assertNotContains(response, 'btn btn-primary">Register</a>')
+
     def test_registered_user_is_redirected_from_registration_form_to_event(self):
         # Arrange
         self.client.login(username='regular_user', password='password123')
@@ -1917,3 +2019,38 @@ class UpcomingViewQueryCountTests(TestCase):
         self.assertContains(response, '2 registered')
 
 
+class UpcomingSearchViewTests(TestCase):
+    def setUp(self):
+        self.program = Program.objects.create(name='Road')
+
+    def _event(self, name, days_from_now):
+        return Event.objects.create(
+            program=self.program,
+            name=name,
+            starts_at=timezone.now() + timedelta(days=days_from_now),
+            state=Event.STATE_LIVE,
+        )
+
+    def test_search_lists_matching_past_events_separately(self):
+        # Arrange
+        self._event('Lake Loop', 3)
+        past = self._event('Lake Century', -30)
+        self._event('Hill Repeats', -20)
+
+        # Act
+        response = self.client.get(reverse('upcoming'), {'q': 'lake'})
+
+        # Assert
+        self.assertContains(response, 'Past events matching')
+        self.assertEqual([past], list(response.context['past_events']))
+        self.assertNotContains(response, 'Hill Repeats')
+
+    def test_no_past_events_section_without_a_query(self):
+        # Arrange
+        self._event('Lake Century', -30)
+
+        # Act
+        response = self.client.get(reverse('upcoming'))
+
+        # Assert
+        self.assertNotContains(response, 'Past events matching')
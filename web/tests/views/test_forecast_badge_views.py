@@ -1,7 +1,9 @@
 from datetime import timedelta, timezone as datetime_timezone
 from unittest.mock import patch
 
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -74,7 +76,7 @@ class UpcomingPageForecastBadgeTests(ForecastBadgeTestCase):
         self._create_forecast()
 
         # Act
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             response = self.client.get(reverse('upcoming'))
 
         # Assert
@@ -87,7 +89,7 @@ class UpcomingPageForecastBadgeTests(ForecastBadgeTestCase):
         self._create_event()
 
         # Act
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             response = self.client.get(reverse('upcoming'))
 
         # Assert
@@ -100,7 +102,7 @@ class UpcomingPageForecastBadgeTests(ForecastBadgeTestCase):
         self._make_stale(self._create_forecast())
 
         # Act
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             response = self.client.get(reverse('upcoming'))
 
         # Assert
@@ -155,7 +157,7 @@ class DetailPageForecastBadgeTests(ForecastBadgeTestCase):
         self._create_forecast()
 
         # Act
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             response = self.client.get(reverse('event_detail', args=[event.id]))
 
         # Assert
@@ -164,12 +166,29 @@ class DetailPageForecastBadgeTests(ForecastBadgeTestCase):
         self.assertContains(response, 'View forecast history')
         mock_get.assert_not_called()
 
+    def test_detail_looks_the_forecast_up_once(self):
+        # Arrange
+        event = self._create_event()
+        self._create_forecast()
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('event_detail', args=[event.id]))
+
+        # Assert
+        self.assertContains(response, 'AQHI&nbsp;moderate')
+        forecast_lookups = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "backoffice_forecast"' in query['sql']
+        ]
+        self.assertEqual(len(forecast_lookups), 1)
+
     def test_detail_shows_no_badge_without_a_forecast(self):
         # Arrange
         event = self._create_event()
 
         # Act
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             response = self.client.get(reverse('event_detail', args=[event.id]))
 
         # Assert
@@ -183,7 +202,7 @@ class DetailPageForecastBadgeTests(ForecastBadgeTestCase):
         self._make_stale(self._create_forecast())
 
         # Act
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             response = self.client.get(reverse('event_detail', args=[event.id]))
 
         # Assert
@@ -304,7 +323,7 @@ class RegistrationPagesForecastBadgeTests(ForecastBadgeTestCase):
         event = self._create_event()
 
         # Act
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             response = self.client.get(reverse('riders_list', args=[event.id]))
 
         # Assert
@@ -327,7 +346,7 @@ class RegistrationPagesForecastBadgeTests(ForecastBadgeTestCase):
         event = self._create_event()
 
         # Act
-        with patch('backoffice.services.forecast_service.requests.get') as mock_get:
+        with patch('backoffice.services.forecast_client.requests.Session.get') as mock_get:
             response = self.client.get(reverse('registration_create', args=[event.id]))
 
         # Assert
@@ -0,0 +1,123 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from backoffice.models import Announcement, Event, Program, Registration
+
+
+@override_settings(LISTING_PAGE_CACHE_TIMEOUT=300)
+class ListingPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.program = Program.objects.create(name='Test Program')
+        self.starts_at = timezone.now() + timedelta(days=1)
+        self.event = self._create_event('Cached Ride')
+        self.calendar_url = reverse(
+            'calendar_month',
+            kwargs={'year': timezone.localtime(self.starts_at).year, 'month': timezone.localtime(self.starts_at).month},
+        )
+
+    def _create_event(self, name: str) -> Event:
+        with self.captureOnCommitCallbacks(execute=True):
+            return Event.objects.create(
+                program=self.program,
+                name=name,
+                starts_at=self.starts_at,
+                registration_closes_at=self.starts_at - timedelta(hours=1),
+                state=Event.STATE_LIVE,
+            )
+
+    def test_anonymous_upcoming_page_is_served_from_cache(self):
+        # Arrange
+        self.client.get(reverse('upcoming'))
+
+        # Act
+        with patch('web.views.events.EventService.fetch_upcoming_events') as fetch_upcoming_events:
+            response = self.client.get(reverse('upcoming'))
+
+        # Assert
+        fetch_upcoming_events.assert_not_called()
+        self.assertContains(response, 'Cached Ride')
+
+    def test_anonymous_calendar_page_is_served_from_cache(self):
+        # Arrange
+        self.client.get(self.calendar_url)
+
+        # Act
+        with patch('web.views.events.EventService.fetch_events_for_month') as fetch_events_for_month:
+            response = self.client.get(self.calendar_url)
+
+        # Assert
+        fetch_events_for_month.assert_not_called()
+        self.assertContains(response, 'Cached Ride')
+
+    def test_saving_an_event_invalidates_cached_pages(self):
+        # Arrange
+        self.client.get(reverse('upcoming'))
+
+        # Act
+        self._create_event('Freshly Added Ride')
+        response = self.client.get(reverse('upcoming'))
+
+        # Assert
+        self.assertContains(response, 'Freshly Added Ride')
+
+    def test_announcement_starting_by_the_clock_is_shown_on_cached_pages(self):
+        # Arrange
+        now = timezone.now()
+        announcement = Announcement.objects.create(
+            title='Trail Closure', text='<p>Closed</p>',
+            begin_at=now + timedelta(hours=1), end_at=now + timedelta(days=1),
+        )
+        self.client.get(reverse('upcoming'))
+
+        # Act
+        # Nothing is saved when an announcement's start time arrives
+        Announcement.objects.filter(pk=announcement.pk).update(begin_at=now - timedelta(minutes=1))
+        response = self.client.get(reverse('upcoming'))
+
+        # Assert
+        self.assertContains(response, 'Trail Closure')
+
+    def test_search_query_is_part_of_the_key(self):
+        # Arrange
+        self._create_event('Gravel Grinder')
+        self.client.get(reverse('upcoming'))
+
+        # Act
+        response = self.client.get(reverse('upcoming'), {'q': 'Gravel'})
+
+        # Assert
+        self.assertContains(response, 'Gravel Grinder')
+        self.assertNotContains(response, 'Cached Ride')
+
+    def test_authenticated_pages_are_not_cached(self):
+        # Arrange
+        user = User.objects.create_user(username='rider', email='rider@example.com', password='password')
+        Registration.objects.create(
+            event=self.event, user=user, name='Rider', email=user.email, state=Registration.STATE_CONFIRMED,
+        )
+        self.client.get(reverse('upcoming'))
+        self.client.force_login(user)
+
+        # Act
+        response = self.client.get(reverse('upcoming'))
+
+        # Assert
+        self.assertEqual(response.context['registered_event_ids'], {self.event.id})
+
+    def test_session_preference_is_recorded_on_cache_hits(self):
+        # Arrange
+        self.client.get(self.calendar_url)
+        self.client.get(reverse('upcoming'))
+
+        # Act
+        self.client.get(self.calendar_url)
+
+        # Assert
+        self.assertEqual(self.client.session['preferred_events_view'], 'calendar')
@@ -75,9 +75,9 @@ class BaseNameVisibilityTestCase(TestCase):
 
     def _rider_names_from_detail(self, response):
         names = []
-        for ride_info in response.context['rides'].values():
-            for speed_range_info in ride_info['speed_ranges'].values():
-                names.extend(rider.name for rider in speed_range_info['riders'])
+        for entry in response.context['rides']:
+            for group in entry.groups:
+                names.extend(rider.name for rider in group.riders)
         return names
 
     def _assert_masked(self, name):
@@ -113,10 +113,12 @@ class EventDetailNameVisibilityTests(BaseNameVisibilityTestCase):
         response = self.client.get(reverse('event_detail', args=[self.event.id]))
 
         # Assert
-        speed_range_info = response.context['rides'][str(self.ride.id)]['speed_ranges'][str(self.speed_range.id)]
-        self.assertEqual(len(speed_range_info['riders']), 4)
-        self.assertEqual(speed_range_info['ride_leader_count'], 1)
-        self.assertEqual(speed_range_info['non_leader_count'], 3)
+        [entry] = response.context['rides']
+        [group] = entry.groups
+        self.assertEqual(group.speed_range, self.speed_range)
+        self.assertEqual(len(group.riders), 4)
+        self.assertEqual(group.ride_leader_count, 1)
+        self.assertEqual(group.non_leader_count, 3)
 
     def test_signed_in_viewer_sees_only_users_name(self):
         # Arrange
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from backoffice.models import Event, Program, Registration
+from backoffice.services.calendar_feed_service import CalendarFeedService
+
+
+class RegistrationFeedViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='rider', email='rider@example.com')
+        self.program = Program.objects.create(name='Test Program')
+        self.url = reverse('registration_feed', args=[CalendarFeedService().token_for(self.user)])
+
+    def _register(self, name, state=Registration.STATE_CONFIRMED, user=None):
+        starts_at = timezone.now() + timedelta(days=5)
+        event = Event.objects.create(
+            program=self.program,
+            name=name,
+            starts_at=starts_at,
+            registration_closes_at=starts_at - timedelta(hours=1),
+            state=Event.STATE_LIVE,
+        )
+        user = user or self.user
+        with self.captureOnCommitCallbacks(execute=True):
+            registration = Registration.objects.create(
+                event=event, user=user, name='Rider', email=user.email, state=state,
+            )
+        return registration
+
+    def test_feed_lists_only_confirmed_registrations(self):
+        # Arrange
+        self._register('Confirmed Ride')
+        self._register('Waitlisted Ride', state=Registration.STATE_WAITLISTED)
+        other = User.objects.create_user(username='other', email='other@example.com')
+        self._register('Someone Else Ride', user=other)
+
+        # Act
+        response = self.client.get(self.url)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertContains(response, 'Confirmed Ride')
+        self.assertNotContains(response, 'Waitlisted Ride')
+        self.assertNotContains(response, 'Someone Else Ride')
+
+    def test_revoked_link_is_not_found(self):
+        # Arrange
+        CalendarFeedService().revoke(self.user)
+
+        # Act
+        response = self.client.get(self.url)
+
+        # Assert
+        self.assertEqual(response.status_code, 404)
+
+    def test_matching_etag_is_answered_without_querying_registrations(self):
+        # Arrange
+        self._register('Confirmed Ride')
+        etag = self.client.get(self.url)['ETag']
+
+        # Act
+        with patch('web.views.events_ical.RegistrationService.fetch_current_registrations') as fetch:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+        fetch.assert_not_called()
+
+    @override_settings(EVENT_FEED_CACHE_TIMEOUT=60)
+    def test_cached_feed_is_replaced_when_registrations_change(self):
+        # Arrange
+        self._register('First Ride')
+        self.client.get(self.url)
+
+        # Act
+        self._register('Second Ride')
+        response = self.client.get(self.url)
+
+        # Assert
+        self.assertContains(response, 'First Ride')
+        self.assertContains(response, 'Second Ride')
+
+    @override_settings(EVENT_FEED_CACHE_TIMEOUT=60)
+    def test_cached_feed_is_replaced_when_an_event_changes(self):
+        # Arrange
+        registration = self._register('First Ride')
+        self.client.get(self.url)
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            registration.event.name = 'Renamed Ride'
+            registration.event.save()
+        response = self.client.get(self.url)
+
+        # Assert
+        self.assertContains(response, 'Renamed Ride')
+
+
+class ProfileCalendarFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='rider', email='rider@example.com')
+        self.client.force_login(self.user)
+
+    def test_profile_links_to_the_personal_feed(self):
+        # Act
+        response = self.client.get(reverse('profile'))
+
+        # Assert
+        token = CalendarFeedService().token_for(User.objects.get(pk=self.user.pk))
+        self.assertContains(response, reverse('registration_feed', args=[token]))
+
+    def test_reset_revokes_the_previous_link(self):
+        # Arrange
+        token = CalendarFeedService().token_for(self.user)
+
+        # Act
+        response = self.client.post(reverse('profile_calendar_feed_reset'))
+
+        # Assert
+        self.assertRedirects(response, reverse('profile'), fetch_redirect_response=False)
+        self.assertIsNone(CalendarFeedService().user_for(token))
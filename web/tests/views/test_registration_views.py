@@ -855,7 +855,7 @@ class EventDetailAvailabilityTests(TestCase):
         # Assert
         self.assertEqual(response.status_code, 200)
         self.assertFalse(response.context['registrations_available'])
-        self.assertEqual(len(response.context['rides']), 0)
+        self.assertFalse(any(group.riders for entry in response.context['rides'] for group in entry.groups))
 
 
 class RegistrationCreateErrorCaseTests(TestCase):
@@ -919,7 +919,7 @@ class RegistrationCreateErrorCaseTests(TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertIn(b'Event uses external registration', response.content)
 
-    def test_registration_returns_400_when_at_capacity(self):
+    def test_registration_form_is_offered_when_at_capacity(self):
         event = Event.objects.create(
             name="Full Event",
             program=self.program,
@@ -941,8 +941,8 @@ class RegistrationCreateErrorCaseTests(TestCase):
 
         response = self.client.get(reverse('registration_create', args=[event.id]))
 
-        self.assertEqual(response.status_code, 400)
-        self.assertIn(b'Event has reached capacity', response.content)
+        # Registering at capacity joins the waitlist
+        self.assertEqual(response.status_code, 200)
 
     def test_registration_returns_404_for_nonexistent_event(self):
         response = self.client.get(reverse('registration_create', args=[99999]))
@@ -3,18 +3,19 @@ from django.urls import path
 from web.views.events import event_detail, event_forecasts, event_list, event_registrations, \
     event_emergency_contacts, event_emails, event_registrations_print, calendar_view, events_redirect
 from web.views.debug import debug_index, forecasts as debug_forecasts_view, tasks_ping
-from web.views.events_ical import EventFeed
+from web.views.events_ical import EventFeed, RegistrationFeed
 from web.views.helpers import changes_email_addresses
 from web.views.login import LoginFormView, logout_view, CustomLoginView
 from web.views.pages import page_detail
-from web.views.profile import profile, registration_withdraw, profile_membership_number, profile_name_visibility
+from web.views.profile import profile, registration_withdraw, profile_membership_number, profile_name_visibility, \
+    profile_calendar_feed_reset
 from web.views.registration_manage import (
     event_registrations_manage, staff_registration_add,
     staff_registration_edit, staff_registration_withdraw,
 )
 from web.views.registrations import (
     registration_create, registration_edit, registration_submitted, membership_number_capture,
-    registration_verification_sent, registration_verify,
+    registration_verification_sent, registration_verify, registration_waitlisted,
 )
 from web.views.rides import ride_speed_ranges
 from web.views.reviews import review_2025
@@ -45,6 +46,7 @@ urlpatterns = [
     path('registrations/<int:registration_id>/edit', registration_edit, name='registration_edit'),
     path('registrations/<int:registration_id>/withdraw', registration_withdraw, name='registration_withdraw'),
     path('events/<int:event_id>/registrations/submitted', registration_submitted, name='registration_submitted'),
+    path('events/<int:event_id>/registrations/waitlisted', registration_waitlisted, name='registration_waitlisted'),
     path('registrations/verify', registration_verify, name='registration_verify'),
     path('registrations/verification-sent', registration_verification_sent, name='registration_verification_sent'),
     path('rides/<int:ride_id>/speed-ranges', ride_speed_ranges, name='get_speed_ranges'),
@@ -52,6 +54,8 @@ urlpatterns = [
     path('profile', profile, name='profile'),
     path('profile/membership-number', profile_membership_number, name='profile_membership_number'),
     path('profile/name-visibility', profile_name_visibility, name='profile_name_visibility'),
+    path('profile/calendar-feed/reset', profile_calendar_feed_reset, name='profile_calendar_feed_reset'),
+    path('profile/rides/<str:token>.ics', RegistrationFeed(), name='registration_feed'),
     path('reviews/2025', review_2025, name='review_2025'),
     path('debug', debug_index, name='debug_index'),
     path('debug/tasks-ping', tasks_ping, name='debug_tasks_ping'),
@@ -0,0 +1,80 @@
+from functools import cached_property
+
+from django.http import HttpRequest
+
+from backoffice.models import Registration
+from backoffice.services.roster_service import RosterViewer
+
+
+class ViewerContext:
+    """What the requesting user is to one event.
+
+    The viewer's confirmed and waitlisted registrations for the event are loaded in a single query
+    the first time anything asks, and the context is shared for the rest of the
+    request, so permission and name masking checks never query again.
+    """
+
+    def __init__(self, user, event_id: int):
+        self.user = user
+        self.event_id = event_id
+
+    @classmethod
+    def for_request(cls, request: HttpRequest, event_id: int) -> 'ViewerContext':
+        contexts = getattr(request, '_viewer_contexts', None)
+        if contexts is None:
+            contexts = request._viewer_contexts = {}
+        context = contexts.get(event_id)
+        if context is None:
+            context = contexts[event_id] = cls(request.user, event_id)
+        return context
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.user.is_authenticated
+
+    @property
+    def is_staff(self) -> bool:
+        return self.user.is_authenticated and self.user.is_staff
+
+    @cached_property
+    def _registrations(self) -> list[Registration]:
+        if not self.user.is_authenticated:
+            return []
+        return list(Registration.objects.filter(
+            event_id=self.event_id,
+            user=self.user,
+            state__in=[Registration.STATE_CONFIRMED, Registration.STATE_WAITLISTED],
+        ).order_by('-pk'))
+
+    @cached_property
+    def _confirmed(self) -> list[Registration]:
+        return [r for r in self._registrations if r.state == Registration.STATE_CONFIRMED]
+
+    @property
+    def registration(self) -> Registration | None:
+        """The viewer's most recent confirmed registration for the event."""
+        return self._confirmed[0] if self._confirmed else None
+
+    @property
+    def waitlisted_registration(self) -> Registration | None:
+        return next((r for r in self._registrations if r.state == Registration.STATE_WAITLISTED), None)
+
+    @property
+    def is_ride_leader(self) -> bool:
+        return any(
+            registration.ride_leader_preference == Registration.RideLeaderPreference.YES
+            for registration in self._confirmed
+        )
+
+    @property
+    def is_privileged(self) -> bool:
+        """Staff and the event's confirmed ride leaders see every name and the riders' contacts."""
+        return self.is_staff or self.is_ride_leader
+
+    @property
+    def roster_viewer(self) -> RosterViewer:
+        if self.is_privileged:
+            return RosterViewer.PRIVILEGED
+        if self.is_authenticated:
+            return RosterViewer.MEMBER
+        return RosterViewer.ANONYMOUS
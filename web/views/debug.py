@@ -50,6 +50,7 @@ def forecasts(request: HttpRequest) -> HttpResponse:
             logger.exception('Could not queue refresh_forecasts')
             context['error'] = f'{type(e).__name__}: {e}'
 
-    context['forecasts'] = Forecast.objects.order_by('-prepared_at')[:RECENT_FORECAST_COUNT]
+    context['forecasts'] = list(Forecast.objects.order_by('-prepared_at')[:RECENT_FORECAST_COUNT])
+    Forecast.load_readings(context['forecasts'])
 
     return render(request, 'web/debug/forecasts.html', context)
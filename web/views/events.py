@@ -1,11 +1,13 @@
 import calendar
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from itertools import groupby
 from urllib.parse import urlencode
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.db.models import Max
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, render, redirect
 from django.urls import reverse
 from django.utils import timezone
@@ -14,12 +16,19 @@ from django.views.decorators.cache import never_cache
 from django_tables2 import RequestConfig
 
 from audit.services import AuditService
-from backoffice.models import Event, Registration
+from backoffice.models import Event, Forecast, Registration
+from backoffice.services.announcement_service import AnnouncementService
 from backoffice.services.event_service import EventService
-from backoffice.services.forecast_summary import summarize
+from backoffice.services.forecast_summary import material_flags
+from backoffice.services.listing_cache_service import ListingCacheService
 from backoffice.services.registration_service import RegistrationService
+from backoffice.services.roster_service import RosterService
+from web.conditional import make_etag, release_created_at, release_version, respond_conditionally, viewer_key
+from web.forecast_loader import ForecastLoader
 from web.filters import PublicRegistrationFilter
+from web.listing_cache import cached_for_anonymous
 from web.tables import PublicRegistrationTable
+from web.viewer_context import ViewerContext
 
 
 def _registrations_visible(event, user):
@@ -28,126 +37,6 @@ def _registrations_visible(event, user):
     return user.is_authenticated and user.is_staff
 
 
-def _is_confirmed_ride_leader(event_id, user):
-    if not user.is_authenticated:
-        return False
-    return Registration.objects.filter(
-        event_id=event_id,
-        user=user,
-        state=Registration.STATE_CONFIRMED,
-        ride_leader_preference=Registration.RideLeaderPreference.YES
-    ).exists()
-
-
-def _viewer_can_see_all_names(event_id, user):
-    if user.is_authenticated and user.is_staff:
-        return True
-    return _is_confirmed_ride_leader(event_id, user)
-
-
-def _create_ride_structure(ride):
-    return {
-        'ride': ride,
-        'speed_ranges': {
-            str(sr.id): {
-                'speed_range': sr,
-                'riders': [],
-                'sort_key': sr.lower_limit,
-                'ride_leader_count': 0,
-                'non_leader_count': 0
-            }
-            for sr in ride.speed_ranges.all()
-        }
-    }
-
-
-def _initialize_rides_structure(event):
-    return {
-        str(ride.id): _create_ride_structure(ride)
-        for ride in event.ride_set.all().prefetch_related('speed_ranges')
-    }
-
-
-def _get_speed_range_key(registration):
-    return str(registration.speed_range_preference.id) if registration.speed_range_preference else 'none'
-
-
-def _add_rider_to_speed_range(rides_data, ride_id, speed_range_key, registration):
-    if speed_range_key == 'none':
-        if 'none' not in rides_data[ride_id]['speed_ranges']:
-            rides_data[ride_id]['speed_ranges']['none'] = {
-                'speed_range': None,
-                'riders': [],
-                'sort_key': float('inf'),
-                'ride_leader_count': 0,
-                'non_leader_count': 0
-            }
-
-    rides_data[ride_id]['speed_ranges'][speed_range_key]['riders'].append(registration)
-
-
-def _populate_riders(rides_data, registrations):
-    for reg in registrations:
-        if not reg.ride:
-            continue
-
-        ride_id = str(reg.ride.id)
-        speed_range_key = _get_speed_range_key(reg)
-
-        if speed_range_key in rides_data[ride_id]['speed_ranges'] or speed_range_key == 'none':
-            _add_rider_to_speed_range(rides_data, ride_id, speed_range_key, reg)
-
-
-def _count_ride_leaders(riders):
-    return sum(1 for r in riders if r.ride_leader_preference == Registration.RideLeaderPreference.YES)
-
-
-def _sort_speed_range_data(speed_ranges):
-    sorted_items = sorted(
-        speed_ranges.items(),
-        key=lambda x: x[1]['sort_key']
-    )
-
-    sorted_speed_ranges = {}
-    for speed_range_id, speed_range_data in sorted_items:
-        speed_range_data['riders'].sort(key=lambda r: r.name)
-        speed_range_data['ride_leader_count'] = _count_ride_leaders(speed_range_data['riders'])
-        speed_range_data['non_leader_count'] = len(speed_range_data['riders']) - speed_range_data['ride_leader_count']
-        sorted_speed_ranges[speed_range_id] = speed_range_data
-
-    return sorted_speed_ranges
-
-
-def _finalize_rides_data(rides_data):
-    return {
-        ride_id: {
-            'ride': ride_info['ride'],
-            'speed_ranges': _sort_speed_range_data(ride_info['speed_ranges'])
-        }
-        for ride_id, ride_info in rides_data.items()
-    }
-
-
-def _get_rides_with_riders_for_event(event_id: int, viewer) -> dict:
-    event = get_object_or_404(Event, id=event_id)
-
-    registrations = list(Registration.objects.filter(
-        event_id=event_id,
-        state=Registration.STATE_CONFIRMED
-    ).select_related('ride', 'speed_range_preference', 'ride__route', 'user__profile'))
-
-    RegistrationService().mask_hidden_names(
-        registrations,
-        viewer_is_authenticated=viewer.is_authenticated,
-        viewer_is_privileged=_viewer_can_see_all_names(event_id, viewer),
-    )
-
-    rides_data = _initialize_rides_structure(event)
-    _populate_riders(rides_data, registrations)
-
-    return _finalize_rides_data(rides_data)
-
-
 def events_redirect(request: HttpRequest) -> HttpResponseRedirect:
     preferred_view = request.session.get('preferred_events_view', 'upcoming')
 
@@ -163,7 +52,46 @@ def events_redirect(request: HttpRequest) -> HttpResponseRedirect:
         return redirect('upcoming')
 
 
+def _event_page_validators(request: HttpRequest, event_id: int) -> tuple[str, datetime] | None:
+    event = Event.objects.filter(id=event_id).select_related('stats', 'program').first()
+    if event is None:
+        return None
+
+    now = timezone.now()
+    stats = getattr(event, 'stats', None)
+    forecast = ForecastLoader.for_request(request).get(event)
+
+    visibility_ends_at = (event.ends_at or event.starts_at) + timedelta(hours=settings.REGISTRATION_VISIBILITY_HOURS)
+    milestones = [event.registration_closes_at, event.starts_at, event.ends_at, visibility_ends_at]
+
+    stamps = [event.updated_at, release_created_at()]
+    stamps += [milestone for milestone in milestones if milestone and milestone <= now]
+    if stats is not None:
+        stamps.append(stats.updated_at)
+    if forecast is not None:
+        stamps.append(forecast.prepared_at)
+
+    # The roster version moves with the registrations, rides, speed ranges, routes and
+    # registrant profiles; the program has no timestamp, so what the page shows of it is hashed
+    program = event.program
+    last_modified = max(stamp for stamp in stamps if stamp is not None)
+    etag = make_etag(
+        request.get_full_path(), last_modified.isoformat(), forecast.id if forecast else None,
+        RosterService().version(event_id), program.name, program.emoji, program.color,
+        viewer_key(request.user), release_version(),
+    )
+    return etag, last_modified
+
+
 def event_detail(request: HttpRequest, event_id: int) -> HttpResponse:
+    validators = _event_page_validators(request, event_id)
+    if validators is None:
+        raise Http404
+
+    return respond_conditionally(request, *validators, lambda: _render_event_detail(request, event_id))
+
+
+def _render_event_detail(request: HttpRequest, event_id: int) -> HttpResponse:
     event = get_object_or_404(
         Event,
         id=event_id)
@@ -171,58 +99,40 @@ def event_detail(request: HttpRequest, event_id: int) -> HttpResponse:
     if event.archived:
         return render(request, 'web/events/archived.html', {'event': event})
 
-    if _registrations_visible(event, request.user):
-        rides = _get_rides_with_riders_for_event(event_id, request.user)
+    registrations_available = _registrations_visible(event, request.user)
+    if registrations_available:
+        rides = RosterService().roster(event, ViewerContext.for_request(request, event_id).roster_viewer)
     else:
-        rides = {}
-
-    user_registration = None
-    if request.user.is_authenticated:
-        user_registration = Registration.objects.filter(
-            event_id=event_id,
-            user=request.user,
-            state=Registration.STATE_CONFIRMED,
-        ).order_by('-pk').first()
+        rides = RosterService().rides(event)
 
+    viewer = ViewerContext.for_request(request, event_id)
+    user_registration = viewer.registration or viewer.waitlisted_registration
+    waitlist_position = None
     if user_registration is not None:
         user_registration.event = event
         registration_service = RegistrationService()
         registration_service.mark_editable([user_registration])
         registration_service.mark_withdrawable([user_registration])
+        if user_registration.state == Registration.STATE_WAITLISTED:
+            waitlist_position = registration_service.waitlist_position(user_registration)
 
     context = {
         'event': event,
         'rides': rides,
-        'user_is_registered': user_registration is not None,
+        'user_is_registered': viewer.registration is not None,
+        'user_is_waitlisted': waitlist_position is not None,
+        'waitlist_position': waitlist_position,
         'user_registration': user_registration,
-        'registrations_available': _registrations_visible(event, request.user),
+        'registrations_available': registrations_available,
     }
 
     return render(request, 'web/events/detail.html', context)
 
 
-def _forecast_badge_key(forecast) -> tuple | None:
-    if not forecast.has_readings:
-        return None
-    summary = summarize(forecast)
-    return (
-        summary.condition_primary,
-        summary.condition_warning,
-        summary.temperature_display,
-        summary.aqhi_category if summary.aqhi_visible else None,
-        summary.aqhi_warning_category,
-    )
-
-
 def _forecast_rows(forecasts) -> list[tuple]:
     forecasts = list(forecasts)
-    keys = [_forecast_badge_key(forecast) for forecast in forecasts]
-    last = len(keys) - 1
-
-    return [
-        (forecast, index in (0, last) or keys[index] != keys[index + 1])
-        for index, forecast in enumerate(forecasts)
-    ]
+    Forecast.load_readings(forecasts)
+    return list(zip(forecasts, material_flags(forecasts)))
 
 
 def event_forecasts(request: HttpRequest, event_id: int) -> HttpResponse:
@@ -246,11 +156,41 @@ def _get_filter_params(request):
     return active_query, filter_query_string
 
 
+def _listing_validators(request: HttpRequest, active_query: str) -> tuple[str, datetime]:
+    now = timezone.now()
+    latest = Event.objects.aggregate(event=Max('updated_at'), stats=Max('stats__updated_at'))
+    latest_forecast = Forecast.objects.aggregate(prepared_at=Max('prepared_at'))['prepared_at']
+    announcement_ids = list(
+        AnnouncementService().fetch_active_announcements(request.user, now).values_list('id', flat=True)
+    )
+
+    # Forecast badges lapse as forecasts age, without any write to mark it, so validators
+    # never outlive the current hour.
+    stamps = [
+        latest['event'], latest['stats'], latest_forecast, release_created_at(),
+        now.replace(minute=0, second=0, microsecond=0),
+    ]
+    last_modified = max(stamp for stamp in stamps if stamp is not None)
+
+    etag = make_etag(
+        request.path, active_query, last_modified.isoformat(), ListingCacheService().version(),
+        announcement_ids, timezone.localdate(), viewer_key(request.user), release_version(),
+    )
+    return etag, last_modified
+
+
 def event_list(request: HttpRequest) -> HttpResponse:
     request.session['preferred_events_view'] = 'upcoming'
 
     active_query, _ = _get_filter_params(request)
 
+    return respond_conditionally(
+        request, *_listing_validators(request, active_query),
+        lambda: cached_for_anonymous(request, active_query, lambda: _render_event_list(request, active_query)),
+    )
+
+
+def _render_event_list(request: HttpRequest, active_query: str) -> HttpResponse:
     events = list(EventService().fetch_upcoming_events(query=active_query))
     starts_at_date = lambda event: timezone.localtime(event.starts_at).date()
 
@@ -268,29 +208,31 @@ def event_list(request: HttpRequest) -> HttpResponse:
     tomorrow = today + timedelta(days=1)
 
     context = {
-        'forecasts': EventService().fetch_forecasts(events),
+        'forecasts': ForecastLoader.for_request(request).get_many(events),
         'events_by_date': events_by_date,
         'today': today,
         'tomorrow': tomorrow,
         'registered_event_ids': registered_event_ids,
         'active_query': active_query,
+        'past_events': EventService().search_past_events(active_query) if active_query else [],
     }
 
     return render(request, 'web/events/list_dense.html', context)
 
 
 def _build_registrations_context(request, event, contacts_revealed):
-    is_ride_leader = _is_confirmed_ride_leader(event.id, request.user)
-
-    is_staff = request.user.is_authenticated and request.user.is_staff
-    can_access_rider_contacts = is_ride_leader or is_staff
+    viewer = ViewerContext.for_request(request, event.id)
+    is_ride_leader = viewer.is_ride_leader
+    is_staff = viewer.is_staff
+    can_access_rider_contacts = viewer.is_privileged
     can_reveal_contacts = can_access_rider_contacts
 
     visible_states = [Registration.STATE_CONFIRMED]
     if is_staff:
         visible_states.append(Registration.STATE_UNVERIFIED)
 
-    all_riders = Registration.objects.filter(
+    # Loaded once; the filter, the leader check and the masking all work from this list
+    all_riders = list(Registration.objects.filter(
         event_id=event.id,
         state__in=visible_states
     ).select_related(
@@ -303,14 +245,12 @@ def _build_registrations_context(request, event, contacts_revealed):
         'speed_range_preference__lower_limit',
         'user__first_name',
         'user__last_name'
-    )
+    ))
 
-    registration_filter = PublicRegistrationFilter(
-        request.GET, queryset=all_riders, event=event
-    )
+    registration_filter = PublicRegistrationFilter(request.GET, event=event)
 
     filtered_riders = RegistrationService().mask_hidden_names(
-        list(registration_filter.qs),
+        registration_filter.filter_list(all_riders),
         viewer_is_authenticated=request.user.is_authenticated,
         viewer_is_privileged=can_access_rider_contacts,
     )
@@ -358,6 +298,14 @@ def _build_registrations_context(request, event, contacts_revealed):
 
 
 def event_registrations(request: HttpRequest, event_id: int) -> HttpResponse:
+    validators = _event_page_validators(request, event_id)
+    if validators is None:
+        raise Http404
+
+    return respond_conditionally(request, *validators, lambda: _render_event_registrations(request, event_id))
+
+
+def _render_event_registrations(request: HttpRequest, event_id: int) -> HttpResponse:
     event = get_object_or_404(Event, id=event_id)
 
     if not _registrations_visible(event, request.user):
@@ -385,7 +333,7 @@ def event_emergency_contacts(request: HttpRequest, event_id: int) -> HttpRespons
     if not _registrations_visible(event, request.user):
         return redirect('riders_list', event_id=event_id)
 
-    if not _is_confirmed_ride_leader(event_id, request.user) and not request.user.is_staff:
+    if not ViewerContext.for_request(request, event_id).is_privileged:
         raise PermissionDenied
 
     if not request.headers.get('HX-Request'):
@@ -405,7 +353,7 @@ def event_registrations_print(request: HttpRequest, event_id: int) -> HttpRespon
     if not _registrations_visible(event, request.user):
         return redirect('riders_list', event_id=event_id)
 
-    if not _is_confirmed_ride_leader(event_id, request.user) and not request.user.is_staff:
+    if not ViewerContext.for_request(request, event_id).is_privileged:
         raise PermissionDenied
 
     AuditService().log(request.user, 'printable_emergency_contacts_viewed', target=event)
@@ -418,7 +366,7 @@ def event_registrations_print(request: HttpRequest, event_id: int) -> HttpRespon
 def event_emails(request: HttpRequest, event_id: int) -> HttpResponse:
     event = get_object_or_404(Event, id=event_id)
 
-    if not _is_confirmed_ride_leader(event_id, request.user) and not request.user.is_staff:
+    if not ViewerContext.for_request(request, event_id).is_privileged:
         raise PermissionDenied
 
     ride_leaders_only = request.GET.get('type') == 'leaders'
@@ -449,6 +397,17 @@ def calendar_view(request: HttpRequest, year: int = None, month: int = None) ->
 
     active_query, filter_query_string = _get_filter_params(request)
 
+    return respond_conditionally(
+        request, *_listing_validators(request, active_query),
+        lambda: cached_for_anonymous(
+            request, active_query,
+            lambda: _render_calendar(request, year, month, today, active_query, filter_query_string),
+        ),
+    )
+
+
+def _render_calendar(request: HttpRequest, year: int, month: int, today: date, active_query: str,
+                     filter_query_string: str) -> HttpResponse:
     events = list(EventService().fetch_events_for_month(year, month, query=active_query))
 
     month_start = date(year, month, 1)
@@ -1,11 +1,85 @@
-from datetime import timedelta
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable
 
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseBadRequest
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date
 from django_ical.views import ICalFeed
 
-from backoffice.models import Event
+from backoffice.models import Event, Registration
+from backoffice.services.calendar_feed_service import CalendarFeedService
 from backoffice.services.event_service import EventService
+from backoffice.services.registration_service import RegistrationService
+from web.conditional import make_etag, release_version
+
+FEED_DAYS_BEHIND = 90
+FEED_DAYS_AHEAD = 365
+FEED_MAX_DAYS = 2 * 365
+
+
+@dataclass(frozen=True)
+class FeedWindow:
+    since: date
+    until: date
+    program_id: int | None = None
+
+    @classmethod
+    def from_request(cls, request: HttpRequest) -> 'FeedWindow':
+        today = timezone.localdate()
+        since = cls._parse_day(request.GET.get('since'), today - timedelta(days=FEED_DAYS_BEHIND))
+        until = cls._parse_day(request.GET.get('until'), today + timedelta(days=FEED_DAYS_AHEAD))
+
+        if since > until:
+            raise ValueError('since must not be after until.')
+        if (until - since).days > FEED_MAX_DAYS:
+            raise ValueError(f'The feed window may span at most {FEED_MAX_DAYS} days.')
+
+        program = request.GET.get('program')
+        if program and not program.isdigit():
+            raise ValueError('program must be a program id.')
+
+        return cls(since=since, until=until, program_id=int(program) if program else None)
+
+    @staticmethod
+    def _parse_day(value: str | None, default: date) -> date:
+        if not value:
+            return default
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'{value} is not a YYYY-MM-DD date.')
+        return day
+
+
+def _cached_calendar(request: HttpRequest, key: str, build_feed: Callable[[], HttpResponse],
+                     private: bool = False) -> HttpResponse:
+    etag = make_etag(key, release_version())
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        cached = cache.get(key)
+        if cached is not None:
+            content, headers = cached
+            response = HttpResponse(content, headers=headers)
+        else:
+            response = build_feed()
+            timeout = settings.EVENT_FEED_CACHE_TIMEOUT
+            if timeout and response.status_code == 200:
+                cache.set(key, (response.content, {
+                    'Content-Type': response['Content-Type'],
+                    'Content-Disposition': response['Content-Disposition'],
+                }), timeout)
+
+    response.headers['ETag'] = etag
+    if private:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
 
 
 class EventFeed(ICalFeed):
@@ -14,8 +88,23 @@ class EventFeed(ICalFeed):
     file_name = "event.ics"
     title = 'OBC Events'
 
-    def items(self):
-        return EventService().fetch_events()
+    def __call__(self, request, *args, **kwargs):
+        try:
+            window = FeedWindow.from_request(request)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+        key = (
+            f'event-feed:{CalendarFeedService().event_feed_version()}:{timezone.localdate().isoformat()}:'
+            f'{window.since}:{window.until}:{window.program_id}'
+        )
+        return _cached_calendar(request, key, lambda: super(EventFeed, self).__call__(request, *args, **kwargs))
+
+    def get_object(self, request, *args, **kwargs):
+        return FeedWindow.from_request(request)
+
+    def items(self, window: FeedWindow):
+        return EventService().fetch_events_between(window.since, window.until, program_id=window.program_id)
 
     def item_title(self, item: Event):
         return item.name
@@ -45,3 +134,25 @@ class EventFeed(ICalFeed):
             return item.location_url
         else:
             return item.location
+
+
+class RegistrationFeed(EventFeed):
+    file_name = "my-rides.ics"
+    title = 'My OBC Rides'
+
+    def __call__(self, request, token: str):
+        user = CalendarFeedService().user_for(token)
+        if user is None:
+            raise Http404("Calendar feed does not exist.")
+
+        key = CalendarFeedService().feed_key(user)
+        return _cached_calendar(request, key, lambda: ICalFeed.__call__(self, request, user=user), private=True)
+
+    def get_object(self, request, user=None):
+        return user
+
+    def items(self, user):
+        registrations = RegistrationService().fetch_current_registrations(user).filter(
+            state=Registration.STATE_CONFIRMED,
+        )
+        return [registration.event for registration in registrations]
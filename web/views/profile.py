@@ -8,6 +8,7 @@ from django.utils.http import url_has_allowed_host_and_scheme
 from waffle import flag_is_active
 
 from backoffice.models import Registration, UserProfile
+from backoffice.services.calendar_feed_service import CalendarFeedService
 from backoffice.services.membership_service import MembershipService
 from backoffice.services.registration_service import RegistrationService, NAME_MASKING_STRATEGY
 from backoffice.services.user_service import UserService
@@ -35,6 +36,7 @@ def profile(request: HttpRequest) -> HttpResponse:
         'name_visibility_choices': UserProfile.NameVisibility.choices,
         'registration_visibility_hours': settings.REGISTRATION_VISIBILITY_HOURS,
         'masked_name_example': f'{masked_first_name} {masked_last_name}',
+        'calendar_feed_token': CalendarFeedService().token_for(request.user),
     }
 
     if flag_is_active(request, 'capture_membership_number'):
@@ -80,6 +82,14 @@ def profile_name_visibility(request: HttpRequest) -> HttpResponseRedirect:
     return redirect('profile')
 
 
+@login_required
+def profile_calendar_feed_reset(request: HttpRequest) -> HttpResponseRedirect:
+    if request.method == 'POST':
+        CalendarFeedService().revoke(request.user)
+
+    return redirect('profile')
+
+
 @login_required
 def profile_membership_number(request: HttpRequest) -> HttpResponseRedirect:
     if request.method == 'POST' and flag_is_active(request, 'capture_membership_number'):
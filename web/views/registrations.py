@@ -26,6 +26,14 @@ def registration_submitted(request: HttpRequest, event_id: int) -> HttpResponse:
     })
 
 
+def registration_waitlisted(request: HttpRequest, event_id: int) -> HttpResponse:
+    event = get_object_or_404(Event, id=event_id)
+
+    return render(request, 'web/registrations/waitlisted.html', {
+        'event': event,
+    })
+
+
 def registration_verification_sent(request: HttpRequest) -> HttpResponse:
     return render(request, 'web/registrations/verification_sent.html')
 
@@ -138,6 +146,9 @@ def registration_create(request: HttpRequest, event_id: int) -> HttpResponseRedi
             if result == RegistrationResult.VERIFICATION_REQUIRED:
                 return redirect('registration_verification_sent')
 
+            if result == RegistrationResult.WAITLISTED:
+                return redirect('registration_waitlisted', event_id=event.id)
+
             if result == RegistrationResult.DUPLICATE:
                 if request.user.is_authenticated:
                     return redirect('registration_submitted', event_id=event.id)